@@ -0,0 +1,128 @@
+"""
+Постоянный профиль Chromium на диске (launch_persistent_context): HTTP-кэш и кэши service worker
+переживают перезапуски браузера и бота, поэтому бандлы browse.wf не скачиваются заново.
+
+Профилей два (слоты a и b): при перезапуске с прогревом новый браузер запускается,
+пока старый еще работает, а один каталог профиля Chromium одновременно не открывает.
+"""
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SLOTS = ('a', 'b')
+
+# Что удаляется при превышении лимита - по порядку, от наименее ценного к самому ценному
+PRUNE_ORDER = (
+    'Crashpad',
+    'GrShaderCache',
+    'ShaderCache',
+    'GraphiteDawnCache',
+    os.path.join('Default', 'GPUCache'),
+    os.path.join('Default', 'DawnCache'),
+    os.path.join('Default', 'Code Cache'),
+    os.path.join('Default', 'Cache'),
+    os.path.join('Default', 'Service Worker', 'CacheStorage'),
+)
+
+# Файлы блокировки профиля от прошлого запуска (процесс, который их создал, уже не существует)
+STALE_LOCK_FILES = ('SingletonLock', 'SingletonCookie', 'SingletonSocket')
+
+def directory_size(path: str) -> int:
+    """Размер каталога на диске в байтах (по выделенным блокам, где они известны)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            total += stat.st_blocks * 512 if hasattr(stat, 'st_blocks') else stat.st_size
+    return total
+
+class BrowserProfile:
+    def __init__(self, root: str, max_mb: int = 200, usage_ttl: float = 300):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self.usage_ttl = usage_ttl
+        # контекст браузера -> каталог слота, который он занимает
+        self.leases: Dict[Any, str] = {}
+        self._usage_cache = (0.0, 0)
+        self.stats: Dict[str, Any] = {"launches": 0, "prunes": 0, "pruned_mb": 0, "last_prune_at": None}
+
+    def acquire(self) -> str:
+        """Свободный слот профиля, подготовленный к запуску (без старых блокировок, в пределах лимита)"""
+        in_use = set(self.leases.values())
+        free = [os.path.join(self.root, slot) for slot in PROFILE_SLOTS if os.path.join(self.root, slot) not in in_use]
+        if not free:
+            raise RuntimeError("All browser profile slots are in use")
+
+        # Из свободных берется самый "теплый" (последний использованный) слот
+        path = max(free, key=lambda candidate: os.path.getmtime(candidate) if os.path.exists(candidate) else 0)
+        os.makedirs(path, exist_ok=True)
+        for name in STALE_LOCK_FILES:
+            try:
+                os.unlink(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove stale profile lock {name}: {e}")
+        # Занятый слот открыт работающим Chromium: чистятся только свободные
+        self.prune(free)
+        os.utime(path)
+        self.stats["launches"] += 1
+        return path
+
+    def bind(self, context, path: str):
+        self.leases[context] = path
+
+    def release(self, context):
+        self.leases.pop(context, None)
+
+    def prune(self, paths: List[str]) -> int:
+        """Удаляет кэши слотов по PRUNE_ORDER, пока размер всех профилей больше лимита; возвращает освобожденные байты"""
+        if not self.max_bytes:
+            return 0
+        usage = self.usage(force=True)
+        freed = 0
+        for relative in PRUNE_ORDER:
+            for path in paths:
+                if usage - freed <= self.max_bytes:
+                    break
+                target = os.path.join(path, relative)
+                if not os.path.isdir(target):
+                    continue
+                size = directory_size(target)
+                shutil.rmtree(target, ignore_errors=True)
+                freed += size
+
+        if freed:
+            self.stats["prunes"] += 1
+            self.stats["pruned_mb"] += freed // (1024 * 1024)
+            self.stats["last_prune_at"] = time.time()
+            self._usage_cache = (0.0, 0)
+            logger.info(f"Pruned {freed // 1024} KB from browser profile {self.root}")
+        return freed
+
+    def usage(self, force: bool = False) -> int:
+        """Размер всех слотов профиля в байтах; обход каталога кэшируется на usage_ttl секунд"""
+        checked_at, size = self._usage_cache
+        if force or time.time() - checked_at > self.usage_ttl:
+            size = directory_size(self.root) if os.path.isdir(self.root) else 0
+            self._usage_cache = (time.time(), size)
+        return size
+
+    def summary(self) -> str:
+        return (
+            f"Профиль: {self.usage() // (1024 * 1024)} / {self.max_bytes // (1024 * 1024)} МБ, "
+            f"очисток {self.stats['prunes']} ({self.stats['pruned_mb']} МБ)"
+        )
+
+def create_profile(root: Optional[str], max_mb: int) -> Optional[BrowserProfile]:
+    """Профиль из настроек; пустой путь - браузер без профиля (инкогнито-контекст, как раньше)"""
+    if not root:
+        return None
+    return BrowserProfile(os.path.abspath(root), max_mb)
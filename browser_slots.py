@@ -0,0 +1,54 @@
+"""
+Ограничение параллельной работы со страницами браузера: общий лимит вкладок и очередь на каждую цель
+"""
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+class BrowserSlots:
+    def __init__(self, limit: int = 2):
+        self.limit = max(1, limit)
+        self.semaphore = asyncio.Semaphore(self.limit)
+        # Одна и та же цель (URL) никогда не грузится двумя вкладками одновременно
+        self.target_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.active = 0
+        self.stats: Dict[str, Any] = {
+            "acquired": 0,
+            "peak_active": 0,
+            "waits": 0,
+            "total_wait_ms": 0
+        }
+
+    @asynccontextmanager
+    async def slot(self, target: str):
+        """Занимает очередь цели и один из общих слотов на время работы со страницей"""
+        started = time.perf_counter()
+        target_lock = self.target_locks[target]
+        if target_lock.locked() or self.semaphore.locked():
+            self.stats["waits"] += 1
+
+        async with target_lock:
+            async with self.semaphore:
+                self.stats["total_wait_ms"] += int((time.perf_counter() - started) * 1000)
+                self.stats["acquired"] += 1
+                self.active += 1
+                self.stats["peak_active"] = max(self.stats["peak_active"], self.active)
+                try:
+                    yield
+                finally:
+                    self.active -= 1
+
+    @asynccontextmanager
+    async def exclusive(self):
+        """Занимает все слоты: дожидается завершения текущей работы со страницами и не пускает новую"""
+        acquired = 0
+        try:
+            for _ in range(self.limit):
+                await self.semaphore.acquire()
+                acquired += 1
+            yield
+        finally:
+            for _ in range(acquired):
+                self.semaphore.release()
@@ -0,0 +1,176 @@
+"""
+Наблюдение за браузером Playwright: память процессов Chromium (/proc), число вкладок, ошибки подряд,
+возраст и падения. Решает, когда браузер пора пересоздать, и считает перезапуски по причинам.
+"""
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_MARKERS = (b'chrome', b'chromium', b'headless_shell')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def _read_ppid(pid: str) -> Optional[int]:
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            # Имя процесса в скобках может содержать пробелы: поля считаются после последней ')'
+            return int(f.read().rsplit(b')', 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+def _is_chromium(pid: int) -> bool:
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            cmdline = f.read().lower()
+    except OSError:
+        return False
+    return any(marker in cmdline for marker in CHROMIUM_MARKERS)
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/statm', 'rb') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+def chromium_processes(root_pid: Optional[int] = None) -> List[int]:
+    """Процессы Chromium среди потомков root_pid (драйвер Playwright - дочерний процесс бота, Chromium - его)"""
+    if not os.path.isdir('/proc'):
+        return []
+    root_pid = root_pid or os.getpid()
+    children: Dict[int, List[int]] = defaultdict(list)
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            ppid = _read_ppid(entry)
+            if ppid is not None:
+                children[ppid].append(int(entry))
+
+    found, stack = [], list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        if _is_chromium(pid):
+            found.append(pid)
+        stack.extend(children.get(pid, []))
+    return found
+
+def chromium_rss_bytes(root_pid: Optional[int] = None) -> int:
+    """Сумма RSS процессов Chromium; общая память процессов учитывается несколько раз, это верхняя оценка"""
+    return sum(_rss_bytes(pid) for pid in chromium_processes(root_pid))
+
+class BrowserSupervisor:
+    def __init__(self, max_rss_mb: int = 450, max_pages: int = 12, max_failures: int = 3,
+                 max_age_hours: float = 24, check_interval: float = 30):
+        self.max_rss_mb = max_rss_mb
+        self.max_pages = max_pages
+        self.max_failures = max_failures
+        self.max_age_seconds = max_age_hours * 3600
+        self.check_interval = check_interval
+
+        self.browser = None
+        # Контекст браузера; при постоянном профиле (launch_persistent_context) объекта браузера нет
+        self.context = None
+        self.started_at = 0.0
+        self.crashed = False
+        self.consecutive_failures = 0
+        self.last_check = 0.0
+        self.recycles: Counter = Counter()
+        self.stats: Dict[str, Any] = {
+            "rss_mb": 0,
+            "peak_rss_mb": 0,
+            "pages": 0,
+            "last_recycle_at": None,
+            "last_recycle_reason": None,
+            "recycle_failures": 0
+        }
+
+    def attach(self, browser, context=None):
+        """Начинает наблюдение за новым браузером (или только контекстом, если браузера нет)"""
+        self.browser = browser
+        self.context = context
+        self.started_at = time.time()
+        self.crashed = False
+        self.consecutive_failures = 0
+        if browser is not None:
+            browser.on('disconnected', lambda *_: self._on_disconnected(browser, context))
+        elif context is not None:
+            # Закрытие постоянного контекста означает остановку всего Chromium
+            context.on('close', lambda *_: self._on_disconnected(browser, context))
+
+    def detach(self, browser, context=None):
+        """Браузер закрывается намеренно: его отключение - не падение"""
+        if self.browser is browser and self.context is context:
+            self.browser = None
+            self.context = None
+
+    @property
+    def attached(self) -> bool:
+        return self.browser is not None or self.context is not None
+
+    def _on_disconnected(self, browser, context):
+        if self.attached and browser is self.browser and context is self.context:
+            self.crashed = True
+            logger.warning("Browser disconnected unexpectedly")
+
+    def record_success(self):
+        self.consecutive_failures = 0
+
+    def record_failure(self, error: Any = None):
+        self.consecutive_failures += 1
+        logger.debug(f"Browser scrape failure #{self.consecutive_failures}: {error}")
+
+    def page_count(self) -> int:
+        try:
+            if self.browser is not None:
+                return sum(len(context.pages) for context in self.browser.contexts)
+            if self.context is not None:
+                return len(self.context.pages)
+            return 0
+        except Exception:
+            return 0
+
+    def recycle_reason(self, now: Optional[float] = None) -> Optional[str]:
+        """Причина пересоздать браузер прямо сейчас или None; проверки памяти не чаще check_interval"""
+        if not self.attached:
+            return None
+        if self.crashed or (self.browser is not None and not self.browser.is_connected()):
+            return 'crashed'
+        if self.consecutive_failures >= self.max_failures:
+            return 'failures'
+
+        now = now or time.time()
+        if now - self.last_check < self.check_interval:
+            return None
+        self.last_check = now
+
+        rss_mb = chromium_rss_bytes() // (1024 * 1024)
+        self.stats["rss_mb"] = rss_mb
+        self.stats["peak_rss_mb"] = max(self.stats["peak_rss_mb"], rss_mb)
+        self.stats["pages"] = self.page_count()
+
+        if self.max_rss_mb and rss_mb > self.max_rss_mb:
+            return 'rss'
+        if self.max_pages and self.stats["pages"] > self.max_pages:
+            return 'pages'
+        if self.max_age_seconds and now - self.started_at > self.max_age_seconds:
+            return 'age'
+        return None
+
+    def record_recycle(self, reason: str, success: bool):
+        if success:
+            self.recycles[reason] += 1
+            self.stats["last_recycle_at"] = time.time()
+            self.stats["last_recycle_reason"] = reason
+        else:
+            self.stats["recycle_failures"] += 1
+
+    def summary(self) -> str:
+        age_minutes = int((time.time() - self.started_at) // 60) if self.attached else 0
+        recycles = ", ".join(f"{reason}: {count}" for reason, count in self.recycles.most_common()) or "нет"
+        return (
+            f"RSS {self.stats['rss_mb']} МБ (пик {self.stats['peak_rss_mb']}, лимит {self.max_rss_mb}), "
+            f"вкладок {self.stats['pages']}, ошибок подряд {self.consecutive_failures}, возраст {age_minutes} мин\n"
+            f"Перезапуски: {recycles}"
+        )
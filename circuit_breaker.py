@@ -0,0 +1,131 @@
+"""
+Предохранитель (circuit breaker) для целей скрапинга: когда browse.wf недоступен, загрузки
+не повторяются каждые 5 секунд, а приостанавливаются с растущей паузой со случайным разбросом.
+После паузы пропускается одна пробная загрузка: успех закрывает предохранитель, ошибка снова открывает.
+
+Состояния: closed (загрузки идут), open (загрузки пропускаются), half_open (идет одна пробная).
+"""
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+def backoff_delay(attempt: int, base: float, maximum: float, jitter: float = 0.5) -> float:
+    """Экспоненциальная пауза для попытки attempt (с 1) со случайным уменьшением до доли jitter"""
+    delay = min(maximum, base * (2 ** max(0, min(attempt - 1, 16))))
+    return delay * (1 - random.uniform(0, jitter))
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, window_seconds: float = 60,
+                 base_delay: float = 15, max_delay: float = 600,
+                 on_transition: Optional[Callable[["CircuitBreaker", str, str, Any], None]] = None):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.window_seconds = window_seconds
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_transition = on_transition
+
+        self.state = CLOSED
+        # Моменты ошибок в пределах окна; порог считается только по ним
+        self.failures: Deque[float] = deque()
+        # Сколько раз подряд предохранитель открывался без успешной пробы - степень паузы
+        self.open_streak = 0
+        self.retry_at = 0.0
+        self.probe_in_flight = False
+        self.last_error: Any = None
+        self.stats: Dict[str, Any] = {"opens": 0, "skipped": 0, "probes": 0, "failed_probes": 0}
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Можно ли загружать цель сейчас; после паузы пропускает ровно одну пробную загрузку"""
+        now = now or time.time()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now >= self.retry_at:
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            self.stats["probes"] += 1
+            return True
+        self.stats["skipped"] += 1
+        return False
+
+    def record_success(self):
+        self.failures.clear()
+        self.open_streak = 0
+        self.last_error = None
+        if self.state != CLOSED:
+            self.probe_in_flight = False
+            self._transition(CLOSED)
+
+    def record_failure(self, error: Any = None, now: Optional[float] = None):
+        now = now or time.time()
+        self.last_error = error
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            self.stats["failed_probes"] += 1
+            self._open(now, error)
+            return
+        if self.state == OPEN:
+            return
+
+        self.failures.append(now)
+        while self.failures and self.failures[0] < now - self.window_seconds:
+            self.failures.popleft()
+        if len(self.failures) >= self.failure_threshold:
+            self._open(now, error)
+
+    def _open(self, now: float, error: Any):
+        self.open_streak += 1
+        self.retry_at = now + backoff_delay(self.open_streak, self.base_delay, self.max_delay)
+        self.failures.clear()
+        self.stats["opens"] += 1
+        self._transition(OPEN, error)
+
+    def _transition(self, state: str, error: Any = None):
+        previous, self.state = self.state, state
+        logger.info(f"Circuit '{self.name}': {previous} -> {state}")
+        if self.on_transition is not None:
+            try:
+                self.on_transition(self, previous, state, error)
+            except Exception as e:
+                logger.warning(f"Circuit transition handler failed: {e}")
+
+    async def call(self, function: Callable[[], Awaitable[Any]], fallback: Callable[[], Any],
+                   succeeded: Callable[[Any], bool], failure_reason: Optional[Callable[[], Any]] = None) -> Any:
+        """Выполняет загрузку через предохранитель; пока он открыт, сразу возвращает fallback().
+
+        failure_reason - причина неудачи для функций, которые не пробрасывают исключения, а возвращают пустой результат.
+        """
+        if not self.allow():
+            return fallback()
+        try:
+            result = await function()
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            # Отмененная проба не должна навсегда занять место пробной загрузки
+            self.probe_in_flight = False
+            raise
+        if succeeded(result):
+            self.record_success()
+        else:
+            self.record_failure(failure_reason() if failure_reason is not None else "empty result")
+        return result
+
+    def seconds_until_retry(self, now: Optional[float] = None) -> float:
+        return max(0.0, self.retry_at - (now or time.time())) if self.state == OPEN else 0.0
+
+    def summary(self) -> str:
+        line = f"{self.name}: {self.state}"
+        if self.state == OPEN:
+            line += f", проба через {self.seconds_until_retry():.0f} с"
+        return line + f" (открывался {self.stats['opens']}, пропущено {self.stats['skipped']})"
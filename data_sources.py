@@ -0,0 +1,190 @@
+"""
+Источники данных с несколькими поставщиками: у каждой ленты (разрывы, арбитраж) упорядоченный список -
+browse.wf, JSON worldstate, локальное зеркало (файл или HTTP).
+
+Запрос "с подстраховкой" (hedged): если основной поставщик не ответил за свой p95, параллельно
+запускается следующий; побеждает первый корректный ответ, остальные запросы отменяются.
+Ошибка или пустой ответ поставщика сразу передают очередь следующему.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from fetcher import http_fetcher
+
+logger = logging.getLogger(__name__)
+
+class DataProvider:
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Any]], window: int = 50):
+        self.name = name
+        self.fetch = fetch
+        # Длительности успешных ответов (мс) - по ним считается дедлайн подстраховки
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.stats: Dict[str, Any] = {"requests": 0, "errors": 0, "invalid": 0, "cancelled": 0}
+
+    def record_latency(self, duration_ms: float):
+        self.latencies.append(duration_ms)
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+class HedgedSource:
+    def __init__(self, feed: str, providers: Sequence[DataProvider], validate: Callable[[Any], bool],
+                 hedge_min_ms: float = 250, hedge_max_ms: float = 8000, default_hedge_ms: float = 3000,
+                 min_samples: int = 5):
+        self.feed = feed
+        self.providers = list(providers)
+        self.validate = validate
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_max_ms = hedge_max_ms
+        # Пока замеров мало, p95 ненадежен: используется фиксированный дедлайн
+        self.default_hedge_ms = default_hedge_ms
+        self.min_samples = min_samples
+        self.wins: Counter = Counter()
+        self.stats: Dict[str, Any] = {"fetches": 0, "hedges": 0, "failovers": 0, "exhausted": 0}
+
+    def hedge_deadline(self, provider: DataProvider) -> float:
+        """Через сколько секунд без ответа поставщика запускать следующего"""
+        p95 = provider.p95() if len(provider.latencies) >= self.min_samples else None
+        deadline_ms = self.default_hedge_ms if p95 is None else p95
+        return min(self.hedge_max_ms, max(self.hedge_min_ms, deadline_ms)) / 1000
+
+    async def fetch(self) -> Optional[Any]:
+        """Первый корректный ответ поставщиков или None, если корректно не ответил никто"""
+        self.stats["fetches"] += 1
+        if len(self.providers) == 1:
+            return await self._fetch_single(self.providers[0])
+
+        waiting = list(self.providers)
+        running: Dict[asyncio.Task, DataProvider] = {}
+        # Дедлайн подстраховки отсчитывается от запуска последнего поставщика
+        hedge_at = 0.0
+
+        def start_next() -> bool:
+            nonlocal hedge_at
+            if not waiting:
+                return False
+            provider = waiting.pop(0)
+            provider.stats["requests"] += 1
+            running[asyncio.create_task(self._timed(provider))] = provider
+            hedge_at = time.monotonic() + self.hedge_deadline(provider)
+            return True
+
+        start_next()
+        try:
+            while running:
+                timeout = max(0.0, hedge_at - time.monotonic()) if waiting else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Дедлайн p95 прошел: подстраховка следующим поставщиком, предыдущий продолжает работу
+                    self.stats["hedges"] += 1
+                    logger.debug(f"{self.feed}: no answer within hedge deadline, starting next provider")
+                    start_next()
+                    continue
+
+                # Разбираются все завершившиеся запросы, а не только первый корректный:
+                # иначе их исключения остались бы непрочитанными, а ошибки не попали бы в статистику
+                winner, winning_result = None, None
+                for task in done:
+                    provider = running.pop(task)
+                    result = self._result_of(task, provider)
+                    if result is not None and winner is None:
+                        winner, winning_result = provider, result
+                if winner is not None:
+                    self.wins[winner.name] += 1
+                    return winning_result
+
+                # Плохой ответ: следующий поставщик запускается сразу, без ожидания дедлайна
+                if start_next():
+                    self.stats["failovers"] += 1
+        finally:
+            for task, provider in running.items():
+                provider.stats["cancelled"] += 1
+                task.cancel()
+
+        self.stats["exhausted"] += 1
+        return None
+
+    async def _fetch_single(self, provider: DataProvider) -> Optional[Any]:
+        provider.stats["requests"] += 1
+        task = asyncio.ensure_future(self._timed(provider))
+        try:
+            await asyncio.wait([task])
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        result = self._result_of(task, provider)
+        if result is None:
+            self.stats["exhausted"] += 1
+        else:
+            self.wins[provider.name] += 1
+        return result
+
+    async def _timed(self, provider: DataProvider):
+        started = time.perf_counter()
+        result = await provider.fetch()
+        return result, (time.perf_counter() - started) * 1000
+
+    def _result_of(self, task: asyncio.Task, provider: DataProvider) -> Optional[Any]:
+        """Корректный результат завершенного запроса (с учетом его длительности) или None"""
+        error = task.exception()
+        if error is not None:
+            provider.stats["errors"] += 1
+            logger.warning(f"{self.feed}: provider {provider.name} failed: {error}")
+            return None
+        result, duration_ms = task.result()
+        if result is None or not self.validate(result):
+            provider.stats["invalid"] += 1
+            return None
+        provider.record_latency(duration_ms)
+        return result
+
+    def summary(self) -> str:
+        parts = []
+        for provider in self.providers:
+            p95 = provider.p95()
+            latency = f"p95 {p95:.0f} мс" if p95 is not None else "нет замеров"
+            parts.append(f"{provider.name} {self.wins[provider.name]} ({latency})")
+        return (
+            f"{self.feed}: {', '.join(parts)}; подстраховок {self.stats['hedges']}, "
+            f"переключений {self.stats['failovers']}, без ответа {self.stats['exhausted']}"
+        )
+
+def parse_source_list(value: str, known: Sequence[str]) -> List[str]:
+    """Список поставщиков из настройки ("browse,worldstate,mirror"): неизвестные и повторы пропускаются"""
+    names = []
+    for name in (part.strip().lower() for part in value.split(',')):
+        if not name or name in names:
+            continue
+        if name not in known:
+            logger.warning(f"Unknown data source '{name}', skipping")
+            continue
+        names.append(name)
+    return names
+
+async def read_source_text(location: str) -> Optional[str]:
+    """Текст по адресу зеркала: http(s) - через общий пул соединений, иначе локальный файл (путь или file://)"""
+    if location.startswith(('http://', 'https://')):
+        result = await http_fetcher.fetch_text(location)
+        if not result or result[0] != 200:
+            return None
+        return result[1]
+
+    path = url2pathname(urlparse(location).path) if location.startswith('file://') else location
+    if not os.path.exists(path):
+        logger.warning(f"Mirror file not found: {path}")
+        return None
+    return await asyncio.to_thread(_read_file, path)
+
+def _read_file(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
@@ -0,0 +1,67 @@
+"""
+Извлечение таблиц разрывов и лога арбитражей прямо в странице через page.evaluate
+"""
+from typing import Any, Dict, List, Optional
+
+# Возвращает компактные строки [реликвия, тип, таймер, data-expiry, локация] для каждой таблицы
+# (null, если таблица с таким заголовком не найдена). Логика повторяет extract_fissure_table_rows().
+FISSURE_EXTRACTOR_JS = """
+() => {
+  const text = (el) => el ? el.textContent.trim() : null;
+  const findTable = (title) => {
+    for (const h4 of document.querySelectorAll('h4')) {
+      if (!h4.textContent.includes(title)) continue;
+      let el = h4.nextElementSibling;
+      while (el && el.tagName !== 'TABLE') el = el.nextElementSibling;
+      if (el) return el;
+    }
+    return null;
+  };
+  const readRows = (table) => {
+    if (!table) return null;
+    const rows = [];
+    let relic = 'N/A';
+    for (const tr of table.querySelectorAll('tr')) {
+      const th = tr.querySelector('th');
+      if (th && th.textContent.trim()) relic = th.textContent.trim();
+      const td = tr.querySelector('td');
+      if (!td) continue;
+      const badge = td.querySelector('span.badge');
+      let location = null;
+      for (const span of td.querySelectorAll('span')) {
+        if (!span.getAttribute('class') && !span.getAttribute('data-expiry')) { location = text(span); break; }
+      }
+      rows.push([relic, text(td.querySelector('b')), text(badge), badge ? badge.getAttribute('data-expiry') : null, location]);
+    }
+    return rows;
+  };
+  return {
+    normal: readRows(findTable('Void Fissures (Normal)')),
+    steel: readRows(findTable('Steel Path Fissures'))
+  };
+}
+"""
+
+# Возвращает пары [data-timestamp, текст] из div#log (null, если лога нет)
+ARBITRATION_EXTRACTOR_JS = """
+() => {
+  const log = document.querySelector('div#log');
+  if (!log) return null;
+  return Array.from(
+    log.querySelectorAll('b[data-timestamp], span[data-timestamp]'),
+    (el) => [el.getAttribute('data-timestamp'), el.textContent.trim()]
+  );
+}
+"""
+
+async def extract_fissure_rows(page) -> Optional[Dict[str, Optional[List[List[Any]]]]]:
+    """Запускает экстрактор разрывов в странице; None, если таблицы по заголовкам не найдены"""
+    tables = await page.evaluate(FISSURE_EXTRACTOR_JS)
+    if not tables or (tables.get('normal') is None and tables.get('steel') is None):
+        return None
+    return tables
+
+async def extract_arbitration_entries(page) -> Optional[List[List[Any]]]:
+    """Запускает экстрактор лога арбитражей в странице; None, если div#log пуст или отсутствует"""
+    entries = await page.evaluate(ARBITRATION_EXTRACTOR_JS)
+    return entries or None
@@ -0,0 +1,75 @@
+"""
+Лёгкий HTTP-загрузчик страниц browse.wf с пулом соединений (без Chromium)
+"""
+import aiohttp
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Referer': 'https://browse.wf/',
+    'DNT': '1'
+}
+
+class HttpFetcher:
+    def __init__(self, timeout: float = 5.0, pool_size: int = 4):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.session_lock = asyncio.Lock()
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "errors": 0,
+            "bytes": 0,
+            "last_duration_ms": 0
+        }
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Возвращает общую сессию, создавая её при первом обращении"""
+        async with self.session_lock:
+            if self.session is None or self.session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                )
+                self.session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers=DEFAULT_HEADERS,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                )
+            return self.session
+
+    async def fetch_text(self, url: str) -> Optional[Tuple[int, str]]:
+        """Загружает страницу и возвращает (статус, текст) или None при ошибке сети"""
+        session = await self.get_session()
+        started = time.perf_counter()
+        self.stats["requests"] += 1
+
+        try:
+            async with session.get(url) as response:
+                text = await response.text()
+                self.stats["bytes"] += len(text)
+                return response.status, text
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats["errors"] += 1
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            return None
+        finally:
+            self.stats["last_duration_ms"] = int((time.perf_counter() - started) * 1000)
+
+    async def close(self):
+        """Закрывает сессию и освобождает соединения пула"""
+        async with self.session_lock:
+            if self.session and not self.session.closed:
+                await self.session.close()
+            self.session = None
+
+# Синглтон экземпляр
+http_fetcher = HttpFetcher()
@@ -0,0 +1,77 @@
+"""
+Отпечатки (blake2b) сырых участков страниц: если таблицы разрывов или лог арбитражей не менялись,
+разбор, сравнение и перерисовка пропускаются
+"""
+import json
+import re
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
+
+FISSURE_TITLES = ('Void Fissures (Normal)', 'Steel Path Fissures')
+LOG_MARKER_RE = re.compile(r"""id=["']?log["'\s>]""")
+
+# Текст таймера тикает каждую секунду и в отпечаток не входит (data-expiry остается)
+BADGE_TEXT_RE = re.compile(r"""(<span[^>]*class=["'][^"']*\bbadge\b[^>]*>)[^<]*(</span>)""")
+
+def digest(data: str) -> str:
+    return blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+def fissure_html_region(html: str) -> Optional[str]:
+    """Вырезает из HTML участок от заголовка обычных разрывов до конца таблицы Стального Пути"""
+    positions = [html.find(title) for title in FISSURE_TITLES]
+    found = [position for position in positions if position >= 0]
+    if not found:
+        return None
+
+    # Участок начинается с самого тега <h4>, чтобы его можно было разобрать отдельно
+    start = html.rfind('<h4', 0, min(found))
+    if start < 0:
+        start = min(found)
+    end = html.find('</table>', max(found))
+    if end < 0:
+        return None
+    return html[start:end + len('</table>')]
+
+def arbitration_html_region(html: str) -> Optional[str]:
+    """Вырезает из HTML участок, начиная с div#log (лог - последний крупный блок страницы)"""
+    match = LOG_MARKER_RE.search(html)
+    if match is None:
+        return None
+    marker = match.start()
+    start = html.rfind('<div', 0, marker)
+    return html[start if start >= 0 else marker:]
+
+def fissure_region_digest(region: str) -> str:
+    return digest(BADGE_TEXT_RE.sub(r'\1\2', region))
+
+def fissure_rows_digest(tables: Dict[str, Optional[List[List[Any]]]]) -> str:
+    """Отпечаток строк из page.evaluate без текста таймера (индекс 2)"""
+    stable = {
+        name: [row[:2] + row[3:] for row in rows] if rows is not None else None
+        for name, rows in sorted(tables.items())
+    }
+    return digest(json.dumps(stable, ensure_ascii=False, separators=(',', ':')))
+
+def arbitration_entries_digest(entries: List[List[Any]]) -> str:
+    return digest(json.dumps(entries, ensure_ascii=False, separators=(',', ':')))
+
+class RegionFingerprints:
+    def __init__(self):
+        # ключ участка -> (отпечаток, результат разбора)
+        self.entries: Dict[str, Tuple[str, Any]] = {}
+
+    def lookup(self, key: str, fingerprint: str) -> Optional[Any]:
+        """Результат прошлого разбора, если отпечаток участка не изменился"""
+        entry = self.entries.get(key)
+        if entry and entry[0] == fingerprint:
+            return entry[1]
+        return None
+
+    def store(self, key: str, fingerprint: str, value: Any):
+        self.entries[key] = (fingerprint, value)
+
+    def clear(self):
+        self.entries.clear()
+
+# Синглтон экземпляр
+region_fingerprints = RegionFingerprints()
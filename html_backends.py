@@ -0,0 +1,444 @@
+"""
+Бэкенды разбора HTML browse.wf: BeautifulSoup (html.parser / lxml / SoupStrainer) и чистый lxml с XPath.
+Все бэкенды возвращают одинаковые сырые строки, которые дальше разбирает parse_fissure_rows / parse_arbitration_entries.
+"""
+import logging
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+import lxml.html
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# (реликвия, тип миссии, таймер, data-expiry, локация)
+FissureRow = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]
+FissureTables = Dict[str, Optional[List[FissureRow]]]
+# (data-timestamp, текст записи)
+ArbitrationEntry = Tuple[str, str]
+
+NORMAL_TITLE = "Void Fissures (Normal)"
+STEEL_PATH_TITLE = "Steel Path Fissures"
+VOID_STORMS_TITLE = "Void Storms (Railjack)"
+
+RELIC_MARKERS = ('Lith', 'Meso', 'Neo', 'Axi', 'Requiem', 'Omnia')
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Метки таблиц страницы /live
+NORMAL, STEEL_PATH, VOID_STORMS = 'normal', 'steel', 'storms'
+WANTED_LABELS = (NORMAL, STEEL_PATH)
+
+def label_from_heading(heading_text: str) -> Optional[str]:
+    if NORMAL_TITLE in heading_text:
+        return NORMAL
+    if STEEL_PATH_TITLE in heading_text:
+        return STEEL_PATH
+    if 'Void Storm' in heading_text:
+        return VOID_STORMS
+    return None
+
+def label_from_cells(header_texts: List[str], cell_text: str, attributes: str) -> Optional[str]:
+    """Метка таблицы без заголовка: по ячейкам-заголовкам (реликвии) и тексту таблицы"""
+    if 'Railjack' in cell_text or 'Void Storm' in cell_text:
+        return VOID_STORMS
+    if 'Steel Path' in cell_text or 'SP-' in cell_text or 'sp-fissures' in attributes.lower():
+        return STEEL_PATH
+    if any(text.startswith(RELIC_MARKERS) for text in header_texts):
+        return NORMAL
+    return None
+
+class TablePathCache:
+    """Структурные пути найденных таблиц: следующие циклы идут сразу к нужному узлу"""
+
+    def __init__(self):
+        self.paths: Dict[str, Any] = {}
+        self.stats: Dict[str, int] = {"path_hits": 0, "scans": 0}
+
+    def clear(self):
+        self.paths.clear()
+
+# =================================================================
+# BeautifulSoup
+# =================================================================
+
+def soup_table_heading(table: Tag) -> Optional[str]:
+    """Текст ближайшего заголовка перед таблицей: у самой таблицы или у ее предков"""
+    element = table
+    while element is not None and element.name not in ('body', '[document]'):
+        previous = element.find_previous_sibling(HEADING_TAGS + ('table',))
+        if previous is not None:
+            # Между заголовком и таблицей другая таблица - заголовок относится к ней
+            return previous.text.strip() if previous.name != 'table' else None
+        element = element.parent
+    return None
+
+def classify_soup_table(table: Tag) -> Optional[str]:
+    heading = soup_table_heading(table)
+    label = label_from_heading(heading) if heading else None
+    if label:
+        return label
+    header_texts = [th.text.strip() for th in table.find_all('th')]
+    attributes = ' '.join(str(table.get(name, '')) for name in ('id', 'class'))
+    return label_from_cells(header_texts, table.get_text(' '), attributes)
+
+def soup_path(element: Tag) -> List[int]:
+    """Путь от корня как индексы среди дочерних элементов"""
+    path = []
+    while element.parent is not None:
+        siblings = [child for child in element.parent.children if isinstance(child, Tag)]
+        path.append(next(i for i, child in enumerate(siblings) if child is element))
+        element = element.parent
+    return path[::-1]
+
+def resolve_soup_path(soup: BeautifulSoup, path: List[int]) -> Optional[Tag]:
+    element = soup
+    for index in path:
+        children = [child for child in element.children if isinstance(child, Tag)]
+        if index >= len(children):
+            return None
+        element = children[index]
+    return element
+
+def find_fissure_tables(soup: BeautifulSoup, cache: Optional[TablePathCache] = None) -> Tuple[Optional[Tag], Optional[Tag]]:
+    """Находит таблицы обычных разрывов и разрывов Стального Пути за один проход по таблицам."""
+    found: Dict[str, Tag] = {}
+
+    # Сначала пробуем пути прошлого цикла, проверяя, что по ним лежит таблица с той же меткой
+    if cache and cache.paths:
+        for label, path in cache.paths.items():
+            table = resolve_soup_path(soup, path)
+            if table is not None and table.name == 'table' and classify_soup_table(table) == label:
+                found[label] = table
+        if all(label in found for label in WANTED_LABELS):
+            cache.stats["path_hits"] += 1
+            return found[NORMAL], found[STEEL_PATH]
+        found.clear()
+
+    for table in soup.find_all('table'):
+        label = classify_soup_table(table)
+        if label in WANTED_LABELS and label not in found:
+            found[label] = table
+            if all(wanted in found for wanted in WANTED_LABELS):
+                break
+
+    if cache is not None:
+        cache.stats["scans"] += 1
+        cache.paths = {label: soup_path(table) for label, table in found.items()}
+    logger.info(f"Fissure tables located by scan: {sorted(found)}")
+    return found.get(NORMAL), found.get(STEEL_PATH)
+
+def extract_fissure_table_rows(table: Tag) -> List[FissureRow]:
+    """Достает из таблицы сырые строки: (реликвия, тип миссии, таймер, data-expiry, локация)."""
+    rows_data = []
+    last_relic_type = "N/A"
+
+    for row in table.find_all('tr'):
+        relic_th = row.find('th')
+        if relic_th and relic_th.text.strip():
+            last_relic_type = relic_th.text.strip()
+
+        mission_td = row.find('td')
+        if not mission_td:
+            continue
+
+        mission_type_tag = mission_td.find('b')
+        expiry_span = mission_td.find('span', class_='badge')
+
+        # Ищем span без классов (обычно содержит уровень и локацию)
+        location_span = None
+        for span in mission_td.find_all('span'):
+            if not span.get('class') and not span.get('data-expiry'):
+                location_span = span
+                break
+
+        rows_data.append((
+            last_relic_type,
+            mission_type_tag.text.strip() if mission_type_tag else None,
+            expiry_span.text.strip() if expiry_span else None,
+            expiry_span.get('data-expiry') if expiry_span else None,
+            location_span.text.strip() if location_span else None
+        ))
+
+    return rows_data
+
+def read_arbitration_log(soup: BeautifulSoup) -> List[ArbitrationEntry]:
+    """Записи div#log с data-timestamp в порядке документа."""
+    log_div = soup.find('div', id='log')
+    if not log_div:
+        return []
+    return [(tag.attrs['data-timestamp'], tag.text.strip())
+            for tag in log_div.find_all(['b', 'span'], attrs={'data-timestamp': True})]
+
+class SoupBackend:
+    def __init__(self, name: str, features: str, strained: bool = False):
+        self.name = name
+        self.features = features
+        # SoupStrainer строит дерево только из нужных элементов вместо всего документа
+        self.strained = strained
+        self.table_paths = TablePathCache()
+
+    def fissure_tables(self, html: str) -> Optional[FissureTables]:
+        parse_only = SoupStrainer(['h4', 'table']) if self.strained else None
+        soup = BeautifulSoup(html, self.features, parse_only=parse_only)
+        normal_table, sp_table = find_fissure_tables(soup, self.table_paths)
+        if normal_table is None and sp_table is None:
+            return None
+        return {
+            "normal": extract_fissure_table_rows(normal_table) if normal_table is not None else None,
+            "steel": extract_fissure_table_rows(sp_table) if sp_table is not None else None
+        }
+
+    def arbitration_entries(self, html: str) -> Optional[List[ArbitrationEntry]]:
+        parse_only = SoupStrainer('div', id='log') if self.strained else None
+        soup = BeautifulSoup(html, self.features, parse_only=parse_only)
+        return read_arbitration_log(soup) or None
+
+# =================================================================
+# lxml + XPath
+# =================================================================
+
+BADGE_XPATH = ".//span[contains(concat(' ', normalize-space(@class), ' '), ' badge ')]"
+
+def _text(element) -> str:
+    return element.text_content().strip()
+
+def lxml_table_heading(table) -> Optional[str]:
+    """Текст ближайшего заголовка перед таблицей: у самой таблицы или у ее предков"""
+    element = table
+    while element is not None and element.tag != 'body':
+        for previous in element.itersiblings(preceding=True):
+            if previous.tag in HEADING_TAGS:
+                return _text(previous)
+            if previous.tag == 'table':
+                return None
+        element = element.getparent()
+    return None
+
+def classify_lxml_table(table) -> Optional[str]:
+    heading = lxml_table_heading(table)
+    label = label_from_heading(heading) if heading else None
+    if label:
+        return label
+    header_texts = [_text(th) for th in table.iterfind('.//th')]
+    attributes = ' '.join(table.get(name, '') for name in ('id', 'class'))
+    return label_from_cells(header_texts, ' '.join(table.itertext()), attributes)
+
+class LxmlBackend:
+    name = 'lxml'
+
+    def __init__(self):
+        self.table_paths = TablePathCache()
+
+    def _find_tables(self, document) -> Tuple[Any, Any]:
+        """Один проход по таблицам с классификацией; XPath победителей кэшируется между циклами"""
+        found: Dict[str, Any] = {}
+        cache = self.table_paths
+
+        if cache.paths:
+            for label, path in cache.paths.items():
+                candidates = document.xpath(path)
+                if candidates and candidates[0].tag == 'table' and classify_lxml_table(candidates[0]) == label:
+                    found[label] = candidates[0]
+            if all(label in found for label in WANTED_LABELS):
+                cache.stats["path_hits"] += 1
+                return found[NORMAL], found[STEEL_PATH]
+            found.clear()
+
+        for table in document.iterfind('.//table'):
+            label = classify_lxml_table(table)
+            if label in WANTED_LABELS and label not in found:
+                found[label] = table
+                if all(wanted in found for wanted in WANTED_LABELS):
+                    break
+
+        cache.stats["scans"] += 1
+        tree = document.getroottree()
+        cache.paths = {label: tree.getpath(table) for label, table in found.items()}
+        logger.info(f"Fissure tables located by scan: {sorted(found)}")
+        return found.get(NORMAL), found.get(STEEL_PATH)
+
+    def _document(self, html: str):
+        try:
+            return lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            return None
+
+    def _rows(self, table) -> List[FissureRow]:
+        rows_data = []
+        last_relic_type = "N/A"
+
+        for row in table.iterfind('.//tr'):
+            relic_th = row.find('.//th')
+            if relic_th is not None and _text(relic_th):
+                last_relic_type = _text(relic_th)
+
+            mission_td = row.find('.//td')
+            if mission_td is None:
+                continue
+
+            mission_type_tag = mission_td.find('.//b')
+            badges = mission_td.xpath(BADGE_XPATH)
+            expiry_span = badges[0] if badges else None
+
+            location_span = None
+            for span in mission_td.iterfind('.//span'):
+                if not span.get('class', '').split() and not span.get('data-expiry'):
+                    location_span = span
+                    break
+
+            rows_data.append((
+                last_relic_type,
+                _text(mission_type_tag) if mission_type_tag is not None else None,
+                _text(expiry_span) if expiry_span is not None else None,
+                expiry_span.get('data-expiry') if expiry_span is not None else None,
+                _text(location_span) if location_span is not None else None
+            ))
+
+        return rows_data
+
+    def fissure_tables(self, html: str) -> Optional[FissureTables]:
+        document = self._document(html)
+        if document is None:
+            return None
+
+        normal_table, sp_table = self._find_tables(document)
+
+        if normal_table is None and sp_table is None:
+            return None
+        return {
+            "normal": self._rows(normal_table) if normal_table is not None else None,
+            "steel": self._rows(sp_table) if sp_table is not None else None
+        }
+
+    def arbitration_entries(self, html: str) -> Optional[List[ArbitrationEntry]]:
+        document = self._document(html)
+        if document is None:
+            return None
+        log_divs = document.xpath("//div[@id='log']")
+        if not log_divs:
+            return None
+        entries = [(tag.get('data-timestamp'), _text(tag))
+                   for tag in log_divs[0].xpath(".//*[self::b or self::span][@data-timestamp]")]
+        return entries or None
+
+# =================================================================
+# Выбор бэкенда и режим сравнения
+# =================================================================
+
+BACKENDS = {
+    'html.parser': SoupBackend('html.parser', 'html.parser'),
+    'bs4-lxml': SoupBackend('bs4-lxml', 'lxml'),
+    'bs4-strainer': SoupBackend('bs4-strainer', 'lxml', strained=True),
+    'lxml': LxmlBackend()
+}
+
+class ComparingBackend:
+    """Прогоняет HTML через все бэкенды, сверяет результаты и замеряет время и пиковую память каждого.
+
+    Расхождение не вызывает исключение (assert), а пишется в лог и счетчик mismatches: режим сверки
+    включают на работающем боте, и падение разбора оставило бы каналы без разрывов и арбитража.
+    Бот всегда получает результат основного бэкенда (primary).
+    """
+
+    name = 'compare'
+
+    # tracemalloc глобален для процесса: два замера одновременно (PARSE_WORKERS>1) мешали бы друг другу
+    _measure_lock = threading.Lock()
+
+    def __init__(self, primary: str = 'html.parser'):
+        self.primary = primary
+        self.stats: Dict[str, Dict[str, Any]] = {
+            name: {"runs": 0, "total_ms": 0.0, "peak_kb": 0} for name in BACKENDS
+        }
+        self.mismatches = 0
+
+    def measure(self, method: str, html: str) -> Tuple[Any, Dict[str, Tuple[float, int]], List[str]]:
+        """Результат основного бэкенда, замеры {бэкенд: (мс, пик КБ)} и бэкенды с расхождениями.
+
+        Время и память замеряются отдельными проходами: под tracemalloc разбор заметно медленнее.
+        В режиме потоков пик памяти включает выделения других потоков (цикла событий) за время прохода.
+        """
+        results = {}
+        measurements = {}
+        with self._measure_lock:
+            for name, backend in BACKENDS.items():
+                started = time.perf_counter()
+                results[name] = getattr(backend, method)(html)
+                measurements[name] = ((time.perf_counter() - started) * 1000, 0)
+
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start()
+            try:
+                for name, backend in BACKENDS.items():
+                    tracemalloc.reset_peak()
+                    baseline, _ = tracemalloc.get_traced_memory()
+                    getattr(backend, method)(html)
+                    _, peak = tracemalloc.get_traced_memory()
+                    measurements[name] = (measurements[name][0], max(0, peak - baseline) // 1024)
+            finally:
+                if not was_tracing:
+                    tracemalloc.stop()
+
+        expected = results[self.primary]
+        mismatched = [name for name, result in results.items() if result != expected]
+        return expected, measurements, mismatched
+
+    def record(self, method: str, measurements: Dict[str, Tuple[float, int]], mismatched: List[str]):
+        """Учитывает замеры одного прогона (в режиме процессов они приходят из рабочего процесса)"""
+        for name, (elapsed_ms, peak_kb) in measurements.items():
+            stats = self.stats[name]
+            stats["runs"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["peak_kb"] = max(stats["peak_kb"], peak_kb)
+        for name in mismatched:
+            self.mismatches += 1
+            logger.warning(f"Parser backend '{name}' differs from '{self.primary}' in {method}")
+
+    def _run_all(self, method: str, html: str) -> Any:
+        expected, measurements, mismatched = self.measure(method, html)
+        self.record(method, measurements, mismatched)
+        return expected
+
+    def fissure_tables(self, html: str) -> Optional[FissureTables]:
+        return self._run_all('fissure_tables', html)
+
+    def arbitration_entries(self, html: str) -> Optional[List[ArbitrationEntry]]:
+        return self._run_all('arbitration_entries', html)
+
+    def summary(self) -> str:
+        lines = []
+        for name, stats in self.stats.items():
+            if stats["runs"]:
+                lines.append(f"{name}: {stats['total_ms'] / stats['runs']:.1f} мс, пик {stats['peak_kb']} КБ")
+        lines.append(f"Расхождений с {self.primary}: {self.mismatches}")
+        return "\n".join(lines)
+
+# Один экземпляр сверки на процесс: его статистика накапливается между вызовами
+_comparing_backend: Optional[ComparingBackend] = None
+
+def get_backend(name: str):
+    """Бэкенд по имени из настроек; 'compare' - режим сверки всех бэкендов"""
+    global _comparing_backend
+    if name == 'compare':
+        if _comparing_backend is None:
+            _comparing_backend = ComparingBackend()
+        return _comparing_backend
+    if name not in BACKENDS:
+        logger.warning(f"Unknown parser backend '{name}', using lxml")
+        return BACKENDS['lxml']
+    return BACKENDS[name]
+
+# Точки входа для пула процессов (parse_executor): бэкенд с его кэшем путей живет в рабочем процессе
+def fissure_tables_with(name: str, html: str) -> Optional[FissureTables]:
+    return get_backend(name).fissure_tables(html)
+
+def arbitration_entries_with(name: str, html: str) -> Optional[List[ArbitrationEntry]]:
+    return get_backend(name).arbitration_entries(html)
+
+def compare_with(method: str, html: str) -> Tuple[Any, Dict[str, Tuple[float, int]], List[str]]:
+    """Сверка в рабочем процессе: замеры возвращаются в процесс бота вместе с результатом"""
+    return get_backend('compare').measure(method, html)
@@ -0,0 +1,129 @@
+"""
+Долгоживущие страницы Playwright с MutationObserver: браузер сам сообщает об изменениях DOM
+"""
+import asyncio
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+BINDING_NAME = '__wfDomChanged'
+
+# Наблюдатель за DOM. Тикающие таймеры (.badge) меняются каждую секунду и не считаются изменением,
+# пачки мутаций склеиваются в одно уведомление за debounce_ms.
+OBSERVER_SCRIPT = """
+(() => {
+  const debounceMs = %d;
+  let pending = false;
+  const notify = () => {
+    if (pending) return;
+    pending = true;
+    setTimeout(() => { pending = false; window.%s(); }, debounceMs);
+  };
+  const relevant = (mutation) => {
+    const el = mutation.target.nodeType === 1 ? mutation.target : mutation.target.parentElement;
+    return !!el && !el.closest('.badge');
+  };
+  const observer = new MutationObserver((mutations) => {
+    if (mutations.some(relevant)) notify();
+  });
+  const start = () => {
+    observer.observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['data-expiry', 'data-timestamp']});
+    notify();
+  };
+  if (document.body) start(); else document.addEventListener('DOMContentLoaded', start);
+})();
+"""
+
+class LivePage:
+    def __init__(self, url: str, manager: 'LivePageManager'):
+        self.url = url
+        self.manager = manager
+        self.page = None
+        self.context = None
+        self.opened_at = 0.0
+        self.version = 0
+        self.last_change_time = 0.0
+
+    def is_open(self, context) -> bool:
+        """Проверяет, что страница жива и принадлежит текущему контексту браузера"""
+        return self.page is not None and not self.page.is_closed() and self.context is context
+
+    async def open(self, context):
+        """Открывает страницу один раз и подключает наблюдатель за DOM"""
+        await self.close()
+
+        page = await context.new_page()
+        try:
+            await page.expose_binding(BINDING_NAME, self._on_dom_changed)
+            await page.add_init_script(OBSERVER_SCRIPT % (self.manager.debounce_ms, BINDING_NAME))
+            await page.goto(self.url, wait_until="domcontentloaded", timeout=15000)
+        except Exception:
+            await page.close()
+            raise
+
+        self.page = page
+        self.context = context
+        self.opened_at = time.time()
+        logger.info(f"Live page opened: {self.url}")
+
+    def _on_dom_changed(self, source):
+        self.version += 1
+        self.last_change_time = time.time()
+        self.manager.changed.set()
+
+    async def close(self):
+        if self.page and not self.page.is_closed():
+            try:
+                await self.page.close()
+            except Exception:
+                pass
+        self.page = None
+        self.context = None
+
+class LivePageManager:
+    def __init__(self, reload_interval: float = 1800, debounce_ms: int = 250):
+        self.reload_interval = reload_interval
+        self.debounce_ms = debounce_ms
+        self.pages: Dict[str, LivePage] = {}
+        self.changed = asyncio.Event()
+        self.lock = asyncio.Lock()
+
+    async def get(self, url: str, context) -> LivePage:
+        """Возвращает открытую страницу для URL, при необходимости (пере)открывая её"""
+        async with self.lock:
+            live_page = self.pages.get(url)
+            if live_page is None:
+                live_page = LivePage(url, self)
+                self.pages[url] = live_page
+
+            # Периодическая перезагрузка на случай зависшего SPA или утечек памяти вкладки
+            expired = time.time() - live_page.opened_at > self.reload_interval
+            if not live_page.is_open(context) or expired:
+                await live_page.open(context)
+
+            return live_page
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """Ждет уведомления от любой страницы; False - если истек таймаут"""
+        try:
+            await asyncio.wait_for(self.changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.changed.clear()
+
+    def open_count(self) -> int:
+        """Количество открытых живых вкладок (учитывается при поиске утекших страниц)"""
+        return sum(1 for live_page in self.pages.values() if live_page.page is not None and not live_page.page.is_closed())
+
+    async def close_all(self):
+        async with self.lock:
+            for live_page in self.pages.values():
+                await live_page.close()
+            self.pages.clear()
+
+# Синглтон экземпляр
+live_pages = LivePageManager()
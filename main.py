@@ -4,12 +4,13 @@ import discord
 from discord.ext import commands, tasks
 import json
 import time
-import threading
 import re
 import asyncio
-import copy
+import bisect
 import os
-from typing import Dict, Any, List, Optional, Tuple
+import sys
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 from cachetools import TTLCache
@@ -22,6 +23,72 @@ from bs4 import BeautifulSoup, Tag
 # Импорт health сервера
 from health_check import health_server
 
+# Импорт лёгкого HTTP-загрузчика
+from fetcher import http_fetcher
+
+# Импорт источников данных с несколькими поставщиками и подстраховкой
+from data_sources import DataProvider, HedgedSource, parse_source_list, read_source_text
+
+# Импорт живых страниц с MutationObserver
+from live_pages import live_pages
+
+# Импорт извлечения данных внутри страницы
+from extraction import extract_fissure_rows, extract_arbitration_entries
+
+# Импорт планировщика скрапинга по дедлайнам
+from scheduler import ScrapeScheduler
+
+# Импорт ограничителя параллельных вкладок браузера
+from browser_slots import BrowserSlots
+
+# Импорт пула переиспользуемых вкладок
+from page_pool import PagePool
+
+# Импорт фильтра запросов браузера
+from request_router import RequestRouter, DEFAULT_ALLOWED_TYPES, DEFAULT_ALLOWED_HOSTS
+
+# Импорт ожидания готовности контента
+from readiness import ReadinessWaiter, FISSURE_READY_SELECTOR, ARBITRATION_READY_SELECTOR
+
+# Импорт бэкендов разбора HTML
+from html_backends import (
+    get_backend, extract_fissure_table_rows, read_arbitration_log,
+    fissure_tables_with, arbitration_entries_with, compare_with
+)
+
+# Импорт наблюдения за памятью и падениями браузера
+from browser_supervisor import BrowserSupervisor
+
+# Импорт постоянного профиля браузера на диске
+from browser_profile import create_profile
+
+# Импорт предохранителя и экспоненциальной паузы для недоступного сайта
+from circuit_breaker import CircuitBreaker, backoff_delay, OPEN, HALF_OPEN, CLOSED
+
+# Импорт пула разбора HTML вне цикла событий
+from parse_executor import ParseExecutor
+
+# Импорт разбора текстов (таймеры, локации, строки лога)
+from text_parsing import (
+    parse_time_to_seconds, parse_fissure_location, tokenize_arbitration_line, format_msk_hhmm,
+    parse_expiry_attribute, ExpiryStabilizer
+)
+
+# Импорт отпечатков сырых участков страниц
+from fingerprint import (
+    region_fingerprints, digest, fissure_html_region, arbitration_html_region,
+    fissure_region_digest, fissure_rows_digest, arbitration_entries_digest
+)
+
+# Импорт неизменяемых записей миссий
+from records import FissureRecord, ArbitrationMission
+
+# Импорт раздельного режима: скрапер в отдельном процессе, состояние по Unix-сокету
+from scraper_ipc import StatePublisher, StateSubscriber, ScraperProcess, scraper_argv, decode_section, decode_missions
+
+# Импорт единого хранилища состояния миссий
+from mission_state import mission_state, FissureAdded, FissureExpired, FissureChanged
+
 # Загрузка переменных окружения
 from dotenv import load_dotenv
 load_dotenv()
@@ -43,12 +110,100 @@ FISSURE_URL = 'https://browse.wf/live'
 
 CONFIG_FILE = 'config.json'
 SCRAPE_INTERVAL_SECONDS = 5  # Быстрый интервал проверк
+# Максимальная пауза между проверками, когда данные долго не меняются (экспоненциальный откат)
+SCRAPE_MAX_INTERVAL_SECONDS = int(os.getenv('SCRAPE_MAX_INTERVAL_SECONDS', '60'))
 MISSION_UPDATE_INTERVAL_SECONDS = 30  # Интервал принудительного обновления
 MAX_FIELD_LENGTH = 1000
 
+# --- HTTP БЕЗ БРАУЗЕРА ---
+# Сначала пробуем обычный HTTP-запрос, Chromium - только если в ответе нет данных
+HTTP_FAST_PATH_ENABLED = os.getenv('HTTP_FAST_PATH', '1') != '0'
+# Через сколько секунд снова пробовать HTTP после ответа без таблиц/лога
+HTTP_FAST_PATH_RETRY_SECONDS = 600
+
+# --- ПРЕДОХРАНИТЕЛЬ ---
+# Сколько неудачных загрузок цели за окно открывают предохранитель (загрузки приостанавливаются)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))
+CIRCUIT_WINDOW_SECONDS = float(os.getenv('CIRCUIT_WINDOW_SECONDS', '60'))
+# Пауза до пробной загрузки удваивается после каждой неудачной пробы (со случайным разбросом)
+CIRCUIT_BASE_DELAY_SECONDS = float(os.getenv('CIRCUIT_BASE_DELAY_SECONDS', '15'))
+CIRCUIT_MAX_DELAY_SECONDS = float(os.getenv('CIRCUIT_MAX_DELAY_SECONDS', '600'))
+
+# --- ИСТОЧНИКИ ДАННЫХ ---
+# Упорядоченные списки поставщиков лент: browse (browse.wf), worldstate (JSON), mirror (файл или HTTP-зеркало страницы)
+FISSURE_SOURCES = os.getenv('FISSURE_SOURCES', 'browse')
+ARBITRATION_SOURCES = os.getenv('ARBITRATION_SOURCES', 'browse')
+# worldstate: JSON мира и (для названий нод) карта регионов; арбитражи - строки "timestamp,SolNode" или JSON-список
+WORLDSTATE_URL = os.getenv('WORLDSTATE_URL', 'https://content.warframe.com/dynamic/worldState.php')
+WORLDSTATE_REGIONS_URL = os.getenv('WORLDSTATE_REGIONS_URL', '')
+ARBYS_URL = os.getenv('ARBYS_URL', '')
+# mirror: путь к файлу, file:// или http(s)-адрес с копией страницы browse.wf
+FISSURE_MIRROR = os.getenv('FISSURE_MIRROR', '')
+ARBITRATION_MIRROR = os.getenv('ARBITRATION_MIRROR', '')
+# Границы дедлайна подстраховки (p95 времени ответа поставщика)
+HEDGE_MIN_MS = int(os.getenv('HEDGE_MIN_MS', '250'))
+HEDGE_MAX_MS = int(os.getenv('HEDGE_MAX_MS', '8000'))
+
+# --- ПЕРЕХВАТ JSON ---
+# Забираем JSON, из которого browse.wf строит таблицы, вместо разбора отрендеренного HTML
+JSON_CAPTURE_ENABLED = os.getenv('JSON_CAPTURE', '1') != '0'
+# Подстроки URL ответов, которые стоит перехватывать (worldstate, регионы, словарь, арбитражи)
+JSON_CAPTURE_URL_HINTS = ('worldstate', 'exportregions', 'dict.en', 'arbys')
+
+# --- ЖИВЫЕ СТРАНИЦЫ ---
+# Одна открытая вкладка на URL + MutationObserver вместо перехода на страницу каждый цикл
+LIVE_PAGE_MODE = os.getenv('LIVE_PAGES', '0') == '1'
+
+# --- ИЗВЛЕЧЕНИЕ ИЗ СТРАНИЦЫ ---
+# "evaluate" - таблицы читаются JS-экстрактором внутри страницы, "html" - page.content() + BeautifulSoup
+EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'evaluate')
+
+# --- ПАРАЛЛЕЛЬНЫЙ СКРАПИНГ ---
+# Сколько вкладок браузера могут загружаться одновременно (разные цели грузятся параллельно)
+BROWSER_CONCURRENCY = int(os.getenv('BROWSER_CONCURRENCY', '2'))
+
+# --- ПЕРЕЗАПУСК БРАУЗЕРА ---
+# Браузер пересоздается заранее, когда превышен любой порог (0 - порог выключен)
+BROWSER_MAX_RSS_MB = int(os.getenv('BROWSER_MAX_RSS_MB', '450'))
+BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', '12'))
+BROWSER_MAX_FAILURES = int(os.getenv('BROWSER_MAX_FAILURES', '3'))
+BROWSER_MAX_AGE_HOURS = float(os.getenv('BROWSER_MAX_AGE_HOURS', '24'))
+
+# --- ПРОФИЛЬ БРАУЗЕРА ---
+# Каталог постоянного профиля Chromium (HTTP-кэш и кэши service worker переживают перезапуски);
+# пусто - инкогнито-контекст без кэша на диске, как раньше
+BROWSER_PROFILE_DIR = os.getenv('BROWSER_PROFILE_DIR', '')
+# Лимит размера профиля: при превышении кэши очищаются перед запуском браузера (0 - без лимита)
+BROWSER_PROFILE_MAX_MB = int(os.getenv('BROWSER_PROFILE_MAX_MB', '200'))
+
+# --- ФИЛЬТР ЗАПРОСОВ БРАУЗЕРА ---
+# Картинки, шрифты, стили, медиа и сторонние домены (аналитика) не загружаются
+BLOCK_RESOURCES_ENABLED = os.getenv('BLOCK_RESOURCES', '1') != '0'
+BROWSER_ALLOWED_TYPES = os.getenv('BROWSER_ALLOWED_TYPES', ','.join(DEFAULT_ALLOWED_TYPES)).split(',')
+BROWSER_ALLOWED_HOSTS = os.getenv('BROWSER_ALLOWED_HOSTS', ','.join(DEFAULT_ALLOWED_HOSTS)).split(',')
+
+# --- РАЗБОР HTML ---
+# lxml (XPath), bs4-lxml, bs4-strainer (только h4/table/#log), html.parser или compare (сверка всех)
+HTML_PARSER_BACKEND = os.getenv('HTML_PARSER', 'lxml')
+
+# --- ГОТОВНОСТЬ КОНТЕНТА ---
+# Сколько ждать, пока строки таблиц/лога перестанут меняться после загрузки страницы, мс
+READINESS_DEADLINE_MS = int(os.getenv('READINESS_DEADLINE_MS', '5000'))
+# Где разбирается HTML: "thread" (пул потоков), "process" (пул процессов) или "inline" (в цикле событий)
+PARSE_EXECUTOR_MODE = os.getenv('PARSE_EXECUTOR', 'thread').strip().lower()
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '1'))
+# "inline" - скрапинг в процессе бота, "split" - в отдельном процессе (main.py --scraper)
+SCRAPER_MODE = os.getenv('SCRAPER_MODE', 'inline').strip().lower()
+SCRAPER_SOCKET = os.getenv('SCRAPER_SOCKET', '/tmp/warframe-lfg-scraper.sock')
+# В режиме split бот сам запускает и перезапускает процесс скрапера (0 - скрапер запускается отдельно)
+SCRAPER_SPAWN = os.getenv('SCRAPER_SPAWN', '1').lower() in ('1', 'true', 'yes')
+# Этот процесс - скрапер раздельного режима
+IS_SCRAPER_WORKER = '--scraper' in sys.argv
+
 # --- КЭШИРОВАНИЕ ---
-# Кэш для арбитражей (5 минут)
-ARBITRATION_CACHE = TTLCache(maxsize=10, ttl=300)
+# Расписание арбитражей кэшируется целиком (см. ArbitrationScheduleCache),
+# с сайта оно перечитывается в фоне раз в ARBITRATION_REFRESH_SECONDS
+ARBITRATION_REFRESH_SECONDS = int(os.getenv('ARBITRATION_REFRESH_SECONDS', '1200'))
 # Кэш для разрывов (2 минуты)
 FISSURE_CACHE = TTLCache(maxsize=10, ttl=120)
 # Кэш для тиров (30 минут)
@@ -58,16 +213,7 @@ TIER_CACHE = TTLCache(maxsize=5, ttl=1800)
 MSK_TZ = timezone(timedelta(hours=3))
 
 # --- ГЛОБАЛЬНОЕ СОСТОЯНИЕ ---
-CURRENT_MISSION_STATE = {
-    "ArbitrationSchedule": {},
-    "Fissures": [],
-    "SteelPathFissures": []
-}
-PREVIOUS_MISSION_STATE = {
-    "ArbitrationSchedule": {},
-    "Fissures": [],
-    "SteelPathFissures": []
-}
+# Данные миссий живут в mission_state (снимки с версиями по разделам)
 LAST_SCRAPE_TIME = 0
 CONFIG: Dict[str, Any] = {}
 
@@ -83,15 +229,18 @@ SCRAPE_STATS = {
     "start_time": time.time(),
     "cache_hits": 0,
     "cache_misses": 0,
-    "fast_scrapes": 0
-}
-
-# Потокобезопасность для изменений
-CHANGES_LOCK = threading.Lock()
-LAST_CHANGES = {
-    "ArbitrationSchedule": False,
-    "Fissures": False,
-    "SteelPathFissures": False
+    "fast_scrapes": 0,
+    "http_fast_hits": 0,
+    "browser_fallbacks": 0,
+    "json_captures": 0,
+    "live_page_skips": 0,
+    "evaluate_extractions": 0,
+    "arbitration_cache_hits": 0,
+    "arbitration_cache_misses": 0,
+    "last_cycle_ms": 0,
+    "fingerprint_hits": 0,
+    "fingerprint_misses": 0,
+    "unchanged_cycles": 0
 }
 
 # --- КОНСТАНТЫ ЦВЕТОВ ТИРОВ (АРБИТРАЖ) ---
@@ -201,22 +350,30 @@ MISSION_TYPE_TRANSLATIONS = {
     "Unknown Mission": "Неизвестный тип"
 }
 
+# --- ДАННЫЕ WORLDSTATE (JSON) ---
+# Модификаторы разрывов -> эра реликвий
+VOID_TIER_RELICS = {
+    "VoidT1": "Lith", "VoidT2": "Meso", "VoidT3": "Neo",
+    "VoidT4": "Axi", "VoidT5": "Requiem", "VoidT6": "Omnia"
+}
+
+# Коды типов миссий -> английское название (дальше переводится через MISSION_TYPE_TRANSLATIONS)
+WORLDSTATE_MISSION_TYPES = {
+    "MT_EXTERMINATION": "Exterminate", "MT_CAPTURE": "Capture", "MT_MOBILE_DEFENSE": "Mobile Defense",
+    "MT_DEFENSE": "Defense", "MT_SURVIVAL": "Survival", "MT_TERRITORY": "Interception",
+    "MT_RESCUE": "Rescue", "MT_INTEL": "Spy", "MT_SABOTAGE": "Sabotage",
+    "MT_ARTIFACT": "Disruption", "MT_ASSAULT": "Assault", "MT_ALCHEMY": "Alchemy",
+    "MT_VOID_CASCADE": "Void Cascade", "MT_CORRUPTION": "Void Flood", "MT_EXCAVATE": "Excavation",
+    "MT_EVACUATION": "Defection", "MT_SKIRMISH": "Skirmish"
+}
+
+# Индексы фракций в ExportRegions
+REGION_FACTIONS = {0: "Grineer", 1: "Corpus", 2: "Infested", 3: "Corrupted"}
+
 # =================================================================
 # 2. УТИЛИТЫ И КОНФИГУРАЦИЯ
 # =================================================================
 
-def parse_time_to_seconds(time_str: str) -> int:
-    """Преобразует строку времени ("1h 30m 5s") в секунды."""
-    if time_str in ('N/A', 'Loading...', ''): return 0
-    total_seconds = 0
-    h_match = re.search(r'(\d+)h', time_str)
-    m_match = re.search(r'(\d+)m', time_str)
-    s_match = re.search(r'(\d+)s', time_str)
-    if h_match: total_seconds += int(h_match.group(1)) * 3600
-    if m_match: total_seconds += int(m_match.group(1)) * 60
-    if s_match: total_seconds += int(s_match.group(1))
-    return total_seconds
-
 def format_seconds_to_time_left(total_seconds: float) -> str:
     """Преобразует секунды в формат '1ч 30м 05с'."""
     if total_seconds <= 0: return "**ИСТЕКЛО**"
@@ -269,6 +426,7 @@ def load_config():
 
     save_config()
 
+@lru_cache(maxsize=512)
 def normalize_faction_name(race_name: str, location: str) -> str:
     """Унифицирует имя фракции/тайлсета."""
     norm_location = location.lower()
@@ -457,10 +615,10 @@ async def update_log_message(bot: commands.Bot):
         last_error_info = f"**{error_time}:** {SCRAPE_STATS['last_error'][:100]}..."
 
     # Текущие данные
-    current_arb = CURRENT_MISSION_STATE.get("ArbitrationSchedule", {}).get("Current", {})
+    current_arb = mission_state.data("ArbitrationSchedule").get("Current", {})
     arb_tier = current_arb.get("Tier", "N/A")
-    normal_fissures = len(CURRENT_MISSION_STATE.get("Fissures", []))
-    sp_fissures = len(CURRENT_MISSION_STATE.get("SteelPathFissures", []))
+    normal_fissures = len(mission_state.data("Fissures"))
+    sp_fissures = len(mission_state.data("SteelPathFissures"))
 
     # Создаем embed
     embed = discord.Embed(
@@ -479,25 +637,40 @@ async def update_log_message(bot: commands.Bot):
             f"**Соединение:** {connection_status}\n"
             f"**Серверов:** {len(bot.guilds)}\n"
             f"**Пользователей:** {len(bot.users)}\n"
-            f"**Режим:** Быстрый скрапинг (5 сек)\n"
+            f"**Режим:** Скрапинг по дедлайнам ({SCRAPE_INTERVAL_SECONDS}-{SCRAPE_MAX_INTERVAL_SECONDS} сек)\n"
             f"**Render URL:** {RENDER_URL if RENDER_URL else 'Не настроен'}"
         ),
         inline=False
     )
 
+    # Кэш структурных путей таблиц (в режиме compare у бэкенда его нет)
+    table_path_stats = getattr(getattr(html_backend, 'table_paths', None), 'stats', {})
+
     # Статистика скрапинга
     embed.add_field(
         name="📈 СТАТИСТИКА СКРАПИНГА",
         value=(
             f"**Всего скрапов:** {total}\n"
             f"**Быстрых скрапов:** {fast_scrapes}\n"
+            f"**HTTP без браузера:** {SCRAPE_STATS['http_fast_hits']}\n"
+            f"**Через браузер:** {SCRAPE_STATS['browser_fallbacks']}\n"
+            f"**Из JSON:** {SCRAPE_STATS['json_captures']}\n"
+            f"**Без изменений DOM:** {SCRAPE_STATS['live_page_skips']}\n"
+            f"**Через evaluate:** {SCRAPE_STATS['evaluate_extractions']}\n"
             f"**Успешных:** {successful}\n"
             f"**Неудачных:** {failed}\n"
             f"**Успешность:** {success_rate:.1f}%\n"
             f"**Ошибки разрывов:** {SCRAPE_STATS['fissures_errors']}\n"
             f"**Ошибки арбитража:** {SCRAPE_STATS['arbitration_errors']}\n"
             f"**Cache hits:** {SCRAPE_STATS['cache_hits']}\n"
-            f"**Cache misses:** {SCRAPE_STATS['cache_misses']}"
+            f"**Cache misses:** {SCRAPE_STATS['cache_misses']}\n"
+            f"**Кэш арбитража:** {SCRAPE_STATS['arbitration_cache_hits']}/{SCRAPE_STATS['arbitration_cache_misses']}\n"
+            f"**Время цикла:** {SCRAPE_STATS['last_cycle_ms']} мс\n"
+            f"**Отпечатки:** {SCRAPE_STATS['fingerprint_hits']}/{SCRAPE_STATS['fingerprint_misses']} (циклов без разбора: {SCRAPE_STATS['unchanged_cycles']})\n"
+            f"**Таблицы по пути:** {table_path_stats.get('path_hits', 0)}/{table_path_stats.get('scans', 0)}\n"
+            f"**Вкладки:** пик {browser_slots.stats['peak_active']}/{browser_slots.limit}, ожиданий {browser_slots.stats['waits']}\n"
+            f"**Пул вкладок:** открыто {len(page_pool.pages)}, выдано {page_pool.leased}, "
+            f"утекло {page_pool.count_leaked(PLAYWRIGHT_CONTEXT, live_pages.open_count())}"
         ),
         inline=True
     )
@@ -510,12 +683,64 @@ async def update_log_message(bot: commands.Bot):
             f"**Разрывы:** {normal_fissures}\n"
             f"**Разрывы SP:** {sp_fissures}\n"
             f"**Последний скрап:** <t:{int(LAST_SCRAPE_TIME)}:R>\n"
-            f"**Интервал:** {SCRAPE_INTERVAL_SECONDS}с\n"
+            f"**Интервал:** {SCRAPE_INTERVAL_SECONDS}-{SCRAPE_MAX_INTERVAL_SECONDS}с\n"
+            f"**Следующая проверка:** через {scrape_scheduler.seconds_until_next():.0f}с ({scrape_scheduler.next_wake_reason})\n"
+            f"**Пробуждений по дедлайнам:** {scrape_scheduler.stats['deadline_wakeups']}/{scrape_scheduler.stats['overdue_wakeups']}/{scrape_scheduler.stats['discovery_wakeups']}\n"
             f"**Последнее изменение:** <t:{int(time.time())}:R>"
         ),
         inline=True
     )
 
+    # Фильтр запросов браузера
+    if BLOCK_RESOURCES_ENABLED:
+        router_summary = request_router.summary()
+        # third_party - не тип ресурса, а доля уже посчитанных по типам блокировок: выводится отдельной строкой
+        resource_stats = [item for item in request_router.stats.items() if item[0] != "third_party"]
+        router_lines = [
+            f"**{resource_type}:** ✅ {counts['allowed']} / ⛔ {counts['blocked']} ({counts['bytes'] // 1024} КБ)"
+            for resource_type, counts in sorted(resource_stats, key=lambda item: -(item[1]['allowed'] + item[1]['blocked']))[:8]
+        ]
+        third_party = request_router.stats.get("third_party")
+        if third_party and third_party["blocked"]:
+            router_lines.append(f"**Сторонние домены:** ⛔ {third_party['blocked']} (входят в строки по типам)")
+        router_lines.append(f"**Итого:** ✅ {router_summary['allowed']} / ⛔ {router_summary['blocked']}, загружено {router_summary['bytes'] // 1024} КБ")
+        embed.add_field(
+            name="🚦 ФИЛЬТР ЗАПРОСОВ",
+            value="\n".join(router_lines),
+            inline=False
+        )
+
+    # Время до готовности контента (гистограмма, мс)
+    embed.add_field(
+        name="⏱️ ГОТОВНОСТЬ СТРАНИЦ",
+        value=(
+            f"**Разрывы:** {readiness.format_histogram('fissures') or '—'} "
+            f"(таймаутов: {readiness.stats.get('fissures', {}).get('timeouts', 0)})\n"
+            f"**Арбитраж:** {readiness.format_histogram('arbitration') or '—'} "
+            f"(таймаутов: {readiness.stats.get('arbitration', {}).get('timeouts', 0)})"
+        ),
+        inline=False
+    )
+
+    # Память и перезапуски браузера
+    browser_info = browser_supervisor.summary()
+    if browser_profile is not None:
+        browser_info += f"\n{browser_profile.summary()}"
+    embed.add_field(name="♻️ БРАУЗЕР", value=browser_info, inline=False)
+
+    # Предохранители целей: идут ли загрузки сайта
+    embed.add_field(name="🛡️ ПРЕДОХРАНИТЕЛИ", value="\n".join(circuit_summaries()) or "—", inline=False)
+
+    # Источники данных: кто из поставщиков отвечает первым и как часто нужна подстраховка
+    embed.add_field(name="🔀 ИСТОЧНИКИ", value="\n".join(source_summaries()) or "—", inline=False)
+
+    # Режим сверки бэкендов разбора: среднее время, пик памяти и расхождения
+    if HTML_PARSER_BACKEND == 'compare':
+        embed.add_field(name="🧪 СВЕРКА ПАРСЕРОВ", value=html_backend.summary(), inline=False)
+
+    # Разбор HTML вне цикла событий: очередь и время разбора
+    embed.add_field(name="🧵 РАЗБОР HTML", value=parse_executor.summary(), inline=False)
+
     # Настройки каналов
     channels_info = []
     for key, name in [
@@ -622,13 +847,9 @@ def resolve_custom_emojis(bot: commands.Bot):
 load_config()
 
 # =================================================================
-# 3. БЫСТРЫЕ ФУНКЦИИ СРАВНЕНИЯ СОСТОЯНИЙ
+# 3. КЛЮЧИ МИССИЙ И ПУБЛИКАЦИЯ СОСТОЯНИЯ
 # =================================================================
 
-def create_fissure_key(fissure: Dict[str, Any]) -> str:
-    """Создает уникальный ключ для разрыва (без времени)."""
-    return f"{fissure['Relic']}|{fissure['Type']}|{fissure['Location']}|{fissure['Level']}|{fissure['Race']}"
-
 def create_arbitration_key(arb_data: Dict[str, Any]) -> str:
     """Создает уникальный ключ для арбитража."""
     current = arb_data.get('Current', {})
@@ -636,106 +857,13 @@ def create_arbitration_key(arb_data: Dict[str, Any]) -> str:
         return 'N/A'
     return f"{current.get('Node','')}|{current.get('Tier','')}|{current.get('Name','')}|{current.get('Location','')}"
 
-def compare_fissures_fast(old_fissures: List[Dict], new_fissures: List[Dict]) -> bool:
-    """Быстрое сравнение разрывов с использованием хеширования."""
-    if len(old_fissures) != len(new_fissures):
-        return False
-
-    # Создаем множества ключей для быстрого сравнения
-    old_keys = set(create_fissure_key(f) for f in old_fissures)
-    new_keys = set(create_fissure_key(f) for f in new_fissures)
-
-    return old_keys == new_keys
-
-def compare_arbitration_schedule_fast(old_schedule: Dict, new_schedule: Dict) -> bool:
-    """Быстрое сравнение расписания арбитражей."""
-    old_current = old_schedule.get('Current', {})
-    new_current = new_schedule.get('Current', {})
-
-    # Быстрая проверка на N/A
-    old_node = old_current.get('Node', '')
-    new_node = new_current.get('Node', '')
-
-    if (old_node in ('N/A', '')) and (new_node in ('N/A', '')):
-        return True
-
-    if (old_node in ('N/A', '')) != (new_node in ('N/A', '')):
-        return False
-
-    # Сравниваем ключевые поля
-    key_fields = ['Tier', 'Name', 'Location', 'Node', 'Tileset', 'Bonus', 'IsActive']
-    for field in key_fields:
-        if old_current.get(field) != new_current.get(field):
-            return False
-
-    # Быстрая проверка upcoming (только количество)
-    if len(old_schedule.get('Upcoming', [])) != len(new_schedule.get('Upcoming', [])):
-        return False
-
-    return True
-
-def set_current_state(data: Dict[str, Any], scrape_time: float):
-    """Обновляет текущее состояние миссий и время скрапинга."""
-    global CURRENT_MISSION_STATE, LAST_SCRAPE_TIME, PREVIOUS_MISSION_STATE, LAST_CHANGES, CHANGES_LOCK
-
-    with CHANGES_LOCK:
-        changes = {
-            "ArbitrationSchedule": False,
-            "Fissures": False,
-            "SteelPathFissures": False
-        }
-
-        # Получаем данные о пустых состояниях
-        old_arb = PREVIOUS_MISSION_STATE.get("ArbitrationSchedule", {})
-        new_arb = data.get("ArbitrationSchedule", {})
-        old_arb_node = old_arb.get('Current', {}).get('Node', '')
-        new_arb_node = new_arb.get('Current', {}).get('Node', '')
-
-        old_fissures = PREVIOUS_MISSION_STATE.get("Fissures", [])
-        new_fissures = data.get("Fissures", [])
-
-        old_sp_fissures = PREVIOUS_MISSION_STATE.get("SteelPathFissures", [])
-        new_sp_fissures = data.get("SteelPathFissures", [])
-
-        # Проверяем изменения только если в новых данных что-то есть
-        # Для арбитража
-        if new_arb_node != 'N/A' and new_arb_node != '':
-            if not compare_arbitration_schedule_fast(old_arb, new_arb):
-                changes["ArbitrationSchedule"] = True
-        # Если новые данные N/A или пустые, НЕ обновляем (не меняем состояние)
-
-        # Для обычных разрывов
-        if len(new_fissures) > 0:
-            if not compare_fissures_fast(old_fissures, new_fissures):
-                changes["Fissures"] = True
-        # Если новых разрывов нет, НЕ обновляем
-
-        # Для разрывов стального пути
-        if len(new_sp_fissures) > 0:
-            if not compare_fissures_fast(old_sp_fissures, new_sp_fissures):
-                changes["SteelPathFissures"] = True
-        # Если новых разрывов нет, НЕ обновляем
-
-        # Обновляем предыдущее состояние ТОЛЬКО если новые данные валидны
-        # (не N/A и не пустые)
-        if new_arb_node != 'N/A' and new_arb_node != '':
-            PREVIOUS_MISSION_STATE["ArbitrationSchedule"] = copy.deepcopy(new_arb)
-
-        if len(new_fissures) > 0:
-            PREVIOUS_MISSION_STATE["Fissures"] = copy.deepcopy(new_fissures)
-
-        if len(new_sp_fissures) > 0:
-            PREVIOUS_MISSION_STATE["SteelPathFissures"] = copy.deepcopy(new_sp_fissures)
-
-        # Фиксируем изменения
-        for key in changes:
-            if changes[key]:
-                LAST_CHANGES[key] = True
-
-        # Обновляем текущее состояние (всегда, чтобы видеть актуальные данные)
-        CURRENT_MISSION_STATE.update(data)
-        LAST_SCRAPE_TIME = scrape_time
+def set_current_state(data: Dict[str, Any], scrape_time: float) -> Dict[str, Any]:
+    """Публикует результаты скрапинга в mission_state; возвращает {раздел: прошлый снимок} для изменившихся.
+    Пустые разрывы и арбитраж N/A не заменяют последний хороший снимок."""
+    global LAST_SCRAPE_TIME
 
+    changes = mission_state.publish_all(data, scrape_time)
+    LAST_SCRAPE_TIME = scrape_time
     return changes
 
 # =================================================================
@@ -1136,11 +1264,7 @@ class FissureSelectView(discord.ui.View):
         """Обновляет список разрывов."""
         await interaction.response.defer(thinking=True, ephemeral=True)
 
-        data = CURRENT_MISSION_STATE
-        if self.is_steel_path:
-            self.fissures = data.get("SteelPathFissures", [])
-        else:
-            self.fissures = data.get("Fissures", [])
+        self.fissures = mission_state.data("SteelPathFissures" if self.is_steel_path else "Fissures")
 
         self.update_fissure_options()
 
@@ -1676,8 +1800,86 @@ class ArbitrationLfgView(discord.ui.View):
 PLAYWRIGHT_BROWSER = None
 PLAYWRIGHT_CONTEXT = None
 PLAYWRIGHT_PLAYWRIGHT = None
+# Защищает только запуск браузера; сами страницы ограничены browser_slots
 BROWSER_LOCK = asyncio.Lock()
 BROWSER_INITIALIZED = False
+browser_slots = BrowserSlots(BROWSER_CONCURRENCY)
+
+async def setup_pooled_page(page):
+    """Разовая настройка вкладки пула: таймауты и заголовки для обхода защиты."""
+    page.set_default_timeout(10000)
+    await page.set_extra_http_headers({
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Referer': 'https://browse.wf/',
+        'DNT': '1'
+    })
+
+# Вкладок в пуле столько же, сколько слотов: больше одновременно не понадобится
+page_pool = PagePool(BROWSER_CONCURRENCY, setup=setup_pooled_page)
+
+readiness = ReadinessWaiter(READINESS_DEADLINE_MS)
+
+# Ответы с данными (JSON_CAPTURE_URL_HINTS) пропускаются с любого домена
+request_router = RequestRouter(BROWSER_ALLOWED_TYPES, BROWSER_ALLOWED_HOSTS, always_allow=JSON_CAPTURE_URL_HINTS)
+
+browser_supervisor = BrowserSupervisor(
+    max_rss_mb=BROWSER_MAX_RSS_MB,
+    max_pages=BROWSER_MAX_PAGES,
+    max_failures=BROWSER_MAX_FAILURES,
+    max_age_hours=BROWSER_MAX_AGE_HOURS
+)
+
+# None - постоянный профиль выключен
+browser_profile = create_profile(BROWSER_PROFILE_DIR, BROWSER_PROFILE_MAX_MB)
+
+BROWSER_LAUNCH_ARGS = [
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-gpu',
+    '--disable-software-rasterizer'
+]
+
+BROWSER_CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'java_script_enabled': True,
+    'bypass_csp': True,
+    'ignore_https_errors': True
+}
+
+async def launch_browser_context(playwright) -> Tuple[Any, Any]:
+    """Запускает Chromium и создает настроенный контекст (фильтр запросов, таймауты).
+    
+    С постоянным профилем возвращается (None, context): объекта браузера у такого контекста нет.
+    """
+    if browser_profile is not None:
+        profile_path = browser_profile.acquire()
+        context = await playwright.chromium.launch_persistent_context(
+            profile_path, headless=True, args=BROWSER_LAUNCH_ARGS, **BROWSER_CONTEXT_OPTIONS
+        )
+        browser_profile.bind(context, profile_path)
+        browser = None
+    else:
+        browser = await playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+        context = None
+    
+    try:
+        if context is None:
+            context = await browser.new_context(**BROWSER_CONTEXT_OPTIONS)
+        
+        # Установим глобальные таймауты
+        context.set_default_timeout(15000)
+        
+        if BLOCK_RESOURCES_ENABLED:
+            await request_router.install(context)
+    except Exception:
+        await close_browser_quietly(browser, context)
+        raise
+    
+    return browser, context
 
 async def init_persistent_browser():
     """Инициализирует персистентный браузер Playwright."""
@@ -1686,28 +1888,18 @@ async def init_persistent_browser():
     print(f"[{get_msk_time_string()}] 🌐 Инициализация персистентного браузера...")
     
     try:
-        PLAYWRIGHT_PLAYWRIGHT = await async_playwright().start()
-        PLAYWRIGHT_BROWSER = await PLAYWRIGHT_PLAYWRIGHT.chromium.launch(
-            headless=True,
-            args=[
-                '--disable-dev-shm-usage',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-gpu',
-                '--disable-software-rasterizer'
-            ]
-        )
+        if PLAYWRIGHT_PLAYWRIGHT is None:
+            PLAYWRIGHT_PLAYWRIGHT = await async_playwright().start()
+        PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT = await launch_browser_context(PLAYWRIGHT_PLAYWRIGHT)
+        browser_supervisor.attach(PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT)
         
-        PLAYWRIGHT_CONTEXT = await PLAYWRIGHT_BROWSER.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            java_script_enabled=True,
-            bypass_csp=True,
-            ignore_https_errors=True
-        )
-        
-        # Установим глобальные таймауты
-        PLAYWRIGHT_CONTEXT.set_default_timeout(15000)
+        # Вкладки для скрапинга создаются один раз, а не на каждый цикл
+        if not LIVE_PAGE_MODE:
+            try:
+                await page_pool.warm(PLAYWRIGHT_CONTEXT)
+            except Exception as e:
+                # Не критично: недостающие вкладки будут созданы при первой выдаче
+                print(f"[{get_msk_time_string()}] ⚠️ Не удалось подготовить пул вкладок: {e}")
         
         BROWSER_INITIALIZED = True
         print(f"[{get_msk_time_string()}] ✅ Персистентный браузер инициализирован")
@@ -1718,81 +1910,159 @@ async def init_persistent_browser():
         BROWSER_INITIALIZED = False
         return False
 
+async def ensure_persistent_browser() -> bool:
+    """Запускает браузер, если он еще не запущен; параллельные цели не запускают его дважды."""
+    async with BROWSER_LOCK:
+        if BROWSER_INITIALIZED and PLAYWRIGHT_CONTEXT:
+            # У постоянного контекста нет объекта браузера: падение видно только по событию close
+            if not browser_supervisor.crashed and (PLAYWRIGHT_BROWSER is None or PLAYWRIGHT_BROWSER.is_connected()):
+                return True
+            # Chromium упал: флаг инициализации сам по себе больше ничего не значит
+            print(f"[{get_msk_time_string()}] 💥 Браузер отключился, запускаем заново...")
+            await close_persistent_browser()
+            success = await init_persistent_browser()
+            browser_supervisor.record_recycle('crashed', success)
+            return success
+        return await init_persistent_browser()
+
 async def close_persistent_browser():
     """Закрывает персистентный браузер."""
     global PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT, PLAYWRIGHT_PLAYWRIGHT, BROWSER_INITIALIZED
     
-    if PLAYWRIGHT_CONTEXT:
-        await PLAYWRIGHT_CONTEXT.close()
-        PLAYWRIGHT_CONTEXT = None
+    # Живые страницы принадлежат закрываемому контексту
+    await live_pages.close_all()
+    LIVE_PAGE_RESULTS.clear()
+    await page_pool.close_all()
     
-    if PLAYWRIGHT_BROWSER:
-        await PLAYWRIGHT_BROWSER.close()
-        PLAYWRIGHT_BROWSER = None
+    browser_supervisor.detach(PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT)
+    
+    # После падения Chromium закрытие контекста и браузера может бросить исключение - это не мешает
+    await close_browser_quietly(PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT)
+    PLAYWRIGHT_CONTEXT = None
+    PLAYWRIGHT_BROWSER = None
     
     if PLAYWRIGHT_PLAYWRIGHT:
-        await PLAYWRIGHT_PLAYWRIGHT.stop()
+        try:
+            await PLAYWRIGHT_PLAYWRIGHT.stop()
+        except Exception as e:
+            print(f"[{get_msk_time_string()}] ⚠️ Ошибка остановки Playwright: {e}")
         PLAYWRIGHT_PLAYWRIGHT = None
     
     BROWSER_INITIALIZED = False
     print(f"[{get_msk_time_string()}] 🌐 Персистентный браузер закрыт")
 
+async def close_browser_quietly(browser, context):
+    """Закрывает контекст и браузер, не пробрасывая ошибки (браузер мог уже упасть)."""
+    for closable in (context, browser):
+        if closable is None:
+            continue
+        try:
+            await closable.close()
+        except Exception as e:
+            print(f"[{get_msk_time_string()}] ⚠️ Ошибка закрытия браузера: {e}")
+    
+    # Закрытый постоянный контекст освобождает каталог профиля для следующего запуска
+    if browser_profile is not None and context is not None:
+        browser_profile.release(context)
+
+async def recycle_persistent_browser(reason: str) -> bool:
+    """Пересоздает браузер: новый запускается и прогревается до закрытия старого, чтобы не было пропуска скрапа."""
+    global PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT, BROWSER_INITIALIZED
+    
+    print(f"[{get_msk_time_string()}] ♻️ Перезапуск браузера (причина: {reason})...")
+    
+    async with BROWSER_LOCK:
+        try:
+            new_browser, new_context = await launch_browser_context(PLAYWRIGHT_PLAYWRIGHT)
+        except Exception as e:
+            # Драйвер Playwright тоже мог умереть: полный перезапуск
+            print(f"[{get_msk_time_string()}] ⚠️ Не удалось запустить замену ({e}), полный перезапуск браузера")
+            await close_persistent_browser()
+            success = await init_persistent_browser()
+            browser_supervisor.record_recycle(reason, success)
+            return success
+        
+        # Подмена ждет, пока текущие загрузки страниц закончатся, и не пускает новые
+        async with browser_slots.exclusive():
+            old_browser, old_context = PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT
+            browser_supervisor.detach(old_browser, old_context)
+            
+            await live_pages.close_all()
+            LIVE_PAGE_RESULTS.clear()
+            
+            PLAYWRIGHT_BROWSER, PLAYWRIGHT_CONTEXT = new_browser, new_context
+            browser_supervisor.attach(new_browser, new_context)
+            BROWSER_INITIALIZED = True
+            
+            if not LIVE_PAGE_MODE:
+                try:
+                    await page_pool.warm(new_context)
+                except Exception as e:
+                    print(f"[{get_msk_time_string()}] ⚠️ Не удалось подготовить пул вкладок: {e}")
+    
+    # Старый браузер закрывается уже после подмены
+    await close_browser_quietly(old_browser, old_context)
+    browser_supervisor.record_recycle(reason, True)
+    print(f"[{get_msk_time_string()}] ✅ Браузер перезапущен (причина: {reason})")
+    return True
+
+async def check_browser_health():
+    """Проверка перед циклом скрапинга: падение, память, вкладки, ошибки подряд, возраст."""
+    if not BROWSER_INITIALIZED:
+        return
+    reason = browser_supervisor.recycle_reason()
+    if reason:
+        await recycle_persistent_browser(reason)
+
 def parse_arbitration_schedule(soup: BeautifulSoup, current_scrape_time: float) -> Dict[str, Any]:
     """Парсит данные о расписании Арбитражей."""
-    schedule = {"Current": {}, "Upcoming": []}
+    return build_arbitration_schedule(parse_arbitration_missions(soup), current_scrape_time)
 
-    log_div = soup.find('div', id='log')
-    if not log_div: return schedule
+def parse_arbitration_missions(soup: BeautifulSoup) -> List[ArbitrationMission]:
+    """Парсит все миссии Арбитража из div#log."""
+    return parse_arbitration_entries(read_arbitration_log(soup))
 
-    all_missions = log_div.find_all(['b', 'span'], attrs={'data-timestamp': True})
+def parse_arbitration_entries(entries: List[Tuple[Any, str]]) -> List[ArbitrationMission]:
+    """Преобразует записи лога (data-timestamp, текст) из BeautifulSoup или page.evaluate в миссии Арбитража."""
     parsed_missions = []
 
-    for tag in all_missions:
+    for timestamp_raw, text_content in entries:
         try:
-            text_content = tag.text.strip()
-            tier_bonus_match = re.search(r'\((.+?)\s*tier(?:,\s*(.+?))?\)$', text_content)
-            if not tier_bonus_match: continue
-
-            tier = tier_bonus_match.group(1).strip().upper()
-            bonus = tier_bonus_match.group(2).strip() if tier_bonus_match.group(2) else 'N/A'
-            mission_info_raw = re.sub(r'^\d{2}:\d{2}\s*•\s*', '', text_content)
-            mission_info_raw = re.sub(r'\s*\(.+\)$', '', mission_info_raw).strip()
-
-            mission_match = re.search(r'(.+?)\s*-\s*(.+?)\s*@\s*(.+?),\s*(.+?)$', mission_info_raw)
-            if not mission_match: continue
+            tokens = tokenize_arbitration_line(text_content)
+            if not tokens: continue
 
-            mission_type_raw = mission_match.group(1).strip()
-            faction_raw = mission_match.group(2).strip()
-            node = mission_match.group(3).strip()
-            planet = mission_match.group(4).strip()
+            tier, bonus, mission_type_raw, faction_raw, node, planet = tokens
+            location_combined = sys.intern(f"{node}, {planet}")
 
-            location_combined = f"{node}, {planet}"
-
-            start_timestamp = int(tag.attrs['data-timestamp'])
+            start_timestamp = int(timestamp_raw)
             end_timestamp = start_timestamp + 3600
 
-            utc_dt = datetime.fromtimestamp(start_timestamp, tz=timezone.utc)
-            msk_dt = utc_dt.astimezone(MSK_TZ)
-            msk_start_time_display = msk_dt.strftime('%H:%M')
-
-            parsed_missions.append({
-                "Tier": tier,
-                "Type": MISSION_TYPE_TRANSLATIONS.get(mission_type_raw, mission_type_raw),
-                "Faction": normalize_faction_name(faction_raw, location_combined),
-                "Node": node,
-                "Location": location_combined,
-                "Bonus": bonus,
-                "StartTimeDisplay": msk_start_time_display,
-                "StartTimestamp": start_timestamp,
-                "EndTimestamp": end_timestamp,
-            })
+            msk_start_time_display = format_msk_hhmm(start_timestamp)
+
+            parsed_missions.append(ArbitrationMission(
+                Tier=tier,
+                Type=MISSION_TYPE_TRANSLATIONS.get(mission_type_raw, mission_type_raw),
+                Faction=normalize_faction_name(faction_raw, location_combined),
+                Node=node,
+                Location=location_combined,
+                Bonus=bonus,
+                StartTimeDisplay=msk_start_time_display,
+                StartTimestamp=start_timestamp,
+                EndTimestamp=end_timestamp
+            ))
         except Exception:
             continue
 
+    return parsed_missions
+
+def build_arbitration_schedule(parsed_missions: List[ArbitrationMission], current_scrape_time: float) -> Dict[str, Any]:
+    """Строит текущую и грядущие миссии Арбитража на момент current_scrape_time."""
+    schedule = {"Current": {}, "Upcoming": []}
+
     now = current_scrape_time
     parsed_missions.sort(key=lambda m: m['StartTimestamp'])
-    current_mission: Optional[Dict[str, Any]] = None
-    upcoming_missions_list: List[Dict[str, Any]] = []
+    current_mission: Optional[ArbitrationMission] = None
+    upcoming_missions_list: List[ArbitrationMission] = []
 
     for mission in parsed_missions:
         start = mission['StartTimestamp']
@@ -1830,276 +2100,747 @@ def parse_arbitration_schedule(soup: BeautifulSoup, current_scrape_time: float)
 
     for mission in upcoming_missions_list:
         if mission['StartTimestamp'] > now:
-            mission['TargetTimestamp'] = mission['StartTimestamp']
-            schedule["Upcoming"].append(mission)
+            schedule["Upcoming"].append(mission.replace(TargetTimestamp=mission['StartTimestamp']))
 
     schedule["Upcoming"] = schedule["Upcoming"][:20]
 
     return schedule
 
-def parse_fissure_table(table: Tag, current_scrape_time: float, is_steel_path_table: bool = False) -> List[Dict[str, Any]]:
-    """Парсит строки из одной таблицы разрывов."""
-    fissures_list: List[Dict[str, Any]] = []
-    rows = table.find_all('tr')
-    last_relic_type = "N/A"
+class ArbitrationTierIndex:
+    """Индекс 30-дневного расписания Арбитражей по тирам: отсортированные времена начала для bisect."""
 
-    for row in rows:
-        relic_th = row.find('th')
-        if relic_th and relic_th.text.strip():
-            last_relic_type = relic_th.text.strip()
+    def __init__(self):
+        self.source: Optional[List[Dict[str, Any]]] = None
+        self.starts: Dict[str, List[int]] = {}
+        self.missions: Dict[str, List[ArbitrationMission]] = {}
 
-        mission_td = row.find('td')
-        if not mission_td:
-            continue
+    def rebuild(self, parsed_missions: List[ArbitrationMission]):
+        """Перестраивает индекс по свежему списку миссий (тот же список повторно не индексируется)."""
+        if not parsed_missions or parsed_missions is self.source:
+            return
 
-        mission_type_tag = mission_td.find('b')
-        mission_type_raw = mission_type_tag.text.strip() if mission_type_tag else "Unknown Mission"
+        starts = defaultdict(list)
+        missions = defaultdict(list)
+        for mission in sorted(parsed_missions, key=lambda m: m['StartTimestamp']):
+            tier = mission['Tier'].upper()
+            starts[tier].append(mission['StartTimestamp'])
+            missions[tier].append(mission)
+
+        self.source = parsed_missions
+        self.starts = dict(starts)
+        self.missions = dict(missions)
+
+    def earliest(self, tier: str, now: float) -> Optional[Dict[str, Any]]:
+        """Возвращает текущую или ближайшую миссию тира за O(log n)."""
+        starts = self.starts.get(tier)
+        if not starts:
+            return None
+
+        # Первая миссия, которая еще не закончилась (каждая длится час)
+        index = bisect.bisect_right(starts, now - 3600)
+        if index >= len(starts):
+            return None
+
+        mission = self.missions[tier][index]
+        is_active = mission['StartTimestamp'] <= now < mission['EndTimestamp']
+        return mission.replace(
+            IsActive=is_active,
+            TargetTimestamp=mission['EndTimestamp'] if is_active else mission['StartTimestamp']
+        )
+
+    def clear(self):
+        self.source = None
+        self.starts = {}
+        self.missions = {}
+
+ARBITRATION_TIER_INDEX = ArbitrationTierIndex()
+
+class ArbitrationScheduleCache:
+    """Кэш 30-дневного расписания Арбитражей: Current/Upcoming пересчитываются локально на границе часа."""
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.missions: List[ArbitrationMission] = []
+        self.fetched_at = 0.0
+        self.schedule: Optional[Dict[str, Any]] = None
+        self.valid_until = 0.0
+        self.refresh_task: Optional[asyncio.Task] = None
+        # Время запуска последнего фонового обновления: неудачная загрузка тоже ждет полный интервал
+        self.refresh_attempted_at = 0.0
+
+    def store(self, parsed_missions: List[ArbitrationMission], fetched_at: float):
+        """Сохраняет свежий список миссий и перестраивает индекс тиров."""
+        if not parsed_missions:
+            return
+        if parsed_missions is not self.missions:
+            self.schedule = None
+            self.valid_until = 0.0
+        self.missions = parsed_missions
+        self.fetched_at = fetched_at
+        ARBITRATION_TIER_INDEX.rebuild(parsed_missions)
+
+    def get(self, now: float) -> Optional[Dict[str, Any]]:
+        """Возвращает расписание на момент now или None, если кэш пуст или расписание закончилось."""
+        if not self.missions:
+            return None
+
+        # Готовое расписание действует до конца текущей миссии (или до начала следующей)
+        if self.schedule is not None and now < self.valid_until:
+            return self.schedule
+
+        schedule = build_arbitration_schedule(self.missions, now)
+        current = schedule.get("Current", {})
+        if current.get("Node", "N/A") == "N/A":
+            return None
+
+        self.schedule = schedule
+        self.valid_until = current["TargetTimestamp"]
+        return schedule
+
+    def needs_refresh(self, now: float) -> bool:
+        return now - max(self.fetched_at, self.refresh_attempted_at) > self.refresh_interval
+
+    def start_background_refresh(self, loader: Callable[[], Awaitable[Any]]):
+        """Запускает фоновое обновление с сайта, если оно еще не идет."""
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_attempted_at = time.time()
+            self.refresh_task = asyncio.create_task(loader())
+
+    def clear(self):
+        # Уже идущая загрузка иначе заполнила бы кэш сразу после очистки
+        if self.refresh_task is not None and not self.refresh_task.done():
+            self.refresh_task.cancel()
+        self.refresh_task = None
+        self.refresh_attempted_at = 0.0
+        self.missions = []
+        self.fetched_at = 0.0
+        self.schedule = None
+        self.valid_until = 0.0
+
+ARBITRATION_CACHE = ArbitrationScheduleCache(ARBITRATION_REFRESH_SECONDS)
+
+# Одинаковые разрывы без data-expiry должны давать одинаковое ExpiryTime от цикла к циклу
+FISSURE_EXPIRY_STABILIZER = ExpiryStabilizer()
+
+def parse_fissure_rows(rows_data: List[Any], current_scrape_time: float, is_steel_path_table: bool = False) -> List[FissureRecord]:
+    """Преобразует сырые строки таблицы разрывов (из BeautifulSoup или page.evaluate) в записи разрывов."""
+    fissures_list: List[FissureRecord] = []
+    FISSURE_EXPIRY_STABILIZER.prune(current_scrape_time)
+
+    for last_relic_type, mission_type_text, time_text, expiry_attr, location_raw in rows_data:
+        mission_type_raw = mission_type_text or "Unknown Mission"
         if mission_type_raw.startswith("М."):
             mission_type_raw = mission_type_raw[2:].strip()
 
         mission_type = MISSION_TYPE_TRANSLATIONS.get(mission_type_raw, mission_type_raw)
 
-        expiry_span = mission_td.find('span', class_='badge')
-        time_str = expiry_span.text.strip() if expiry_span else "N/A"
-        time_in_seconds = parse_time_to_seconds(time_str)
-        expiry_time = current_scrape_time + time_in_seconds
+        # Абсолютное время из data-expiry; текст таймера - только если атрибута нет
+        expiry_time = parse_expiry_attribute(expiry_attr)
+        if expiry_time is None:
+            time_in_seconds = parse_time_to_seconds(time_text or "N/A")
+            expiry_time = FISSURE_EXPIRY_STABILIZER.stabilize(
+                (is_steel_path_table, last_relic_type, mission_type_text, location_raw),
+                current_scrape_time + time_in_seconds
+            )
 
-        # Ищем все span элементы
-        all_spans = mission_td.find_all('span')
+        level_range, location, race = "N/A", "N/A", "N/A"
 
-        location_span = None
-        for span in all_spans:
-            # Ищем span без классов (обычно содержит уровень и локацию)
-            if not span.get('class') and not span.get('data-expiry'):
-                location_span = span
-                break
+        if location_raw is not None:
+            # Формат "(2-4) - Гринир @ Mantle, Земля"
+            level_range, race, location = parse_fissure_location(location_raw)
 
-        level_range, location, race = "N/A", "N/A", "N/A"
+        if mission_type != "Unknown Mission" or mission_type_raw != "Unknown Mission":
+            race = "Гринир" if last_relic_type == "Omnia" else normalize_faction_name(race, location)
 
-        if location_span:
-            location_raw = location_span.text.strip()
+            if is_steel_path_table or "Steel Path" in location or "Steel Path" in mission_type_raw:
+                mission_type = mission_type.replace("(Steel Path)", "").strip()
+                location = location.replace(" (Steel Path)", "").strip()
 
-            # Исправленный regex для обработки формата "(2-4) - Гринир @ Mantle, Земля"
-            level_match = re.search(r'\(([^)]+)\)\s*-\s*([^@]+)(?:@\s*(.+))?', location_raw)
+            # Добавляем только если есть реликвия
+            if last_relic_type != "N/A":
+                fissures_list.append(FissureRecord(
+                    Relic=last_relic_type,
+                    Type=mission_type,
+                    Level=level_range,
+                    Location=location,
+                    Race=race,
+                    ExpiryTime=expiry_time
+                ))
 
-            if level_match:
-                level_range = level_match.group(1).strip()
-                race = level_match.group(2).strip()
-                location = level_match.group(3).strip() if level_match.group(3) else 'N/A'
-            else:
-                # Попробуем другой формат
-                level_match = re.search(r'\(([^)]+)\)', location_raw)
-                if level_match:
-                    level_range = level_match.group(1).strip()
-                    remaining = location_raw.replace(f'({level_range})', '').strip()
-
-                    if '@' in remaining:
-                        parts = remaining.split('@', 1)
-                        race = parts[0].replace('-', '').strip()
-                        location = parts[1].strip()
-                    else:
-                        location = remaining
-                        race = 'N/A'
+    return fissures_list
 
-        if mission_type != "Unknown Mission" or mission_type_raw != "Unknown Mission":
-            fissure_data = {
-                "Relic": last_relic_type,
-                "Type": mission_type,
-                "Level": level_range,
-                "Location": location,
-                "Race": normalize_faction_name(race, location),
-                "ExpiryTime": expiry_time
+def parse_fissure_table(table: Tag, current_scrape_time: float, is_steel_path_table: bool = False) -> List[FissureRecord]:
+    """Парсит строки из одной таблицы разрывов."""
+    return parse_fissure_rows(extract_fissure_table_rows(table), current_scrape_time, is_steel_path_table)
+
+class JsonCapture:
+    """Собирает JSON/текстовые ответы страницы, из которых browse.wf строит таблицы."""
+
+    def __init__(self, page):
+        self.page = page
+        self.payloads: List[Tuple[str, Any]] = []
+        self.pending: List[asyncio.Task] = []
+        page.on('response', self._on_response)
+        self.attached = True
+
+    def _on_response(self, response):
+        url = response.url.lower()
+        if any(hint in url for hint in JSON_CAPTURE_URL_HINTS):
+            self.pending.append(asyncio.create_task(self._read(response)))
+
+    async def _read(self, response):
+        try:
+            content_type = response.headers.get('content-type', '')
+            if 'json' in content_type:
+                self.payloads.append((response.url, await response.json()))
+            elif 'text/plain' in content_type:
+                self.payloads.append((response.url, await response.text()))
+        except Exception:
+            pass
+
+    def detach(self):
+        """Отключает обработчик от страницы (вкладка возвращается в пул и будет использоваться дальше)."""
+        if self.attached:
+            self.page.remove_listener('response', self._on_response)
+            self.attached = False
+
+    async def collect(self) -> List[Tuple[str, Any]]:
+        """Дожидается чтения всех перехваченных ответов и отключает обработчик."""
+        self.detach()
+        if self.pending:
+            await asyncio.gather(*self.pending, return_exceptions=True)
+        return self.payloads
+
+# Регионы (ноды) и словарь не меняются, поэтому храним их между циклами
+WORLDSTATE_REGIONS: Dict[str, Dict[str, Any]] = {}
+WORLDSTATE_LANGUAGE: Dict[str, str] = {}
+
+def remember_captured_payloads(payloads: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """Раскладывает перехваченные ответы по типам и обновляет кэш регионов/словаря."""
+    found = {"worldstate": None, "arbys": None}
+
+    for url, payload in payloads:
+        if isinstance(payload, dict):
+            if 'ActiveMissions' in payload:
+                found["worldstate"] = payload
+                continue
+
+            sample = next(iter(payload.values()), None)
+            if isinstance(sample, dict) and 'systemName' in sample:
+                WORLDSTATE_REGIONS.update(payload)
+            elif isinstance(sample, str) and next(iter(payload)).startswith('/Lotus/Language/'):
+                WORLDSTATE_LANGUAGE.update(payload)
+
+        if 'arbys' in url.lower() and isinstance(payload, (str, list)):
+            found["arbys"] = payload
+
+    return found
+
+def parse_worldstate_date(value: Any) -> Optional[float]:
+    """Преобразует дату worldstate ({"$date": {"$numberLong": "..."}}) в секунды."""
+    if isinstance(value, dict):
+        value = value.get('$date', {})
+        if isinstance(value, dict):
+            value = value.get('$numberLong')
+    try:
+        timestamp = float(value)
+    except (TypeError, ValueError):
+        return None
+    # Миллисекунды -> секунды
+    return timestamp / 1000 if timestamp > 1e12 else timestamp
+
+def resolve_language_key(value: Optional[str]) -> str:
+    """Переводит ключ /Lotus/Language/... через словарь или берет его последний сегмент."""
+    if not value:
+        return ''
+    if value in WORLDSTATE_LANGUAGE:
+        return WORLDSTATE_LANGUAGE[value]
+    if value.startswith('/Lotus/'):
+        return value.rsplit('/', 1)[-1]
+    return value
+
+def describe_region(node_id: str) -> Dict[str, Any]:
+    """Возвращает название ноды, планету, фракцию и уровни для ID ноды (SolNode...)."""
+    region = WORLDSTATE_REGIONS.get(node_id, {})
+    node_name = resolve_language_key(region.get('name')) or node_id
+    planet = resolve_language_key(region.get('systemName'))
+
+    faction = region.get('faction')
+    if faction is None:
+        faction = REGION_FACTIONS.get(region.get('factionIndex'), 'N/A')
+
+    mission_type = WORLDSTATE_MISSION_TYPES.get(region.get('missionType'))
+    if not mission_type:
+        mission_type = resolve_language_key(region.get('missionName')).replace('MissionName_', '') or 'Unknown Mission'
+
+    return {
+        "Node": node_name,
+        "Location": f"{node_name}, {planet}" if planet else node_name,
+        "Faction": str(faction),
+        "MissionType": mission_type,
+        "MinLevel": region.get('minEnemyLevel'),
+        "MaxLevel": region.get('maxEnemyLevel')
+    }
+
+def parse_worldstate_fissures(worldstate: Dict[str, Any], current_scrape_time: float) -> Dict[str, List[FissureRecord]]:
+    """Строит списки разрывов из ActiveMissions в том же формате, что и parse_fissure_table."""
+    results = {"Fissures": [], "SteelPathFissures": []}
+    relic_order = list(VOID_TIER_RELICS.values())
+
+    for mission in worldstate.get('ActiveMissions', []):
+        relic = VOID_TIER_RELICS.get(mission.get('Modifier'))
+        expiry_time = parse_worldstate_date(mission.get('Expiry'))
+        if not relic or not expiry_time or expiry_time <= current_scrape_time:
+            continue
+
+        region = describe_region(mission.get('Node', ''))
+        is_steel_path = bool(mission.get('Hard'))
+
+        mission_type_raw = WORLDSTATE_MISSION_TYPES.get(mission.get('MissionType'), region["MissionType"])
+
+        level_range = "N/A"
+        if region["MinLevel"] is not None and region["MaxLevel"] is not None:
+            # Стальной путь: +100 к уровню врагов
+            bonus = 100 if is_steel_path else 0
+            level_range = f"{region['MinLevel'] + bonus}-{region['MaxLevel'] + bonus}"
+
+        race = "Гринир" if relic == "Omnia" else normalize_faction_name(region["Faction"], region["Location"])
+
+        results["SteelPathFissures" if is_steel_path else "Fissures"].append(FissureRecord(
+            Relic=relic,
+            Type=MISSION_TYPE_TRANSLATIONS.get(mission_type_raw, mission_type_raw),
+            Level=level_range,
+            Location=region["Location"],
+            Race=race,
+            ExpiryTime=expiry_time
+        ))
+
+    for key in results:
+        results[key].sort(key=lambda f: (relic_order.index(f["Relic"]), f["ExpiryTime"]))
+
+    return results
+
+def parse_arbitration_payload(payload: Any) -> List[ArbitrationMission]:
+    """Парсит расписание Арбитражей из перехваченного ответа (строки "timestamp,SolNode" или JSON-список)."""
+    rows: List[Tuple[float, str]] = []
+
+    if isinstance(payload, str):
+        for line in payload.splitlines():
+            parts = line.strip().split(',')
+            if len(parts) >= 2 and parts[0].isdigit():
+                rows.append((parse_worldstate_date(parts[0]), parts[1].strip()))
+    elif isinstance(payload, list):
+        for item in payload:
+            if isinstance(item, (list, tuple)) and len(item) >= 2:
+                rows.append((parse_worldstate_date(item[0]), str(item[1])))
+            elif isinstance(item, dict):
+                start = item.get('start', item.get('timestamp', item.get('Activation')))
+                rows.append((parse_worldstate_date(start), str(item.get('node', item.get('Node', '')))))
+
+    parsed_missions = []
+    for start, node_id in rows:
+        if not start or not node_id:
+            continue
+
+        region = describe_region(node_id)
+        start_timestamp = int(start)
+        map_data = ARBITRATION_MAP_DATABASE.get(region["Node"], {})
+
+        msk_start_time_display = datetime.fromtimestamp(start_timestamp, tz=timezone.utc).astimezone(MSK_TZ).strftime('%H:%M')
+
+        parsed_missions.append(ArbitrationMission(
+            # Тир в ответе не передается, берем его из базы карт
+            Tier=map_data.get("tier", "N/A"),
+            Type=MISSION_TYPE_TRANSLATIONS.get(region["MissionType"], region["MissionType"]),
+            Faction=map_data.get("faction") or normalize_faction_name(region["Faction"], region["Location"]),
+            Node=region["Node"],
+            Location=region["Location"],
+            Bonus='N/A',
+            StartTimeDisplay=msk_start_time_display,
+            StartTimestamp=start_timestamp,
+            EndTimestamp=start_timestamp + 3600
+        ))
+
+    return parsed_missions
+
+# Время следующей попытки HTTP без браузера для каждого URL
+HTTP_FAST_PATH_RETRY_AT: Dict[str, float] = {}
+
+async def fetch_html_without_browser(url: str) -> Optional[str]:
+    """Пробует получить страницу обычным HTTP-запросом через общий пул соединений."""
+    if not HTTP_FAST_PATH_ENABLED:
+        return None
+
+    if time.time() < HTTP_FAST_PATH_RETRY_AT.get(url, 0):
+        return None
+
+    result = await http_fetcher.fetch_text(url)
+    if not result:
+        # Сетевая ошибка или таймаут: не ждем их на каждом цикле перед запуском браузера
+        mark_http_fast_path_miss(url, "ошибка сети")
+        return None
+    if result[0] != 200:
+        # Например, 403 от защиты от ботов
+        mark_http_fast_path_miss(url, f"статус {result[0]}")
+        return None
+
+    return result[1]
+
+# Бэкенд разбора HTML, полученного без браузера или через page.content()
+html_backend = get_backend(HTML_PARSER_BACKEND)
+parse_executor = ParseExecutor(PARSE_EXECUTOR_MODE, PARSE_WORKERS)
+
+async def run_html_backend(kind: str, region: str) -> Any:
+    """Разбор участка HTML бэкендом в пуле parse_executor (kind: 'fissures' или 'arbitration')"""
+    if parse_executor.mode == 'process':
+        if HTML_PARSER_BACKEND == 'compare':
+            # Сверка идет в рабочем процессе, а замеры накапливаются здесь, чтобы попасть в мониторинг
+            method = 'fissure_tables' if kind == 'fissures' else 'arbitration_entries'
+            result, measurements, mismatched = await parse_executor.run(kind, compare_with, method, region)
+            html_backend.record(method, measurements, mismatched)
+            return result
+        # В другой процесс передается имя бэкенда, а не сам объект
+        function = fissure_tables_with if kind == 'fissures' else arbitration_entries_with
+        return await parse_executor.run(kind, function, HTML_PARSER_BACKEND, region)
+    method = html_backend.fissure_tables if kind == 'fissures' else html_backend.arbitration_entries
+    return await parse_executor.run(kind, method, region)
+
+def fissures_still_valid(results: Dict[str, List[FissureRecord]], now: float) -> bool:
+    """Прошлый разбор годится, пока ни один разрыв в нем не истек (таймеры в отпечаток не входят)."""
+    return all(fissure["ExpiryTime"] > now for fissures in results.values() for fissure in fissures)
+
+async def parse_fissure_html(html: str, current_scrape_time: float) -> Optional[Dict[str, List[FissureRecord]]]:
+    """Разбирает только участок с таблицами разрывов; при неизменном отпечатке возвращает прошлый результат."""
+    region = fissure_html_region(html)
+    if region is None:
+        return None
+
+    fingerprint = fissure_region_digest(region)
+    cached = region_fingerprints.lookup("fissures_html", fingerprint)
+    if cached is not None and fissures_still_valid(cached, current_scrape_time):
+        SCRAPE_STATS["fingerprint_hits"] += 1
+        return cached
+
+    SCRAPE_STATS["fingerprint_misses"] += 1
+    tables = await run_html_backend('fissures', region)
+    if not tables:
+        return None
+
+    results = {
+        "Fissures": parse_fissure_rows(tables.get('normal') or [], current_scrape_time, False),
+        "SteelPathFissures": parse_fissure_rows(tables.get('steel') or [], current_scrape_time, True)
+    }
+    print(f"[{get_msk_time_string()}]   -> Разрывы ({html_backend.name}): {len(results['Fissures'])} + SP {len(results['SteelPathFissures'])}")
+    region_fingerprints.store("fissures_html", fingerprint, results)
+    return results
+
+async def parse_arbitration_html(html: str) -> Optional[List[ArbitrationMission]]:
+    """Разбирает только div#log; при неизменном отпечатке возвращает прошлый список миссий."""
+    region = arbitration_html_region(html)
+    if region is None:
+        return None
+
+    fingerprint = digest(region)
+    cached = region_fingerprints.lookup("arbitration_html", fingerprint)
+    if cached is not None:
+        SCRAPE_STATS["fingerprint_hits"] += 1
+        return cached
+
+    SCRAPE_STATS["fingerprint_misses"] += 1
+    entries = await run_html_backend('arbitration', region)
+    if not entries:
+        return None
+
+    parsed_missions = parse_arbitration_entries(entries)
+    region_fingerprints.store("arbitration_html", fingerprint, parsed_missions)
+    return parsed_missions
+
+# Последняя ошибка каждой цели ('fissures', 'arbitration'): скраперы ее не пробрасывают, а предохранителю нужна причина
+SCRAPE_LAST_ERRORS: Dict[str, str] = {}
+
+def note_scrape_error(target: str, error: Any):
+    """Запоминает причину неудачного скрапа цели (для предохранителя и мониторинга)."""
+    SCRAPE_LAST_ERRORS[target] = str(error)
+    SCRAPE_STATS["last_error"] = str(error)
+    SCRAPE_STATS["last_error_time"] = time.time()
+
+def mark_http_fast_path_miss(url: str, reason: str = "в HTML нет данных"):
+    """Откладывает HTTP-попытки для URL, который отдаёт страницу без данных, не 200 или не отвечает."""
+    HTTP_FAST_PATH_RETRY_AT[url] = time.time() + HTTP_FAST_PATH_RETRY_SECONDS
+    print(f"[{get_msk_time_string()}]   -> {url}: {reason}, используем браузер")
+
+async def extract_fissures_from_page(page, current_scrape_time: float) -> Dict[str, List[FissureRecord]]:
+    """Читает таблицы разрывов из открытой страницы: JS-экстрактором или через полный HTML."""
+    if EXTRACTION_MODE == 'evaluate':
+        tables = await extract_fissure_rows(page)
+        if tables:
+            SCRAPE_STATS["evaluate_extractions"] += 1
+            
+            fingerprint = fissure_rows_digest(tables)
+            cached = region_fingerprints.lookup("fissures_rows", fingerprint)
+            if cached is not None and fissures_still_valid(cached, current_scrape_time):
+                SCRAPE_STATS["fingerprint_hits"] += 1
+                return cached
+            
+            SCRAPE_STATS["fingerprint_misses"] += 1
+            results = {
+                "Fissures": parse_fissure_rows(tables.get('normal') or [], current_scrape_time, False),
+                "SteelPathFissures": parse_fissure_rows(tables.get('steel') or [], current_scrape_time, True)
             }
+            print(f"[{get_msk_time_string()}]   -> Разрывы (evaluate): {len(results['Fissures'])} + SP {len(results['SteelPathFissures'])}")
+            region_fingerprints.store("fissures_rows", fingerprint, results)
+            return results
+
+    results = await parse_fissure_html(await page.content(), current_scrape_time)
+    if results is None:
+        print(f"[{get_msk_time_string()}]   ⚠️ Таблицы разрывов не найдены!")
+        return {"Fissures": [], "SteelPathFissures": []}
+    return results
+
+async def extract_arbitration_missions_from_page(page) -> List[ArbitrationMission]:
+    """Читает лог Арбитражей из открытой страницы: JS-экстрактором или через полный HTML."""
+    if EXTRACTION_MODE == 'evaluate':
+        entries = await extract_arbitration_entries(page)
+        if entries:
+            SCRAPE_STATS["evaluate_extractions"] += 1
+            
+            fingerprint = arbitration_entries_digest(entries)
+            cached = region_fingerprints.lookup("arbitration_rows", fingerprint)
+            if cached is not None:
+                SCRAPE_STATS["fingerprint_hits"] += 1
+                return cached
+            
+            SCRAPE_STATS["fingerprint_misses"] += 1
+            parsed_missions = parse_arbitration_entries(entries)
+            region_fingerprints.store("arbitration_rows", fingerprint, parsed_missions)
+            return parsed_missions
 
-            if fissure_data["Relic"] == "Omnia":
-                fissure_data["Race"] = "Гринир"
+    return await parse_arbitration_html(await page.content()) or []
 
-            if is_steel_path_table or "Steel Path" in location or "Steel Path" in mission_type_raw:
-                fissure_data['Type'] = fissure_data['Type'].replace("(Steel Path)", "").strip()
-                fissure_data['Location'] = fissure_data['Location'].replace(" (Steel Path)", "").strip()
+# Последние данные, разобранные с живых страниц: url -> (версия DOM, данные)
+LIVE_PAGE_RESULTS: Dict[str, Tuple[int, Any]] = {}
 
-            # Добавляем только если есть реликвия
-            if fissure_data["Relic"] != "N/A":
-                fissures_list.append(fissure_data)
+async def read_live_page(url: str, extract: Callable[[Any], Awaitable[Any]]) -> Any:
+    """Возвращает данные живой страницы, перечитывая DOM только после уведомления MutationObserver."""
+    live_page = await live_pages.get(url, PLAYWRIGHT_CONTEXT)
 
-    return fissures_list
+    cached = LIVE_PAGE_RESULTS.get(url)
+    if cached and cached[0] == live_page.version:
+        SCRAPE_STATS["live_page_skips"] += 1
+        return cached[1]
+
+    version = live_page.version
+    data = await extract(live_page.page)
+    LIVE_PAGE_RESULTS[url] = (version, data)
+    return data
+
+async def scrape_fissures_live() -> Dict[str, List[FissureRecord]]:
+    """Скрапинг разрывов с постоянно открытой страницы без повторной навигации."""
+    try:
+        results = await read_live_page(FISSURE_URL, lambda page: extract_fissures_from_page(page, time.time()))
+        if len(results["Fissures"]) > 0 or len(results["SteelPathFissures"]) > 0:
+            SCRAPE_STATS["successful_scrapes"] += 1
+        return results
+    except Exception as e:
+        print(f"[{get_msk_time_string()}] ⚠️ Ошибка скрапинга разрывов (живая страница): {e}")
+        browser_supervisor.record_failure(e)
+        note_scrape_error("fissures", e)
+        LIVE_PAGE_RESULTS.pop(FISSURE_URL, None)
+        SCRAPE_STATS["failed_scrapes"] += 1
+        SCRAPE_STATS["fissures_errors"] += 1
+        return {"Fissures": [], "SteelPathFissures": []}
+
+async def scrape_arbitration_live() -> Dict[str, Any]:
+    """Скрапинг арбитража с постоянно открытой страницы; текущая миссия пересчитывается по времени."""
+    try:
+        parsed_missions = await read_live_page(ARBY_URL, extract_arbitration_missions_from_page)
+        ARBITRATION_CACHE.store(parsed_missions, time.time())
+        arbitration_data = build_arbitration_schedule(parsed_missions, time.time())
+        if arbitration_data.get("Current", {}).get("Node", "N/A") != "N/A":
+            SCRAPE_STATS["successful_scrapes"] += 1
+        return arbitration_data
+    except Exception as e:
+        print(f"[{get_msk_time_string()}] ⚠️ Ошибка скрапинга арбитража (живая страница): {e}")
+        browser_supervisor.record_failure(e)
+        note_scrape_error("arbitration", e)
+        LIVE_PAGE_RESULTS.pop(ARBY_URL, None)
+        SCRAPE_STATS["failed_scrapes"] += 1
+        SCRAPE_STATS["arbitration_errors"] += 1
+        return {"Current": {}, "Upcoming": []}
 
 async def scrape_fissures_fast():
-    """Быстрый скрапинг разрывов с использованием персистентного браузера."""
+    """Быстрый скрапинг разрывов: сначала HTTP, браузер - только как запасной вариант."""
     global PLAYWRIGHT_CONTEXT, BROWSER_INITIALIZED
     
-    if not BROWSER_INITIALIZED or not PLAYWRIGHT_CONTEXT:
-        if not await init_persistent_browser():
-            SCRAPE_STATS["failed_scrapes"] += 1
-            SCRAPE_STATS["fissures_errors"] += 1
-            return {"Fissures": [], "SteelPathFissures": []}
+    html = await fetch_html_without_browser(FISSURE_URL)
+    if html is not None:
+        results = await parse_fissure_html(html, time.time())
+        if results is not None:
+            if len(results["Fissures"]) > 0 or len(results["SteelPathFissures"]) > 0:
+                SCRAPE_STATS["http_fast_hits"] += 1
+                SCRAPE_STATS["successful_scrapes"] += 1
+                return results
+        mark_http_fast_path_miss(FISSURE_URL)
     
-    async with BROWSER_LOCK:
+    SCRAPE_STATS["browser_fallbacks"] += 1
+    
+    if not await ensure_persistent_browser():
+        SCRAPE_STATS["failed_scrapes"] += 1
+        SCRAPE_STATS["fissures_errors"] += 1
+        note_scrape_error("fissures", "браузер не запустился")
+        return {"Fissures": [], "SteelPathFissures": []}
+    
+    if LIVE_PAGE_MODE:
+        return await scrape_fissures_live()
+    
+    async with browser_slots.slot(FISSURE_URL):
         current_scrape_time = time.time()
         results = {"Fissures": [], "SteelPathFissures": []}
         
         try:
-            # Создаем новую страницу в существующем контексте
-            page = await PLAYWRIGHT_CONTEXT.new_page()
-            await page.set_viewport_size({'width': 1920, 'height': 1080})
-            
-            # Устанавливаем таймауты
-            page.set_default_timeout(10000)
-            
-            # Добавляем заголовки для обхода защиты
-            await page.set_extra_http_headers({
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Referer': 'https://browse.wf/',
-                'DNT': '1'
-            })
-            
-            # Переходим на страницу
-            print(f"[{get_msk_time_string()}] 🔄 Быстрый скрапинг разрывов...")
-            response = await page.goto(
-                FISSURE_URL,
-                wait_until="domcontentloaded",
-                timeout=10000
-            )
-            
-            if response and response.status == 200:
-                # Ждем загрузки таблиц
-                try:
-                    await page.wait_for_selector('table', timeout=5000)
-                except:
-                    pass
-                
-                # Небольшая пауза для рендеринга JavaScript
-                await asyncio.sleep(0.5)
-                
-                # Получаем HTML
-                html_content = await page.content()
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                # ИЩЕМ ПРАВИЛЬНЫЕ ТАБЛИЦЫ:
-                # 1. Таблица "Void Fissures (Normal)" для обычных разрывов
-                # 2. Таблица "Steel Path Fissures" для SP разрывов
-                
-                # Находим все заголовки таблиц (h4 элементы)
-                all_h4 = soup.find_all('h4')
-                all_tables = soup.find_all('table')
-                
-                normal_table = None
-                sp_table = None
+            # Вкладка из пула уже настроена и гарантированно вернется в пул или закроется
+            async with page_pool.lease(PLAYWRIGHT_CONTEXT) as page:
+                # Перехватываем JSON, из которого страница строит таблицы
+                capture = JsonCapture(page) if JSON_CAPTURE_ENABLED else None
                 
-                # Проходим по всем заголовкам h4, чтобы найти нужные таблицы
-                for h4 in all_h4:
-                    h4_text = h4.text.strip()
-                    
-                    # Ищем заголовок "Void Fissures (Normal)"
-                    if "Void Fissures (Normal)" in h4_text:
-                        # Таблица обычно следует после заголовка
-                        next_sibling = h4.find_next_sibling('table')
-                        if next_sibling:
-                            normal_table = next_sibling
-                            print(f"[{get_msk_time_string()}]   -> Найдена таблица обычных разрывов")
-                    
-                    # Ищем заголовок "Steel Path Fissures"
-                    elif "Steel Path Fissures" in h4_text:
-                        next_sibling = h4.find_next_sibling('table')
-                        if next_sibling:
-                            sp_table = next_sibling
-                            print(f"[{get_msk_time_string()}]   -> Найдена таблица SP разрывов")
+                try:
+                    # Переходим на страницу
+                    print(f"[{get_msk_time_string()}] 🔄 Быстрый скрапинг разрывов...")
+                    response = await page.goto(
+                        FISSURE_URL,
+                        wait_until="domcontentloaded",
+                        timeout=10000
+                    )
                     
-                    # Ищем заголовок "Void Storms (Railjack)" - ЭТО НЕ ОБЫЧНЫЕ РАЗРЫВЫ!
-                    elif "Void Storms (Railjack)" in h4_text:
-                        print(f"[{get_msk_time_string()}]   -> Пропущена таблица Void Storms (Railjack)")
-                
-                # Если не нашли по заголовкам, ищем таблицы по содержимому
-                if not normal_table or not sp_table:
-                    for table in all_tables:
-                        table_html = str(table)
+                    if response and response.status == 200:
+                        # Ждем, пока строки таблиц перестанут меняться (или истечет дедлайн)
+                        ready = await readiness.wait(page, "fissures", FISSURE_READY_SELECTOR)
                         
-                        # ОБЫЧНЫЕ РАЗРЫВЫ: содержат Lith, Meso, Neo, Axi, Requiem, но НЕ содержат "Railjack"
-                        if (('Lith' in table_html or 'Meso' in table_html or 
-                             'Neo' in table_html or 'Axi' in table_html or 
-                             'Requiem' in table_html or 'Omnia' in table_html) and
-                            'Railjack' not in table_html and 'Void Storm' not in table_html and
-                            not normal_table):
-                            normal_table = table
-                            print(f"[{get_msk_time_string()}]   -> Найдена таблица обычных разрывов (по содержимому)")
+                        worldstate = None
+                        if capture:
+                            worldstate = remember_captured_payloads(await capture.collect())["worldstate"]
                         
-                        # SP РАЗРЫВЫ: содержат "Steel Path" или "SP-"
-                        elif (('Steel Path' in table_html or 'SP-' in table_html or 
-                               'sp-fissures' in table_html.lower()) and not sp_table):
-                            sp_table = table
-                            print(f"[{get_msk_time_string()}]   -> Найдена таблица SP разрывов (по содержимому)")
-                
-                # Парсим найденные таблицы
-                if normal_table:
-                    normal_fissures = parse_fissure_table(normal_table, current_scrape_time, False)
-                    results["Fissures"] = normal_fissures
-                    print(f"[{get_msk_time_string()}]   -> Обычные разрывы: {len(normal_fissures)}")
-                else:
-                    print(f"[{get_msk_time_string()}]   ⚠️ Таблица обычных разрывов не найдена!")
-                
-                if sp_table:
-                    sp_fissures = parse_fissure_table(sp_table, current_scrape_time, True)
-                    results["SteelPathFissures"] = sp_fissures
-                    print(f"[{get_msk_time_string()}]   -> Разрывы SP: {len(sp_fissures)}")
-                else:
-                    print(f"[{get_msk_time_string()}]   ⚠️ Таблица SP разрывов не найдена!")
-            
-            await page.close()
+                        # Без карты регионов названия нод неизвестны - тогда парсим HTML
+                        if worldstate and WORLDSTATE_REGIONS:
+                            results = parse_worldstate_fissures(worldstate, current_scrape_time)
+                        
+                        if len(results["Fissures"]) > 0 or len(results["SteelPathFissures"]) > 0:
+                            SCRAPE_STATS["json_captures"] += 1
+                            print(f"[{get_msk_time_string()}]   -> Разрывы из JSON: {len(results['Fissures'])} + SP {len(results['SteelPathFissures'])}")
+                        elif ready:
+                            results = await extract_fissures_from_page(page, current_scrape_time)
+                        else:
+                            # Недорисованные таблицы не читаем: пустой результат не затрет текущее состояние
+                            print(f"[{get_msk_time_string()}] ⚠️ Таблицы разрывов не готовы за {readiness.deadline_ms} мс")
+                            note_scrape_error("fissures", f"таблицы не готовы за {readiness.deadline_ms} мс")
+                    else:
+                        note_scrape_error("fissures", f"HTTP {response.status if response else 'нет ответа'}")
+                finally:
+                    if capture:
+                        capture.detach()
             
             # Увеличиваем статистику успешных скрапов
             if len(results["Fissures"]) > 0 or len(results["SteelPathFissures"]) > 0:
                 SCRAPE_STATS["successful_scrapes"] += 1
+                browser_supervisor.record_success()
                 
         except Exception as e:
             print(f"[{get_msk_time_string()}] ⚠️ Ошибка быстрого скрапинга разрывов: {e}")
             SCRAPE_STATS["failed_scrapes"] += 1
             SCRAPE_STATS["fissures_errors"] += 1
+            browser_supervisor.record_failure(e)
+            note_scrape_error("fissures", e)
         
         return results
 
 async def scrape_arbitration_fast():
-    """Быстрый скрапинг арбитража с использованием персистентного браузера."""
+    """Арбитраж из кэша расписания; сайт загружается только без кэша или для редкого фонового обновления."""
+    now = time.time()
+    arbitration_data = ARBITRATION_CACHE.get(now)
+    
+    if arbitration_data is None:
+        SCRAPE_STATS["arbitration_cache_misses"] += 1
+        return await fetch_arbitration_schedule()
+    
+    SCRAPE_STATS["arbitration_cache_hits"] += 1
+    
+    if ARBITRATION_CACHE.needs_refresh(now):
+        print(f"[{get_msk_time_string()}] 🔄 Фоновое обновление расписания арбитражей...")
+        ARBITRATION_CACHE.start_background_refresh(fetch_arbitration_schedule)
+    
+    return arbitration_data
+
+async def load_arbitration_schedule():
+    """Загрузка расписания арбитража: сначала HTTP, браузер - только как запасной вариант."""
     global PLAYWRIGHT_CONTEXT, BROWSER_INITIALIZED
     
-    if not BROWSER_INITIALIZED or not PLAYWRIGHT_CONTEXT:
-        if not await init_persistent_browser():
-            SCRAPE_STATS["failed_scrapes"] += 1
-            SCRAPE_STATS["arbitration_errors"] += 1
-            return {"Current": {}, "Upcoming": []}
+    html = await fetch_html_without_browser(ARBY_URL)
+    if html is not None:
+        parsed_missions = await parse_arbitration_html(html)
+        if parsed_missions is not None:
+            arbitration_data = build_arbitration_schedule(parsed_missions, time.time())
+            if arbitration_data.get("Current", {}).get("Node", "N/A") != "N/A":
+                ARBITRATION_CACHE.store(parsed_missions, time.time())
+                SCRAPE_STATS["http_fast_hits"] += 1
+                SCRAPE_STATS["successful_scrapes"] += 1
+                return arbitration_data
+        mark_http_fast_path_miss(ARBY_URL)
     
-    async with BROWSER_LOCK:
+    SCRAPE_STATS["browser_fallbacks"] += 1
+    
+    if not await ensure_persistent_browser():
+        SCRAPE_STATS["failed_scrapes"] += 1
+        SCRAPE_STATS["arbitration_errors"] += 1
+        note_scrape_error("arbitration", "браузер не запустился")
+        return {"Current": {}, "Upcoming": []}
+    
+    if LIVE_PAGE_MODE:
+        return await scrape_arbitration_live()
+    
+    async with browser_slots.slot(ARBY_URL):
         current_scrape_time = time.time()
         
         try:
-            page = await PLAYWRIGHT_CONTEXT.new_page()
-            await page.set_viewport_size({'width': 1920, 'height': 1080})
-            page.set_default_timeout(10000)
-            
-            print(f"[{get_msk_time_string()}] 🔄 Быстрый скрапинг арбитража...")
+            parsed_missions = None
             
-            response = await page.goto(
-                ARBY_URL,
-                wait_until="domcontentloaded",
-                timeout=10000
-            )
-            
-            if response and response.status == 200:
-                # Ждем элемент с логом
-                try:
-                    await page.wait_for_selector('#log', timeout=5000)
-                except:
-                    pass
+            async with page_pool.lease(PLAYWRIGHT_CONTEXT) as page:
+                capture = JsonCapture(page) if JSON_CAPTURE_ENABLED else None
                 
-                await asyncio.sleep(0.5)
-                
-                html_content = await page.content()
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                arbitration_data = parse_arbitration_schedule(soup, current_scrape_time)
-                
-                await page.close()
+                try:
+                    print(f"[{get_msk_time_string()}] 🔄 Быстрый скрапинг арбитража...")
+                    
+                    response = await page.goto(
+                        ARBY_URL,
+                        wait_until="domcontentloaded",
+                        timeout=10000
+                    )
+                    
+                    if response and response.status == 200:
+                        # Ждем записей лога с data-timestamp, число которых перестало меняться
+                        ready = await readiness.wait(page, "arbitration", ARBITRATION_READY_SELECTOR)
+                        
+                        parsed_missions = []
+                        if capture:
+                            arbys_payload = remember_captured_payloads(await capture.collect())["arbys"]
+                            if arbys_payload and WORLDSTATE_REGIONS:
+                                parsed_missions = parse_arbitration_payload(arbys_payload)
+                        
+                        if parsed_missions:
+                            SCRAPE_STATS["json_captures"] += 1
+                        elif ready:
+                            parsed_missions = await extract_arbitration_missions_from_page(page)
+                        else:
+                            print(f"[{get_msk_time_string()}] ⚠️ Лог арбитражей не готов за {readiness.deadline_ms} мс")
+                            note_scrape_error("arbitration", f"лог не готов за {readiness.deadline_ms} мс")
+                    else:
+                        note_scrape_error("arbitration", f"HTTP {response.status if response else 'нет ответа'}")
+                finally:
+                    if capture:
+                        capture.detach()
+            
+            if parsed_missions is not None:
+                ARBITRATION_CACHE.store(parsed_missions, current_scrape_time)
+                arbitration_data = build_arbitration_schedule(parsed_missions, current_scrape_time)
                 
                 arb_tier = arbitration_data.get("Current", {}).get("Tier", "N/A")
                 arb_node = arbitration_data.get("Current", {}).get("Node", "N/A")
@@ -2108,35 +2849,343 @@ async def scrape_arbitration_fast():
                 # Увеличиваем статистику успешных скрапов
                 if arb_node != "N/A":
                     SCRAPE_STATS["successful_scrapes"] += 1
+                    browser_supervisor.record_success()
                     
                 return arbitration_data
             
-            await page.close()
-            
         except Exception as e:
             print(f"[{get_msk_time_string()}] ⚠️ Ошибка быстрого скрапинга арбитража: {e}")
             SCRAPE_STATS["failed_scrapes"] += 1
             SCRAPE_STATS["arbitration_errors"] += 1
+            browser_supervisor.record_failure(e)
+            note_scrape_error("arbitration", e)
         
         return {"Current": {}, "Upcoming": []}
 
+scrape_scheduler = ScrapeScheduler(min_interval=SCRAPE_INTERVAL_SECONDS, max_interval=SCRAPE_MAX_INTERVAL_SECONDS)
+
+# --- ПРЕДОХРАНИТЕЛИ ЦЕЛЕЙ ---
+CIRCUIT_TITLES = {"fissures": "Разрывы", "arbitration": "Арбитраж"}
+# Последний переход каждой цели, отправленный в канал логов (в раздельном режиме сообщения повторяются при переподключении)
+CIRCUIT_REPORTED: Dict[str, float] = {}
+# Состояние предохранителей процесса-скрапера для мониторинга (раздельный режим)
+SCRAPER_CIRCUITS: List[str] = []
+
+def report_circuit_transition(breaker: CircuitBreaker, previous: str, state: str, error: Any):
+    """Переход предохранителя: в консоль, а открытие и закрытие - еще и в канал логов."""
+    icons = {OPEN: "🔴", HALF_OPEN: "🟡", CLOSED: "🟢"}
+    retry_info = f" (проба через {breaker.seconds_until_retry():.0f}с)" if state == OPEN else ""
+    print(f"[{get_msk_time_string()}] {icons.get(state, '⚪')} Предохранитель {breaker.name}: {previous} -> {state}{retry_info}")
+    
+    # Пробная загрузка отдельно не сообщается: ее итог - следующий переход (closed или снова open)
+    if state == HALF_OPEN:
+        return
+    event = {
+        "type": "circuit",
+        "target": breaker.name,
+        "previous": previous,
+        "state": state,
+        "error": str(error) if error else None,
+        "retry_in": breaker.seconds_until_retry(),
+        "at": time.time()
+    }
+    if state_publisher is not None:
+        # Процесс-скрапер: в канал логов пишет процесс бота
+        state_publisher.publish(f"circuit:{breaker.name}", event)
+    else:
+        asyncio.get_running_loop().create_task(send_circuit_transition(event))
+
+async def send_circuit_transition(event: Dict[str, Any]):
+    """Сообщение в канал логов о приостановке или возобновлении загрузок цели."""
+    target = event["target"]
+    if CIRCUIT_REPORTED.get(target, 0) >= event["at"]:
+        return
+    CIRCUIT_REPORTED[target] = event["at"]
+    
+    log_channel_id = CONFIG.get('LOG_CHANNEL_ID')
+    log_channel = bot.get_channel(log_channel_id) if log_channel_id else None
+    if not log_channel:
+        return
+    
+    title = CIRCUIT_TITLES.get(target, target)
+    if event["state"] == OPEN:
+        if event["previous"] == HALF_OPEN:
+            description = f"Пробная загрузка не удалась. Следующая через {event['retry_in']:.0f} с."
+        else:
+            description = f"Сайт не отвечает, загрузки приостановлены. Пробная загрузка через {event['retry_in']:.0f} с."
+        embed = discord.Embed(title=f"🔴 {title}: предохранитель открыт", description=description,
+                              color=0xFA5252, timestamp=datetime.now(MSK_TZ))
+        if event.get("error"):
+            embed.add_field(name="Ошибка", value=f"`{event['error'][:MAX_FIELD_LENGTH]}`", inline=False)
+    else:
+        embed = discord.Embed(title=f"🟢 {title}: предохранитель закрыт", description="Сайт снова отвечает, загрузки возобновлены.",
+                              color=0x40C057, timestamp=datetime.now(MSK_TZ))
+    
+    try:
+        await log_channel.send(embed=embed)
+    except Exception as e:
+        print(f"[{get_msk_time_string()}] ⚠️ Не удалось отправить сообщение о предохранителе: {e}")
+
+def make_circuit_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        window_seconds=CIRCUIT_WINDOW_SECONDS,
+        base_delay=CIRCUIT_BASE_DELAY_SECONDS,
+        max_delay=CIRCUIT_MAX_DELAY_SECONDS,
+        on_transition=report_circuit_transition
+    )
+
+fissures_breaker = make_circuit_breaker("fissures")
+arbitration_breaker = make_circuit_breaker("arbitration")
+circuit_breakers = (fissures_breaker, arbitration_breaker)
+
+def has_fissures(results: Dict[str, List[FissureRecord]]) -> bool:
+    return bool(results.get("Fissures") or results.get("SteelPathFissures"))
+
+def has_current_arbitration(data: Dict[str, Any]) -> bool:
+    return data.get("Current", {}).get("Node", "N/A") != "N/A"
+
+async def scrape_fissures_guarded() -> Dict[str, List[FissureRecord]]:
+    """Скрапинг разрывов через предохранитель: пока сайт недоступен, ни HTTP, ни браузер не запускаются."""
+    SCRAPE_LAST_ERRORS.pop("fissures", None)
+    return await fissures_breaker.call(
+        scrape_fissures_fast,
+        lambda: {"Fissures": [], "SteelPathFissures": []},
+        has_fissures,
+        failure_reason=lambda: SCRAPE_LAST_ERRORS.get("fissures", "пустой результат")
+    )
+
+async def load_arbitration_guarded() -> Dict[str, Any]:
+    """Загрузка расписания арбитража через предохранитель."""
+    SCRAPE_LAST_ERRORS.pop("arbitration", None)
+    return await arbitration_breaker.call(
+        load_arbitration_schedule,
+        lambda: {"Current": {}, "Upcoming": []},
+        has_current_arbitration,
+        failure_reason=lambda: SCRAPE_LAST_ERRORS.get("arbitration", "пустой результат")
+    )
+
+def circuit_summaries() -> List[str]:
+    return SCRAPER_CIRCUITS if SCRAPER_MODE == 'split' else [breaker.summary() for breaker in circuit_breakers]
+
+# --- ИСТОЧНИКИ ДАННЫХ С ПОДСТРАХОВКОЙ ---
+# Поставщик browse идет через предохранитель: пока browse.wf недоступен, он сразу уступает следующему
+
+async def load_worldstate_regions() -> bool:
+    """Карта регионов (названия нод) для JSON-поставщиков; без нее ноды известны только по ID."""
+    if WORLDSTATE_REGIONS:
+        return True
+    if not WORLDSTATE_REGIONS_URL:
+        return False
+    text = await read_source_text(WORLDSTATE_REGIONS_URL)
+    if text:
+        remember_captured_payloads([(WORLDSTATE_REGIONS_URL, await parse_executor.run('worldstate', json.loads, text))])
+    return bool(WORLDSTATE_REGIONS)
+
+async def fetch_worldstate_fissures() -> Optional[Dict[str, List[FissureRecord]]]:
+    """Разрывы из JSON worldstate."""
+    if not await load_worldstate_regions():
+        return None
+    text = await read_source_text(WORLDSTATE_URL)
+    if text is None:
+        return None
+    worldstate = await parse_executor.run('worldstate', json.loads, text)
+    return parse_worldstate_fissures(worldstate, time.time())
+
+async def fetch_mirror_fissures() -> Optional[Dict[str, List[FissureRecord]]]:
+    """Разрывы из копии страницы browse.wf (файл или HTTP-зеркало)."""
+    html = await read_source_text(FISSURE_MIRROR)
+    return await parse_fissure_html(html, time.time()) if html else None
+
+def schedule_from_missions(parsed_missions: List[ArbitrationMission]) -> Dict[str, Any]:
+    """Расписание из списка миссий; список с известной текущей миссией запоминается в кэше расписания."""
+    now = time.time()
+    arbitration_data = build_arbitration_schedule(parsed_missions, now)
+    if has_current_arbitration(arbitration_data):
+        ARBITRATION_CACHE.store(parsed_missions, now)
+    return arbitration_data
+
+async def fetch_arbys_schedule() -> Optional[Dict[str, Any]]:
+    """Расписание арбитража из ответа ARBYS_URL (строки "timestamp,SolNode" или JSON-список)."""
+    if not ARBYS_URL or not await load_worldstate_regions():
+        return None
+    text = await read_source_text(ARBYS_URL)
+    if text is None:
+        return None
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        payload = text
+    parsed_missions = parse_arbitration_payload(payload)
+    return schedule_from_missions(parsed_missions) if parsed_missions else None
+
+async def fetch_mirror_arbitration() -> Optional[Dict[str, Any]]:
+    """Расписание арбитража из копии страницы browse.wf."""
+    html = await read_source_text(ARBITRATION_MIRROR)
+    parsed_missions = await parse_arbitration_html(html) if html else None
+    return schedule_from_missions(parsed_missions) if parsed_missions else None
+
+FISSURE_PROVIDERS = {"browse": scrape_fissures_guarded, "worldstate": fetch_worldstate_fissures, "mirror": fetch_mirror_fissures}
+ARBITRATION_PROVIDERS = {"browse": load_arbitration_guarded, "worldstate": fetch_arbys_schedule, "mirror": fetch_mirror_arbitration}
+
+def build_data_source(feed: str, setting: str, providers: Dict[str, Callable[[], Awaitable[Any]]],
+                      validate: Callable[[Any], bool]) -> HedgedSource:
+    names = parse_source_list(setting, list(providers)) or ["browse"]
+    return HedgedSource(
+        feed,
+        [DataProvider(name, providers[name]) for name in names],
+        validate,
+        hedge_min_ms=HEDGE_MIN_MS,
+        hedge_max_ms=HEDGE_MAX_MS
+    )
+
+# Обычные разрывы и Стальной путь приходят одной страницей (одним JSON), поэтому лента у них общая
+fissure_source = build_data_source("fissures", FISSURE_SOURCES, FISSURE_PROVIDERS, has_fissures)
+arbitration_source = build_data_source("arbitration", ARBITRATION_SOURCES, ARBITRATION_PROVIDERS, has_current_arbitration)
+# Состояние источников процесса-скрапера для мониторинга (раздельный режим)
+SCRAPER_SOURCES: List[str] = []
+
+async def fetch_fissures() -> Dict[str, List[FissureRecord]]:
+    """Разрывы от первого поставщика, ответившего корректно."""
+    results = await fissure_source.fetch()
+    return results if results is not None else {"Fissures": [], "SteelPathFissures": []}
+
+async def fetch_arbitration_schedule() -> Dict[str, Any]:
+    """Расписание арбитража от первого поставщика, ответившего корректно."""
+    arbitration_data = await arbitration_source.fetch()
+    return arbitration_data if arbitration_data is not None else {"Current": {}, "Upcoming": []}
+
+def source_summaries() -> List[str]:
+    return SCRAPER_SOURCES if SCRAPER_MODE == 'split' else [fissure_source.summary(), arbitration_source.summary()]
+
+def collect_scrape_deadlines(state: Dict[str, Any]) -> List[Tuple[float, str]]:
+    """Дедлайны, после которых на сайте ожидаются новые данные: окончания разрывов и смена арбитража."""
+    deadlines = [(fissure.get("ExpiryTime", 0), "fissure") for fissure in state.get("Fissures", [])]
+    deadlines.extend((fissure.get("ExpiryTime", 0), "steel_path") for fissure in state.get("SteelPathFissures", []))
+    
+    target = state.get("ArbitrationSchedule", {}).get("Current", {}).get("TargetTimestamp")
+    if target:
+        deadlines.append((target, "arbitration"))
+    
+    return deadlines
+
+def log_state_changes(changes: Dict[str, Any]):
+    """Печатает, что изменилось в разделах (changes: раздел -> прошлый снимок)"""
+    if "ArbitrationSchedule" in changes:
+        old_arb = changes["ArbitrationSchedule"].data.get("Current", {})
+        current_arb = mission_state.data("ArbitrationSchedule").get("Current", {})
+        print(f"[{get_msk_time_string()}] 📢 Обнаружено изменение арбитража!")
+        print(f"[{get_msk_time_string()}]   Старое: {old_arb.get('Node', 'N/A')} ({old_arb.get('Tier', 'N/A')})")
+        print(f"[{get_msk_time_string()}]   Новое: {current_arb.get('Node', 'N/A')} ({current_arb.get('Tier', 'N/A')})")
+
+    for section, title in (("Fissures", "обычных разрывов"), ("SteelPathFissures", "разрывов SP")):
+        if section in changes:
+            events = mission_state.snapshot(section).events
+            added = sum(isinstance(event, FissureAdded) for event in events)
+            expired = sum(isinstance(event, FissureExpired) for event in events)
+            changed = sum(isinstance(event, FissureChanged) for event in events)
+            print(f"[{get_msk_time_string()}] 📢 Обнаружено изменение {title}!")
+            print(f"[{get_msk_time_string()}]   Было: {len(changes[section].data)}, стало: {len(mission_state.data(section))} "
+                  f"(+{added} / -{expired} / ~{changed})")
+
+async def render_changed_channels(changes: Dict[str, Any]):
+    """Немедленно перерисовывает каналы изменившихся разделов"""
+    print(f"[{get_msk_time_string()}] ⚡ Немедленное обновление каналов...")
+
+    tasks = []
+    if "ArbitrationSchedule" in changes:
+        tasks.append(asyncio.create_task(update_arbitration_channel(bot)))
+
+    if "Fissures" in changes:
+        tasks.append(asyncio.create_task(update_normal_fissure_channel(bot)))
+
+    if "SteelPathFissures" in changes:
+        tasks.append(asyncio.create_task(update_steel_path_channel(bot)))
+
+    await asyncio.gather(*tasks)
+
+# --- РАЗДЕЛЬНЫЙ РЕЖИМ (SCRAPER_MODE=split) ---
+# В процессе-скрапере публикатор состояния, в процессе бота - подписчик и (если SCRAPER_SPAWN) сам процесс скрапера
+state_publisher: Optional[StatePublisher] = StatePublisher(SCRAPER_SOCKET) if IS_SCRAPER_WORKER else None
+PUBLISHED_ARBITRATION_MISSIONS: Optional[List[ArbitrationMission]] = None
+
+def publish_scraper_progress():
+    """После каждого цикла скрапера: статистика и, если обновилось, 30-дневное расписание для индекса тиров"""
+    global PUBLISHED_ARBITRATION_MISSIONS
+    if ARBITRATION_CACHE.missions and ARBITRATION_CACHE.missions is not PUBLISHED_ARBITRATION_MISSIONS:
+        state_publisher.publish_missions(ARBITRATION_CACHE.missions, ARBITRATION_CACHE.fetched_at)
+        PUBLISHED_ARBITRATION_MISSIONS = ARBITRATION_CACHE.missions
+    state_publisher.publish_stats(dict(SCRAPE_STATS, last_scrape_time=LAST_SCRAPE_TIME,
+                                       circuits=[breaker.summary() for breaker in circuit_breakers],
+                                       sources=[fissure_source.summary(), arbitration_source.summary()]))
+
+async def apply_scraper_message(message: Dict[str, Any]):
+    """Процесс бота: применяет сообщение скрапера к mission_state и обновляет каналы"""
+    global LAST_SCRAPE_TIME
+    kind = message.get("type")
+
+    if kind == "section":
+        section = message["section"]
+        changes = set_current_state({section: decode_section(section, message["data"])}, message.get("published_at") or time.time())
+        if changes:
+            log_state_changes(changes)
+            await render_changed_channels(changes)
+    elif kind == "arbitration_missions":
+        ARBITRATION_CACHE.store(decode_missions(message["missions"]), message.get("fetched_at") or time.time())
+    elif kind == "stats":
+        stats = message.get("stats", {})
+        LAST_SCRAPE_TIME = stats.pop("last_scrape_time", LAST_SCRAPE_TIME)
+        stats.pop("start_time", None)  # время работы показывается по процессу бота
+        SCRAPER_CIRCUITS[:] = stats.pop("circuits", SCRAPER_CIRCUITS)
+        SCRAPER_SOURCES[:] = stats.pop("sources", SCRAPER_SOURCES)
+        SCRAPE_STATS.update(stats)
+    elif kind == "circuit":
+        await send_circuit_transition(message)
+
+state_subscriber = StateSubscriber(SCRAPER_SOCKET, apply_scraper_message)
+scraper_process = ScraperProcess(scraper_argv(os.path.abspath(__file__)))
+SPLIT_TASKS_STARTED = False
+
+async def run_scraper_worker():
+    """Точка входа процесса-скрапера: без Discord, только цикл скрапинга и публикация состояния"""
+    print(f"[{get_msk_time_string()}] 🛰️ Процесс скрапера, сокет: {SCRAPER_SOCKET}")
+    await state_publisher.start()
+    try:
+        await fast_scraping_cycle()
+    finally:
+        await state_publisher.close()
+        await close_persistent_browser()
+        parse_executor.shutdown()
+
 async def fast_scraping_cycle():
-    """Цикл быстрого скрапинга с интервалом 5 секунд."""
-    print(f"[{get_msk_time_string()}] 🚀 Запуск быстрого скрапинга (5 секунд)...")
+    """Цикл скрапинга: проверка сразу после известных дедлайнов, в остальное время - с растущей паузой."""
+    print(f"[{get_msk_time_string()}] 🚀 Запуск быстрого скрапинга (от {SCRAPE_INTERVAL_SECONDS} до {SCRAPE_MAX_INTERVAL_SECONDS} секунд)...")
+    
+    global LAST_SCRAPE_TIME
     
     # Инициализируем браузер при старте
-    await init_persistent_browser()
+    await ensure_persistent_browser()
+    
+    # Результаты прошлого цикла: при совпадении объектов данные заведомо не менялись
+    last_fissures_result = None
+    last_arbitration_result = None
+    # Критические ошибки цикла подряд (для растущей паузы)
+    critical_errors = 0
     
     while True:
         try:
             start_time = time.time()
             
+            # Падение, память, вкладки, ошибки подряд: браузер пересоздается до скрапа, а не после серии ошибок
+            await check_browser_health()
+            
             # Обновляем статистику
             SCRAPE_STATS["total_scrapes"] += 1
             SCRAPE_STATS["fast_scrapes"] += 1
             
             # Параллельный скрапинг разрывов и арбитража
-            fissures_task = asyncio.create_task(scrape_fissures_fast())
+            fissures_task = asyncio.create_task(fetch_fissures())
             arbitration_task = asyncio.create_task(scrape_arbitration_fast())
             
             fissures_result, arbitration_result = await asyncio.gather(
@@ -2144,6 +3193,8 @@ async def fast_scraping_cycle():
                 arbitration_task,
                 return_exceptions=True
             )
+            # Цели грузятся параллельно: время цикла - максимум, а не сумма
+            SCRAPE_STATS["last_cycle_ms"] = int((time.time() - start_time) * 1000)
             
             # Обрабатываем результаты
             if isinstance(fissures_result, Exception):
@@ -2169,167 +3220,100 @@ async def fast_scraping_cycle():
                 "ArbitrationSchedule": arbitration_result if not isinstance(arbitration_result, Exception) else {"Current": {}, "Upcoming": []}
             }
             
-            # Проверяем изменения
-            changes_detected = False
-            
-            # Для арбитража - сравниваем ключевые поля
-            current_arb = combined_results.get("ArbitrationSchedule", {}).get("Current", {})
-            old_arb = CURRENT_MISSION_STATE.get("ArbitrationSchedule", {}).get("Current", {})
-            
-            # Быстрое сравнение по ключевым параметрам
-            if (current_arb.get('Node') != old_arb.get('Node') or 
-                current_arb.get('Tier') != old_arb.get('Tier') or
-                current_arb.get('IsActive') != old_arb.get('IsActive')):
-                
-                print(f"[{get_msk_time_string()}] 📢 Обнаружено изменение арбитража!")
-                print(f"[{get_msk_time_string()}]   Старое: {old_arb.get('Node', 'N/A')} ({old_arb.get('Tier', 'N/A')})")
-                print(f"[{get_msk_time_string()}]   Новое: {current_arb.get('Node', 'N/A')} ({current_arb.get('Tier', 'N/A')})")
-                changes_detected = True
-                LAST_CHANGES["ArbitrationSchedule"] = True
-            
-            # Для разрывов - сравниваем хеши
-            old_fissures_hash = hash(str(sorted(CURRENT_MISSION_STATE.get("Fissures", []), key=lambda x: x.get('Location', ''))))
-            new_fissures_hash = hash(str(sorted(combined_results.get("Fissures", []), key=lambda x: x.get('Location', ''))))
-            
-            if old_fissures_hash != new_fissures_hash:
-                print(f"[{get_msk_time_string()}] 📢 Обнаружено изменение обычных разрывов!")
-                print(f"[{get_msk_time_string()}]   Старое: {len(CURRENT_MISSION_STATE.get('Fissures', []))}, Новое: {len(combined_results.get('Fissures', []))}")
-                changes_detected = True
-                LAST_CHANGES["Fissures"] = True
-            
-            old_sp_hash = hash(str(sorted(CURRENT_MISSION_STATE.get("SteelPathFissures", []), key=lambda x: x.get('Location', ''))))
-            new_sp_hash = hash(str(sorted(combined_results.get("SteelPathFissures", []), key=lambda x: x.get('Location', ''))))
-            
-            if old_sp_hash != new_sp_hash:
-                print(f"[{get_msk_time_string()}] 📢 Обнаружено изменение разрывов SP!")
-                print(f"[{get_msk_time_string()}]   Старое: {len(CURRENT_MISSION_STATE.get('SteelPathFissures', []))}, Новое: {len(combined_results.get('SteelPathFissures', []))}")
-                changes_detected = True
-                LAST_CHANGES["SteelPathFissures"] = True
-            
-            # Обновляем состояние
-            set_current_state(combined_results, start_time)
-            
-            # Если обнаружены изменения, немедленно обновляем каналы
-            if changes_detected:
-                print(f"[{get_msk_time_string()}] ⚡ Немедленное обновление каналов...")
-                
-                tasks = []
-                if LAST_CHANGES.get("ArbitrationSchedule"):
-                    tasks.append(asyncio.create_task(update_arbitration_channel(bot)))
-                
-                if LAST_CHANGES.get("Fissures"):
-                    tasks.append(asyncio.create_task(update_normal_fissure_channel(bot)))
+            # Те же объекты, что в прошлом цикле (совпали отпечатки или кэш расписания):
+            # сравнение, обновление состояния и перерисовка каналов не нужны
+            if fissures_result is last_fissures_result and arbitration_result is last_arbitration_result:
+                SCRAPE_STATS["unchanged_cycles"] += 1
+                LAST_SCRAPE_TIME = start_time
+                changes_detected = False
+            else:
+                last_fissures_result, last_arbitration_result = fissures_result, arbitration_result
                 
-                if LAST_CHANGES.get("SteelPathFissures"):
-                    tasks.append(asyncio.create_task(update_steel_path_channel(bot)))
+                # Одна проверка на все разделы: отпечаток содержимого в mission_state
+                changes = set_current_state(combined_results, start_time)
+                changes_detected = bool(changes)
                 
-                if tasks:
-                    await asyncio.gather(*tasks)
+                log_state_changes(changes)
                 
-                # Сбрасываем флаги изменений
-                with CHANGES_LOCK:
-                    for key in LAST_CHANGES:
-                        LAST_CHANGES[key] = False
+                if state_publisher is not None:
+                    # Процесс-скрапер: изменения уходят процессу бота, каналы обновляет он
+                    for section in changes:
+                        state_publisher.publish_section(mission_state.snapshot(section))
+                elif changes_detected:
+                    # Если обнаружены изменения, немедленно обновляем каналы
+                    await render_changed_channels(changes)
             
-            # Пауза между циклами
-            elapsed = time.time() - start_time
-            sleep_time = max(1.0, SCRAPE_INTERVAL_SECONDS - elapsed)  # Минимум 1 сек
+            if state_publisher is not None:
+                publish_scraper_progress()
             
-            # Если скрапинг занял больше интервала, запускаем следующий сразу
-            if elapsed > SCRAPE_INTERVAL_SECONDS:
-                print(f"[{get_msk_time_string()}] ⚡ Скрапинг занял {elapsed:.1f}с, пропускаем паузу")
-                continue
+            # Планируем следующий скрап по ближайшему дедлайну или по интервалу поиска нового
+            scrape_scheduler.record_result(changes_detected)
+            scrape_scheduler.set_deadlines(collect_scrape_deadlines(combined_results))
+            wake_time, reason = scrape_scheduler.next_wake(time.time())
+            
+            # Пробная загрузка - сразу, как только истекла пауза открытого предохранителя
+            # (арбитраж из кэша может долго не обращаться к сайту - истекшие паузы не учитываются)
+            probe_times = [breaker.retry_at for breaker in circuit_breakers
+                           if breaker.state == OPEN and breaker.retry_at > time.time()]
+            if probe_times and min(probe_times) < wake_time:
+                wake_time, reason = min(probe_times), "circuit_probe"
+            sleep_time = max(1.0, wake_time - time.time())  # Минимум 1 сек
             
-            await asyncio.sleep(sleep_time)
+            if LIVE_PAGE_MODE:
+                # Уведомление MutationObserver будит цикл раньше запланированного времени
+                if await live_pages.wait_for_change(sleep_time):
+                    reason = "dom_change"
+            else:
+                await asyncio.sleep(sleep_time)
+            
+            scrape_scheduler.mark_wakeup(reason)
+            critical_errors = 0
             
         except Exception as e:
-            print(f"[{get_msk_time_string()}] 💥 Критическая ошибка в быстром скрапинге: {e}")
+            critical_errors += 1
+            # Пауза растет с каждой критической ошибкой подряд, разброс не дает повторам совпадать по времени
+            delay = backoff_delay(critical_errors, SCRAPE_INTERVAL_SECONDS * 2, CIRCUIT_MAX_DELAY_SECONDS)
+            print(f"[{get_msk_time_string()}] 💥 Критическая ошибка в быстром скрапинге: {e} (пауза {delay:.0f}с)")
             SCRAPE_STATS["failed_scrapes"] += 1
             SCRAPE_STATS["last_error"] = str(e)
             SCRAPE_STATS["last_error_time"] = time.time()
             import traceback
             traceback.print_exc()
-            await asyncio.sleep(10)  # Пауза при критической ошибке
+            await asyncio.sleep(delay)
 
 # =================================================================
 # 8. КЭШ И ОПТИМИЗИРОВАННАЯ ЛОГИКА ОБНОВЛЕНИЯ КАНАЛОВ
 # =================================================================
 
 class ChannelCache:
-    """Кэш для хранения состояния каналов."""
+    """Какие версии разделов mission_state уже показаны в каналах."""
+
+    # тип канала -> раздел состояния
+    CHANNEL_SECTIONS = {
+        "arbitration": "ArbitrationSchedule",
+        "fissure": "Fissures",
+        "steel_path": "SteelPathFissures"
+    }
 
     def __init__(self):
-        self.last_arbitration_embed = None
-        self.last_fissure_embed = None
-        self.last_sp_embed = None
-        self.cache_lock = asyncio.Lock()
-
-    async def should_update_channel(self, channel_type: str, new_embed: discord.Embed) -> bool:
-        """Проверяет, нужно ли обновлять канал."""
-        async with self.cache_lock:
-            if channel_type == "arbitration":
-                if self.last_arbitration_embed is None:
-                    self.last_arbitration_embed = new_embed
-                    return True
-
-                # Сравниваем только важные поля эмбеда
-                old_dict = self.last_arbitration_embed.to_dict()
-                new_dict = new_embed.to_dict()
-
-                # Игнорируем временные метки в сравнении
-                if 'footer' in old_dict:
-                    old_dict.pop('footer', None)
-                if 'footer' in new_dict:
-                    new_dict.pop('footer', None)
-
-                if old_dict != new_dict:
-                    self.last_arbitration_embed = new_embed
-                    SCRAPE_STATS["cache_misses"] += 1
-                    return True
-                SCRAPE_STATS["cache_hits"] += 1
-                return False
-
-            elif channel_type == "fissure":
-                if self.last_fissure_embed is None:
-                    self.last_fissure_embed = new_embed
-                    return True
-
-                old_dict = self.last_fissure_embed.to_dict()
-                new_dict = new_embed.to_dict()
-
-                if 'footer' in old_dict:
-                    old_dict.pop('footer', None)
-                if 'footer' in new_dict:
-                    new_dict.pop('footer', None)
-
-                if old_dict != new_dict:
-                    self.last_fissure_embed = new_embed
-                    SCRAPE_STATS["cache_misses"] += 1
-                    return True
-                SCRAPE_STATS["cache_hits"] += 1
-                return False
-
-            elif channel_type == "steel_path":
-                if self.last_sp_embed is None:
-                    self.last_sp_embed = new_embed
-                    return True
-
-                old_dict = self.last_sp_embed.to_dict()
-                new_dict = new_embed.to_dict()
-
-                if 'footer' in old_dict:
-                    old_dict.pop('footer', None)
-                if 'footer' in new_dict:
-                    new_dict.pop('footer', None)
-
-                if old_dict != new_dict:
-                    self.last_sp_embed = new_embed
-                    SCRAPE_STATS["cache_misses"] += 1
-                    return True
-                SCRAPE_STATS["cache_hits"] += 1
-                return False
-
-            return True
+        self.rendered: Dict[str, Any] = {}
+
+    def last_rendered(self, channel_type: str):
+        """Снимок, показанный в канале последним (None - канал еще не обновлялся)"""
+        return self.rendered.get(channel_type)
+
+    def should_update_channel(self, channel_type: str, force: bool = False):
+        """Возвращает снимок для отрисовки, если версия раздела изменилась с прошлой отрисовки, иначе None."""
+        snapshot = mission_state.snapshot(self.CHANNEL_SECTIONS[channel_type])
+        last = self.rendered.get(channel_type)
+        if not force and last is not None and not mission_state.changed_since(snapshot.section, last.version):
+            SCRAPE_STATS["cache_hits"] += 1
+            return None
+        SCRAPE_STATS["cache_misses"] += 1
+        return snapshot
+
+    def mark_rendered(self, channel_type: str, snapshot):
+        self.rendered[channel_type] = snapshot
 
 channel_cache = ChannelCache()
 
@@ -2426,8 +3410,8 @@ def split_fissures_into_fields(fissures_content: str) -> List[Tuple[str, str]]:
 
     return fields
 
-async def update_arbitration_channel(bot: commands.Bot):
-    """Обновляет канал с Расписанием Арбитражей только при изменениях."""
+async def update_arbitration_channel(bot: commands.Bot, force: bool = False):
+    """Обновляет канал с Расписанием Арбитражей только при изменениях (force - при любой версии)."""
     arb_id = CONFIG.get('ARBITRATION_CHANNEL_ID')
     if not arb_id:
         return
@@ -2436,7 +3420,12 @@ async def update_arbitration_channel(bot: commands.Bot):
     if not arb_channel:
         return
 
-    data = CURRENT_MISSION_STATE.get("ArbitrationSchedule", {})
+    # Проверяем, нужно ли обновлять: версия раздела с прошлой отрисовки
+    snapshot = channel_cache.should_update_channel("arbitration", force)
+    if snapshot is None:
+        return
+
+    data = snapshot.data
     current_arb = data.get("Current", {})
 
     # Если арбитраж N/A или пустой, НЕ обновляем сообщение
@@ -2468,7 +3457,8 @@ async def update_arbitration_channel(bot: commands.Bot):
     
     # Создаем уведомление о смене карты
     content_to_send = None
-    old_arb = PREVIOUS_MISSION_STATE.get("ArbitrationSchedule", {}).get("Current", {})
+    last_rendered = channel_cache.last_rendered("arbitration")
+    old_arb = last_rendered.data.get("Current", {}) if last_rendered else None
     old_node = old_arb.get('Node', '').split(',')[0].strip() if old_arb else None
     
     # Если нода изменилась и это не первое обновление, делаем упоминание
@@ -2548,25 +3538,14 @@ async def update_arbitration_channel(bot: commands.Bot):
     TIERS_TO_HIGHLIGHT = ["S", "A", "B"]
     embed.add_field(name="\u200b", value="— — — ВЫДЕЛЕННЫЕ ТИРЫ — — —", inline=False)
 
-    # Получаем ближайшие тиры из отдельных запросов
+    # Ближайшие миссии тиров берем из индекса 30-дневного расписания (без загрузки страниц)
     current_time = time.time()
     tier_missions = {}
 
-    # Запускаем все запросы последовательно
     for tier in TIERS_TO_HIGHLIGHT:
-        try:
-            print(f"[{get_msk_time_string()}] 🔄 Начинаем запрос для {tier}-тира...")
-            
-            # Используем существующий контекст браузера
-            mission = await sync_get_earliest_tier_mission(tier, current_time)
-            
-            if mission:
-                print(f"[{get_msk_time_string()}] ✅ Получен {tier}-тир: {mission.get('Node', 'N/A')}")
-                tier_missions[tier] = mission
-            else:
-                print(f"[{get_msk_time_string()}] ⚠️ Не удалось получить {tier}-тир")
-        except Exception as e:
-            print(f"[{get_msk_time_string()}] 🚨 Исключение при получении {tier}-тира: {e}")
+        mission = ARBITRATION_TIER_INDEX.earliest(tier, current_time)
+        if mission:
+            tier_missions[tier] = mission
 
     for tier in TIERS_TO_HIGHLIGHT:
         tier_emoji = TIER_EMOJIS_FINAL.get(tier, tier)
@@ -2608,17 +3587,14 @@ async def update_arbitration_channel(bot: commands.Bot):
             embed.add_field(name=field_name, value="Нет в расписании", inline=True)
 
     embed.set_footer(text=f"Обновлено: {get_msk_time_string()} | Данные: browse.wf/arbys | Время: МСК (UTC+3) | Режим: реалтайм")
-
-    # Проверяем, нужно ли обновлять
-    if not await channel_cache.should_update_channel("arbitration", embed):
-        return
+    channel_cache.mark_rendered("arbitration", snapshot)
 
     lfg_view = ArbitrationLfgView(current_arb)
 
     await send_or_edit_message('LAST_ARBITRATION_MESSAGE_ID', arb_channel, embed, content=content_to_send, view=lfg_view)
 
-async def update_normal_fissure_channel(bot: commands.Bot):
-    """Обновляет канал с Обычными Разрывами только при изменениях."""
+async def update_normal_fissure_channel(bot: commands.Bot, force: bool = False):
+    """Обновляет канал с Обычными Разрывами только при изменениях (force - при любой версии)."""
     fissure_id = CONFIG.get('FISSURE_CHANNEL_ID')
     if not fissure_id:
         return
@@ -2627,8 +3603,12 @@ async def update_normal_fissure_channel(bot: commands.Bot):
     if not fissure_channel:
         return
 
-    data = CURRENT_MISSION_STATE
-    normal_fissures = data.get("Fissures", [])
+    # Проверяем, нужно ли обновлять: версия раздела с прошлой отрисовки
+    snapshot = channel_cache.should_update_channel("fissure", force)
+    if snapshot is None:
+        return
+
+    normal_fissures = snapshot.data
 
     # Если нет разрывов, НЕ обновляем
     if len(normal_fissures) == 0:
@@ -2650,17 +3630,14 @@ async def update_normal_fissure_channel(bot: commands.Bot):
         embed.add_field(name=name, value=value, inline=False)
 
     embed.set_footer(text=f"Обновлено: {get_msk_time_string()} | Данные: browse.wf | Режим: реалтайм")
-
-    # Проверяем, нужно ли обновлять
-    if not await channel_cache.should_update_channel("fissure", embed):
-        return
+    channel_cache.mark_rendered("fissure", snapshot)
 
     lfg_view = FissureSelectView(normal_fissures, is_steel_path=False)
 
     await send_or_edit_message('LAST_NORMAL_MESSAGE_ID', fissure_channel, embed, view=lfg_view)
 
-async def update_steel_path_channel(bot: commands.Bot):
-    """Обновляет канал с Разрывами Пути Стали только при изменениях."""
+async def update_steel_path_channel(bot: commands.Bot, force: bool = False):
+    """Обновляет канал с Разрывами Пути Стали только при изменениях (force - при любой версии)."""
     sp_fissure_id = CONFIG.get('STEEL_PATH_CHANNEL_ID')
     if not sp_fissure_id:
         return
@@ -2669,8 +3646,12 @@ async def update_steel_path_channel(bot: commands.Bot):
     if not sp_channel:
         return
 
-    data = CURRENT_MISSION_STATE
-    steel_fissures = data.get("SteelPathFissures", [])
+    # Проверяем, нужно ли обновлять: версия раздела с прошлой отрисовки
+    snapshot = channel_cache.should_update_channel("steel_path", force)
+    if snapshot is None:
+        return
+
+    steel_fissures = snapshot.data
 
     # Если нет разрывов, НЕ обновляем
     if len(steel_fissures) == 0:
@@ -2693,80 +3674,12 @@ async def update_steel_path_channel(bot: commands.Bot):
         embed.add_field(name=name, value=value, inline=False)
 
     embed.set_footer(text=f"Обновлено: {get_msk_time_string()} | Данные: browse.wf | Режим: реалтайм")
-
-    # Проверяем, нужно ли обновлять
-    if not await channel_cache.should_update_channel("steel_path", embed):
-        return
+    channel_cache.mark_rendered("steel_path", snapshot)
 
     lfg_view = FissureSelectView(steel_fissures, is_steel_path=True)
 
     await send_or_edit_message('LAST_STEEL_MESSAGE_ID', sp_channel, embed, view=lfg_view)
 
-async def sync_get_earliest_tier_mission(tier: str, current_scrape_time: float) -> Optional[Dict[str, Any]]:
-    """Получает ближайшую миссию определенного тира с использованием персистентного браузера."""
-    global PLAYWRIGHT_CONTEXT, BROWSER_INITIALIZED
-    
-    if not BROWSER_INITIALIZED or not PLAYWRIGHT_CONTEXT:
-        return None
-    
-    tier_urls = {
-        "S": "https://browse.wf/arbys#days=30&tz=local&hourfmt=mil&exclude=tier-A.tier-B.tier-C.tier-D.tier-F",
-        "A": "https://browse.wf/arbys#days=30&tz=local&hourfmt=mil&exclude=tier-S.tier-B.tier-C.tier-D.tier-F",
-        "B": "https://browse.wf/arbys#days=30&tz=local&hourfmt=mil&exclude=tier-S.tier-A.tier-C.tier-D.tier-F"
-    }
-
-    url = tier_urls.get(tier)
-    if not url:
-        return None
-
-    async with BROWSER_LOCK:
-        try:
-            page = await PLAYWRIGHT_CONTEXT.new_page()
-            await page.set_viewport_size({'width': 1920, 'height': 1080})
-            page.set_default_timeout(10000)
-            
-            response = await page.goto(url, wait_until="domcontentloaded", timeout=10000)
-            
-            if not response or response.status != 200:
-                await page.close()
-                return None
-            
-            try:
-                await page.wait_for_selector('#log', timeout=5000)
-            except:
-                pass
-            
-            await asyncio.sleep(0.5)
-            
-            content = await page.content()
-            await page.close()
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            schedule = parse_arbitration_schedule(soup, current_scrape_time)
-            
-            # Возвращаем текущую или следующую миссию
-            current = schedule.get("Current", {})
-            upcoming = schedule.get("Upcoming", [])
-            
-            mission_result = None
-            
-            # Если есть текущая активная миссия нужного тира
-            if current.get('Node') != 'N/A' and current.get('Tier', '').upper() == tier:
-                mission_result = current
-            
-            # Ищем первую upcoming миссию нужного тира
-            if not mission_result:
-                for mission in upcoming:
-                    if mission.get('Tier', '').upper() == tier:
-                        mission_result = mission
-                        break
-            
-            return mission_result
-            
-        except Exception as e:
-            print(f"[{get_msk_time_string()}] 🚨 Ошибка при получении {tier}-тира: {e}")
-            return None
-
 # =================================================================
 # 9. ОСНОВНОЙ КОД БОТА И КОМАНДЫ
 # =================================================================
@@ -2786,25 +3699,18 @@ async def mission_update_task():
     """Задача для периодического обновления Discord-сообщений при обнаружении изменений."""
 
     if LAST_SCRAPE_TIME > 0:
-        global LAST_CHANGES, CHANGES_LOCK
-
-        changes_to_process = {}
-        with CHANGES_LOCK:
-            changes_to_process = LAST_CHANGES.copy()
-            for key in LAST_CHANGES:
-                LAST_CHANGES[key] = False
-
-        if changes_to_process.get("ArbitrationSchedule"):
-            print(f"[{get_msk_time_string()}] 📢 Обновление канала арбитража (обнаружены изменения)...")
-            await update_arbitration_channel(bot)
-
-        if changes_to_process.get("Fissures"):
-            print(f"[{get_msk_time_string()}] 📢 Обновление канала обычных разрывов (обнаружены изменения)...")
-            await update_normal_fissure_channel(bot)
-
-        if changes_to_process.get("SteelPathFissures"):
-            print(f"[{get_msk_time_string()}] 📢 Обновление канала разрывов стального пути (обнаружены изменения)...")
-            await update_steel_path_channel(bot)
+        # Каналы, чья показанная версия отстала от mission_state (если быстрый цикл не успел их обновить)
+        channel_updates = (
+            ("arbitration", 'ARBITRATION_CHANNEL_ID', update_arbitration_channel, "арбитража"),
+            ("fissure", 'FISSURE_CHANNEL_ID', update_normal_fissure_channel, "обычных разрывов"),
+            ("steel_path", 'STEEL_PATH_CHANNEL_ID', update_steel_path_channel, "разрывов стального пути")
+        )
+        for channel_type, config_key, update_channel, title in channel_updates:
+            last = channel_cache.last_rendered(channel_type)
+            section = ChannelCache.CHANNEL_SECTIONS[channel_type]
+            if CONFIG.get(config_key) and mission_state.changed_since(section, last.version if last else 0):
+                print(f"[{get_msk_time_string()}] 📢 Обновление канала {title} (обнаружены изменения)...")
+                await update_channel(bot)
     else:
         print(f"[{get_msk_time_string()}] ⏳ Ожидание первого успешного скрапинга...")
 
@@ -2815,6 +3721,7 @@ async def update_monitoring_task():
 
 @bot.event
 async def on_ready():
+    global SPLIT_TASKS_STARTED
     print(f'Бот готов: {bot.user}')
     print(f'Render URL: {RENDER_URL}')
 
@@ -2827,8 +3734,15 @@ async def on_ready():
     except Exception as e:
         print(f"❌ Ошибка запуска health сервера: {e}")
 
-    # Запускаем быстрый скрапинг в фоне
-    asyncio.create_task(fast_scraping_cycle())
+    # Запускаем быстрый скрапинг в фоне (в раздельном режиме - подписку на процесс скрапера)
+    if SCRAPER_MODE == 'split':
+        if not SPLIT_TASKS_STARTED:
+            SPLIT_TASKS_STARTED = True
+            asyncio.create_task(state_subscriber.run())
+            if SCRAPER_SPAWN:
+                asyncio.create_task(scraper_process.run())
+    else:
+        asyncio.create_task(fast_scraping_cycle())
 
     # Запускаем задачу мониторинга
     if not update_monitoring_task.is_running():
@@ -2949,7 +3863,7 @@ async def set_arbitration_channel(ctx):
     CONFIG['ARBITRATION_CHANNEL_ID'] = ctx.channel.id
     save_config()
 
-    await update_arbitration_channel(bot)
+    await update_arbitration_channel(bot, force=True)
     await ctx.send(f"✅ Канал **Расписания Арбитражей** установлен на: {ctx.channel.mention} и запущен.", delete_after=10)
 
 @bot.command(name='set_normal_ruptures')
@@ -2959,7 +3873,7 @@ async def set_normal_fissure_channel(ctx):
     CONFIG['FISSURE_CHANNEL_ID'] = ctx.channel.id
     save_config()
 
-    await update_normal_fissure_channel(bot)
+    await update_normal_fissure_channel(bot, force=True)
     await ctx.send(f"✅ Канал **Обычных Разрывов** установлен на: {ctx.channel.mention} и запущен.", delete_after=10)
 
 @bot.command(name='set_steel_path_ruptures')
@@ -2969,7 +3883,7 @@ async def set_steel_path_channel(ctx):
     CONFIG['STEEL_PATH_CHANNEL_ID'] = ctx.channel.id
     save_config()
 
-    await update_steel_path_channel(bot)
+    await update_steel_path_channel(bot, force=True)
     await ctx.send(f"✅ Канал **Разрывов Пути Стали** установлен на: {ctx.channel.mention} и запущен.", delete_after=10)
 
 @bot.command(name='set_lfg_channel')
@@ -3100,9 +4014,9 @@ async def status_command(ctx):
     embed.add_field(name="🔄 Скрапинг", value=scrape_info, inline=False)
 
     # Текущие данные
-    data_info = f"**Арбитраж:** {CURRENT_MISSION_STATE.get('ArbitrationSchedule', {}).get('Current', {}).get('Tier', 'N/A')}\n"
-    data_info += f"**Обычные разрывы:** {len(CURRENT_MISSION_STATE.get('Fissures', []))}\n"
-    data_info += f"**Разрывы SP:** {len(CURRENT_MISSION_STATE.get('SteelPathFissures', []))}\n"
+    data_info = f"**Арбитраж:** {mission_state.data('ArbitrationSchedule').get('Current', {}).get('Tier', 'N/A')}\n"
+    data_info += f"**Обычные разрывы:** {len(mission_state.data('Fissures'))}\n"
+    data_info += f"**Разрывы SP:** {len(mission_state.data('SteelPathFissures'))}\n"
     data_info += f"**Render URL:** {RENDER_URL if RENDER_URL else 'Не настроен'}\n"
     data_info += f"**Режим:** Быстрый скрапинг (5 сек)"
 
@@ -3126,7 +4040,7 @@ async def status_command(ctx):
     embed.add_field(name="⚙️ Настройки", value="\n".join(channels_info), inline=False)
 
     # Производительность
-    embed.add_field(name="📈 Производительность", value=f"**Пинг:** `{round(bot.latency * 1000)}ms`\n**Серверов:** `{len(bot.guilds)}`\n**Пользователей:** `{len(bot.users)}`\n**Изменения за сессию:** `{sum(LAST_CHANGES.values())}`", inline=False)
+    embed.add_field(name="📈 Производительность", value=f"**Пинг:** `{round(bot.latency * 1000)}ms`\n**Серверов:** `{len(bot.guilds)}`\n**Пользователей:** `{len(bot.users)}`\n**Изменения за сессию:** `{mission_state.stats['changes']}`\n**Разрывы за сессию:** `+{mission_state.stats['fissures_added']} / -{mission_state.stats['fissures_expired']} / ~{mission_state.stats['fissures_changed']}`", inline=False)
 
     embed.set_footer(text=f"Запущен: {datetime.fromtimestamp(bot.user.created_at.timestamp()).strftime('%Y-%m-%d %H:%M:%S')}")
 
@@ -3138,9 +4052,9 @@ async def force_update(ctx):
     """Принудительно обновляет все каналы."""
     await ctx.send("🔄 Принудительное обновление всех каналов...", delete_after=5)
 
-    await update_arbitration_channel(bot)
-    await update_normal_fissure_channel(bot)
-    await update_steel_path_channel(bot)
+    await update_arbitration_channel(bot, force=True)
+    await update_normal_fissure_channel(bot, force=True)
+    await update_steel_path_channel(bot, force=True)
 
     await ctx.send("✅ Все каналы обновлены!", delete_after=5)
 
@@ -3180,14 +4094,29 @@ async def clear_cache_command(ctx):
     ARBITRATION_CACHE.clear()
     FISSURE_CACHE.clear()
     TIER_CACHE.clear()
+    ARBITRATION_TIER_INDEX.clear()
+    HTTP_FAST_PATH_RETRY_AT.clear()
+    region_fingerprints.clear()
     
-    # Перезапускаем браузер
-    await close_persistent_browser()
-    await init_persistent_browser()
+    # Перезапускаем браузер (в раздельном режиме браузер живет в процессе скрапера - перезапускается он)
+    if SCRAPER_MODE != 'split':
+        await close_persistent_browser()
+        await ensure_persistent_browser()
+    elif not scraper_process.stop():
+        # Скрапер, запущенный отдельно (SCRAPER_SPAWN=0), бот остановить не может
+        if SCRAPER_SPAWN:
+            await ctx.send("⚠️ Кэши бота очищены; процесс скрапера сейчас не запущен и перезапустится сам.", delete_after=15)
+        else:
+            await ctx.send("⚠️ Кэши бота очищены, но браузер не перезапущен: скрапер запущен отдельно (SCRAPER_SPAWN=0), перезапустите его вручную.", delete_after=15)
+        return
     
     await ctx.send("✅ Кэши очищены, браузер перезапущен!", delete_after=5)
 
-if __name__ == '__main__':
+if __name__ == '__main__' and IS_SCRAPER_WORKER:
+    parse_executor.start()
+    asyncio.run(run_scraper_worker())
+elif __name__ == '__main__':
+    parse_executor.start()
     print(f"[{get_msk_time_string()}] 🚀 Запуск бота в режиме реалтайм...")
     print(f"[{get_msk_time_string()}] Render URL: {RENDER_URL}")
     print(f"[{get_msk_time_string()}] Интервал скрапинга: {SCRAPE_INTERVAL_SECONDS} секунд")
@@ -3203,4 +4132,7 @@ if __name__ == '__main__':
         print(f"Произошла ошибка при запуске бота: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        scraper_process.stop()
+        parse_executor.shutdown()
 #[file content end]
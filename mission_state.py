@@ -0,0 +1,191 @@
+"""
+Единое хранилище состояния миссий: неизменяемые снимки по разделам, у каждого раздела - своя
+возрастающая версия и заранее посчитанный отпечаток содержимого.
+Потребители (каналы, мониторинг, LFG) спрашивают только "изменилась ли версия с N?"
+
+Для разделов разрывов при каждой новой версии считается разница по ключу разрыва
+(create_fissure_key, без времени): события FissureAdded / FissureExpired / FissureChanged.
+"""
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from fingerprint import digest
+from records import FissureRecord
+
+SECTIONS = ("ArbitrationSchedule", "Fissures", "SteelPathFissures")
+FISSURE_SECTIONS = ("Fissures", "SteelPathFissures")
+
+FissureKey = Tuple[Any, ...]
+
+def create_fissure_key(fissure) -> FissureKey:
+    """Создает уникальный ключ для разрыва (без времени): кортеж интернированных строк."""
+    if isinstance(fissure, FissureRecord):
+        return fissure.key
+    return (fissure['Relic'], fissure['Type'], fissure['Location'], fissure['Level'], fissure['Race'])
+
+def index_fissures(fissures) -> Dict[FissureKey, FissureRecord]:
+    """ключ -> запись; у повторов одинакового разрыва (редко, но бывает) к кортежу ключа добавляется номер: (..., 2), (..., 3)"""
+    index: Dict[FissureKey, FissureRecord] = {}
+    for fissure in fissures:
+        key = create_fissure_key(fissure)
+        if key in index:
+            suffix = 2
+            while key + (suffix,) in index:
+                suffix += 1
+            key = key + (suffix,)
+        index[key] = fissure
+    return index
+
+class FissureEvent:
+    # Пока события только подсчитываются в логе цикла скрапинга (log_state_changes); по ним никто не перерисовывает
+    __slots__ = ("section", "key", "old", "new")
+
+    def __init__(self, section: str, key: FissureKey, old: Optional[FissureRecord], new: Optional[FissureRecord]):
+        self.section = section
+        self.key = key
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.section}, {self.key!r})"
+
+class FissureAdded(FissureEvent):
+    """Новый разрыв: old = None"""
+
+class FissureExpired(FissureEvent):
+    """Разрыв пропал со страницы (истек или заменен): new = None"""
+
+class FissureChanged(FissureEvent):
+    """Тот же разрыв с другим содержимым (например, уточнилось время окончания)"""
+
+def diff_fissures(section: str, old_index: Dict[FissureKey, FissureRecord],
+                  new_index: Dict[FissureKey, FissureRecord]) -> List[FissureEvent]:
+    """Разница двух индексов разрывов: работа пропорциональна числу разрывов, без сортировок"""
+    events: List[FissureEvent] = []
+    for key, record in new_index.items():
+        old = old_index.get(key)
+        if old is None:
+            events.append(FissureAdded(section, key, None, record))
+        elif old != record:
+            events.append(FissureChanged(section, key, old, record))
+    for key, old in old_index.items():
+        if key not in new_index:
+            events.append(FissureExpired(section, key, old, None))
+    return events
+
+def _freeze(section: str, data: Any) -> Any:
+    # Списки разрывов хранятся кортежами: снимок не меняется после публикации
+    if section in FISSURE_SECTIONS:
+        return tuple(data)
+    return data
+
+def _is_valid(section: str, data: Any) -> bool:
+    """Пустой результат (ошибка или неполная загрузка страницы) не заменяет последний хороший снимок"""
+    if section in FISSURE_SECTIONS:
+        return bool(data)
+    node = (data or {}).get("Current", {}).get("Node")
+    return node not in ('N/A', '', None)
+
+def _json_default(value: Any) -> Any:
+    return value.as_dict() if hasattr(value, 'as_dict') else str(value)
+
+def content_fingerprint(section: str, data: Any) -> str:
+    """Отпечаток содержимого раздела; порядок разрывов не важен (каналы сортируют их сами)"""
+    if section in FISSURE_SECTIONS:
+        # repr записи однозначен (поля в фиксированном порядке), json для разрывов не нужен
+        records = sorted(repr(record) for record in data)
+        return digest('\n'.join(records))
+    return digest(json.dumps(data, sort_keys=True, ensure_ascii=False, default=_json_default))
+
+class SectionSnapshot:
+    __slots__ = ("section", "version", "fingerprint", "data", "published_at", "index", "events")
+
+    def __init__(self, section: str, version: int, fingerprint: str, data: Any, published_at: float,
+                 index: Optional[Dict[FissureKey, FissureRecord]] = None, events: Tuple[FissureEvent, ...] = ()):
+        self.section = section
+        self.version = version
+        self.fingerprint = fingerprint
+        self.data = data
+        self.published_at = published_at
+        # Для разрывов: ключ -> запись и события, которые привели к этой версии
+        self.index = index
+        self.events = events
+
+EVENT_STAT_KEYS = {
+    FissureAdded: "fissures_added",
+    FissureExpired: "fissures_expired",
+    FissureChanged: "fissures_changed"
+}
+
+class MissionStateStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, SectionSnapshot] = {
+            section: SectionSnapshot(
+                section, 0, '', _freeze(section, [] if section in FISSURE_SECTIONS else {}), 0.0,
+                index={} if section in FISSURE_SECTIONS else None
+            )
+            for section in SECTIONS
+        }
+        # Объект, из которого сделан текущий снимок: тот же объект повторно не хэшируется
+        self._sources: Dict[str, Any] = {}
+        self.stats = {"publishes": 0, "changes": 0, "identical": 0, "rejected": 0,
+                      "fissures_added": 0, "fissures_expired": 0, "fissures_changed": 0}
+
+    def publish(self, section: str, data: Any, published_at: Optional[float] = None) -> Optional[SectionSnapshot]:
+        """Публикует новое содержимое раздела; возвращает прошлый снимок, если версия выросла, иначе None"""
+        with self._lock:
+            self.stats["publishes"] += 1
+            if self._sources.get(section) is data:
+                self.stats["identical"] += 1
+                return None
+            if not _is_valid(section, data):
+                self.stats["rejected"] += 1
+                return None
+
+            previous = self._snapshots[section]
+            fingerprint = content_fingerprint(section, data)
+            self._sources[section] = data
+            if fingerprint == previous.fingerprint:
+                self.stats["identical"] += 1
+                return None
+
+            index, events = None, ()
+            if section in FISSURE_SECTIONS:
+                index = index_fissures(data)
+                events = tuple(diff_fissures(section, previous.index, index))
+                for event in events:
+                    self.stats[EVENT_STAT_KEYS[type(event)]] += 1
+
+            snapshot = SectionSnapshot(
+                section, previous.version + 1, fingerprint, _freeze(section, data),
+                published_at if published_at is not None else time.time(),
+                index=index, events=events
+            )
+            self._snapshots[section] = snapshot
+            self.stats["changes"] += 1
+            return previous
+
+    def publish_all(self, results: Dict[str, Any], published_at: Optional[float] = None) -> Dict[str, SectionSnapshot]:
+        """Публикует все разделы цикла скрапинга; возвращает {раздел: прошлый снимок} для изменившихся"""
+        changed = {}
+        for section in SECTIONS:
+            if section in results:
+                previous = self.publish(section, results[section], published_at)
+                if previous is not None:
+                    changed[section] = previous
+        return changed
+
+    def snapshot(self, section: str) -> SectionSnapshot:
+        return self._snapshots[section]
+
+    def data(self, section: str) -> Any:
+        return self._snapshots[section].data
+
+    def changed_since(self, section: str, version: int) -> bool:
+        return self._snapshots[section].version != version
+
+# Синглтон экземпляр
+mission_state = MissionStateStore()
@@ -0,0 +1,109 @@
+"""
+Пул переиспользуемых вкладок Playwright: страницы создаются один раз и всегда возвращаются или закрываются
+"""
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class PagePool:
+    def __init__(self, size: int = 2, setup: Optional[Callable[[Any], Awaitable[None]]] = None):
+        self.size = max(1, size)
+        # Настройка новой вкладки (таймауты, заголовки) выполняется один раз при создании
+        self.setup = setup
+        self.context = None
+        self.idle: List[Any] = []
+        self.pages: List[Any] = []
+        self.leased = 0
+        self.stats: Dict[str, Any] = {
+            "created": 0,
+            "reused": 0,
+            "discarded": 0,
+            "close_errors": 0
+        }
+
+    async def warm(self, context):
+        """Заранее создает вкладки пула в новом контексте браузера"""
+        await self._bind(context)
+        while len(self.pages) < self.size:
+            self.idle.append(await self._create())
+
+    async def _bind(self, context):
+        # Вкладки старого контекста после перезапуска браузера больше не нужны
+        if self.context is not context:
+            await self.close_all()
+            self.context = context
+
+    async def _create(self):
+        page = await self.context.new_page()
+        try:
+            if self.setup:
+                await self.setup(page)
+        except Exception:
+            await self._close(page)
+            raise
+        self.pages.append(page)
+        self.stats["created"] += 1
+        return page
+
+    async def _close(self, page):
+        if page in self.pages:
+            self.pages.remove(page)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            self.stats["close_errors"] += 1
+            logger.warning(f"Failed to close pooled page: {e}")
+
+    @asynccontextmanager
+    async def lease(self, context):
+        """Выдает вкладку на время работы; при ошибке вкладка закрывается, иначе сбрасывается и возвращается"""
+        await self._bind(context)
+
+        page = None
+        while self.idle and page is None:
+            candidate = self.idle.pop()
+            if candidate.is_closed():
+                await self._close(candidate)
+            else:
+                page = candidate
+                self.stats["reused"] += 1
+        if page is None:
+            page = await self._create()
+
+        self.leased += 1
+        healthy = False
+        try:
+            yield page
+            healthy = True
+        finally:
+            self.leased -= 1
+            await self._release(page, healthy)
+
+    async def _release(self, page, healthy: bool):
+        if healthy and not page.is_closed() and page in self.pages and len(self.idle) < self.size:
+            try:
+                # Пустая страница освобождает DOM и скрипты предыдущей цели
+                await page.goto('about:blank')
+                self.idle.append(page)
+                return
+            except Exception as e:
+                logger.warning(f"Failed to reset pooled page: {e}")
+
+        self.stats["discarded"] += 1
+        await self._close(page)
+
+    def count_leaked(self, context, known_pages: int = 0) -> int:
+        """Вкладки контекста, о которых не знает ни пул, ни другие владельцы (known_pages)"""
+        if context is None:
+            return 0
+        return max(0, len(context.pages) - len(self.pages) - known_pages)
+
+    async def close_all(self):
+        for page in list(self.pages):
+            await self._close(page)
+        self.idle.clear()
+        self.pages.clear()
+        self.context = None
@@ -0,0 +1,114 @@
+"""
+Пул для разбора HTML вне цикла событий: пока разбирается большой лог Арбитражей,
+heartbeat шлюза Discord и нажатия кнопок LFG обрабатываются без задержек.
+
+Режимы: "thread" - пул потоков (по умолчанию), "process" - пул процессов,
+"inline" - разбор прямо в цикле событий (как раньше, для отладки).
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ('thread', 'process', 'inline')
+
+class ParseExecutor:
+    def __init__(self, mode: str = 'thread', workers: int = 1):
+        if mode not in EXECUTOR_MODES:
+            logger.warning(f"Unknown parse executor mode '{mode}', using thread")
+            mode = 'thread'
+        self.mode = mode
+        self.workers = max(1, workers)
+        self._executor: Optional[Executor] = None
+
+        # Задачи, отправленные в пул и еще не завершенные (ждут потока или разбираются)
+        self.pending = 0
+        self.stats: Dict[str, Any] = {"submitted": 0, "failed": 0, "peak_pending": 0, "kinds": {}}
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == 'inline':
+            return None
+        if self._executor is None:
+            if self.mode == 'process':
+                self._start_process_pool()
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='parse')
+        return self._executor
+
+    def start(self):
+        """Запускает рабочие процессы заранее - до того, как в процессе бота появятся другие потоки.
+
+        Вызывается при старте, до bot.run(): потоки heartbeat discord.py, пула asyncio и резолвера aiohttp
+        к моменту первого разбора уже работают, а fork многопоточного процесса может оставить дочернему
+        блокировку (logging, malloc, lxml), которую никто никогда не отпустит.
+        """
+        if self.mode == 'process' and self._executor is None:
+            self._start_process_pool()
+
+    def _start_process_pool(self):
+        if threading.active_count() > 1:
+            logger.warning("Process parse pool is forked from a multi-threaded process; call ParseExecutor.start() at startup")
+        # fork: при spawn/forkserver рабочий процесс заново импортировал бы main.py со всем ботом
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'))
+        # С fork пул создает все процессы при первой задаче, и позже новых не порождает:
+        # пустая задача порождает их сейчас, пока процесс однопоточный
+        executor.submit(int).result()
+        self._executor = executor
+
+    def _kind_stats(self, kind: str) -> Dict[str, Any]:
+        if kind not in self.stats["kinds"]:
+            self.stats["kinds"][kind] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "wait_ms": 0.0}
+        return self.stats["kinds"][kind]
+
+    async def run(self, kind: str, function: Callable[..., Any], *args) -> Any:
+        """Выполняет function(*args) в пуле и ждет результат; kind - имя для метрик ('fissures', 'arbitration')"""
+        self.stats["submitted"] += 1
+        stats = self._kind_stats(kind)
+        submitted = time.perf_counter()
+
+        self.pending += 1
+        self.stats["peak_pending"] = max(self.stats["peak_pending"], self.pending)
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                result, started = _timed_call(function, args)
+            else:
+                # perf_counter в Linux - монотонные часы системы, сравнимы и между процессами
+                result, started = await asyncio.get_running_loop().run_in_executor(executor, _timed_call, function, args)
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        finished = time.perf_counter()
+        stats["count"] += 1
+        duration_ms = (finished - started) * 1000
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["wait_ms"] += (started - submitted) * 1000
+        return result
+
+    def summary(self) -> str:
+        """Строка для мониторинга: очередь и среднее/максимальное время разбора по видам"""
+        parts = [f"{self.mode}×{self.workers}, в очереди {self.pending}, пик {self.stats['peak_pending']}"]
+        for kind, stats in self.stats["kinds"].items():
+            if stats["count"]:
+                average = stats["total_ms"] / stats["count"]
+                parts.append(f"{kind}: {stats['count']} × {average:.1f} мс (макс {stats['max_ms']:.1f})")
+        return "\n".join(parts)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def _timed_call(function: Callable[..., Any], args) -> Any:
+    # Выполняется в рабочем потоке/процессе: момент старта отделяет ожидание в очереди от разбора
+    started = time.perf_counter()
+    return function(*args), started
@@ -0,0 +1,74 @@
+"""
+Ожидание готовности контента в странице: предикат в браузере вместо фиксированных пауз
+"""
+import bisect
+import logging
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Готово, когда элементов по селектору больше нуля и их число не менялось два кадра анимации подряд.
+# Состояние живет в window и сбрасывается вместе с документом при следующей навигации.
+STABLE_ROWS_PREDICATE_JS = """
+(selector) => {
+  const count = document.querySelectorAll(selector).length;
+  const state = window.__wfReadyState || (window.__wfReadyState = {count: -1, stable: 0});
+  if (count > 0 && count === state.count) {
+    state.stable += 1;
+  } else {
+    state.count = count;
+    state.stable = 0;
+  }
+  return state.stable >= 2;
+}
+"""
+
+# Селекторы строк, по которым судим о готовности каждой страницы
+FISSURE_READY_SELECTOR = 'table tr td'
+ARBITRATION_READY_SELECTOR = '#log [data-timestamp]'
+
+# Границы корзин гистограммы времени до готовности, мс (последняя корзина - "больше")
+HISTOGRAM_BOUNDS_MS = (100, 250, 500, 1000, 2000, 5000)
+
+class ReadinessWaiter:
+    def __init__(self, deadline_ms: int = 5000):
+        self.deadline_ms = deadline_ms
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def _target_stats(self, target: str) -> Dict[str, Any]:
+        if target not in self.stats:
+            self.stats[target] = {
+                "ready": 0,
+                "timeouts": 0,
+                "histogram": [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            }
+        return self.stats[target]
+
+    async def wait(self, page, target: str, selector: str) -> bool:
+        """Ждет стабильных строк по селектору до дедлайна; False - если дедлайн истек"""
+        stats = self._target_stats(target)
+        started = time.perf_counter()
+        try:
+            await page.wait_for_function(
+                STABLE_ROWS_PREDICATE_JS,
+                arg=selector,
+                polling='raf',
+                timeout=self.deadline_ms
+            )
+        except Exception as e:
+            # Таймаут Playwright или закрытая страница: решение о данных принимает вызывающий код
+            stats["timeouts"] += 1
+            logger.warning(f"Content not ready for {target} within {self.deadline_ms} ms: {e}")
+            return False
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats["ready"] += 1
+        stats["histogram"][bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+        return True
+
+    def format_histogram(self, target: str) -> str:
+        """Компактная строка гистограммы вида '≤100:3 ≤250:1 >5000:0'"""
+        stats = self._target_stats(target)
+        labels: List[str] = [f"≤{bound}" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+        return " ".join(f"{label}:{count}" for label, count in zip(labels, stats["histogram"]) if count)
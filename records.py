@@ -0,0 +1,121 @@
+"""
+Компактные неизменяемые записи миссий (__slots__) вместо словарей со строковыми ключами.
+Повторяющиеся строковые поля (эра реликвии, тип миссии, фракция, нода) интернируются,
+хэш считается один раз при создании, поэтому записи дешево сравниваются и кладутся в множества.
+
+Для совместимости с остальным кодом бота записи читаются как словари: record['Relic'], record.get('Tier').
+"""
+import sys
+from typing import Any, Dict, FrozenSet, Iterator, Tuple
+
+class FrozenRecord:
+    __slots__ = ("_hash",)
+
+    # Порядок полей задает порядок аргументов конструктора и __reduce__
+    FIELDS: Tuple[str, ...] = ()
+    # Строковые поля, которые интернируются
+    INTERNED: FrozenSet[str] = frozenset()
+    # Необязательные поля: None означает "поля нет" (в as_dict и при доступе по ключу)
+    OPTIONAL: FrozenSet[str] = frozenset()
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self.FIELDS):
+            raise TypeError(f"{type(self).__name__} takes at most {len(self.FIELDS)} positional arguments")
+        values = dict(zip(self.FIELDS, args))
+        values.update(kwargs)
+        unknown = values.keys() - set(self.FIELDS)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} got unexpected fields: {', '.join(sorted(unknown))}")
+
+        for name in self.FIELDS:
+            if name not in values and name not in self.OPTIONAL:
+                raise TypeError(f"{type(self).__name__} missing field: {name}")
+            value = values.get(name)
+            if name in self.INTERNED and type(value) is str:
+                value = sys.intern(value)
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_hash", hash(self.values()))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable, use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if type(other) is type(self):
+            return self._hash == other._hash and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __reduce__(self):
+        # Для pickle (пул процессов разбора): позиционные аргументы в порядке FIELDS
+        return (type(self), self.values())
+
+    # --- Доступ как к словарю ---
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None or key not in self.OPTIONAL:
+                return value
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS and (key not in self.OPTIONAL or getattr(self, key) is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in self.FIELDS if name in self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.keys()}
+
+    def replace(self, **changes) -> "FrozenRecord":
+        """Копия записи с измененными полями"""
+        values = dict(zip(self.FIELDS, self.values()))
+        values.update(changes)
+        return type(self)(**values)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.keys())
+        return f"{type(self).__name__}({fields})"
+
+class FissureRecord(FrozenRecord):
+    FIELDS = ("Relic", "Type", "Level", "Location", "Race", "ExpiryTime")
+    __slots__ = FIELDS + ("_key",)
+    INTERNED = frozenset(("Relic", "Type", "Level", "Location", "Race"))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Ключ нужен сравнению и индексу разрывов на каждом цикле: считается один раз, как и хэш
+        object.__setattr__(self, "_key", (self.Relic, self.Type, self.Location, self.Level, self.Race))
+
+    @property
+    def key(self) -> Tuple[str, str, str, str, str]:
+        """Ключ разрыва без времени окончания (как create_fissure_key)"""
+        return self._key
+
+class ArbitrationMission(FrozenRecord):
+    __slots__ = ("Tier", "Type", "Faction", "Node", "Location", "Bonus", "StartTimeDisplay",
+                 "StartTimestamp", "EndTimestamp", "TargetTimestamp", "IsActive")
+    FIELDS = __slots__
+    INTERNED = frozenset(("Tier", "Type", "Faction", "Node", "Location", "Bonus"))
+    # Заполняются при построении расписания на конкретный момент
+    OPTIONAL = frozenset(("TargetTimestamp", "IsActive"))
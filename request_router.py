@@ -0,0 +1,76 @@
+"""
+Фильтр запросов контекста Playwright: браузер грузит только то, что нужно для данных (документ, скрипты, XHR)
+"""
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALLOWED_TYPES = ('document', 'script', 'xhr', 'fetch', 'websocket', 'eventsource')
+DEFAULT_ALLOWED_HOSTS = ('browse.wf', 'warframe.com')
+
+class RequestRouter:
+    def __init__(self, allowed_types: Iterable[str] = DEFAULT_ALLOWED_TYPES,
+                 allowed_hosts: Iterable[str] = DEFAULT_ALLOWED_HOSTS,
+                 always_allow: Iterable[str] = ()):
+        self.allowed_types = frozenset(t.strip() for t in allowed_types if t.strip())
+        self.allowed_hosts = tuple(h.strip().lower() for h in allowed_hosts if h.strip())
+        # Подстроки URL, которые пропускаются всегда (например, JSON с данными на стороннем домене)
+        self.always_allow = tuple(always_allow)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"allowed": 0, "blocked": 0, "bytes": 0})
+
+    def is_first_party(self, url: str) -> bool:
+        host = (urlparse(url).hostname or '').lower()
+        return any(host == allowed or host.endswith('.' + allowed) for allowed in self.allowed_hosts)
+
+    def decide(self, url: str, resource_type: str) -> Tuple[bool, str]:
+        """Возвращает (пропустить ли запрос, причина)"""
+        lowered = url.lower()
+        if any(hint in lowered for hint in self.always_allow):
+            return True, 'hint'
+        if url.startswith(('data:', 'about:', 'blob:')):
+            return True, 'inline'
+        if resource_type not in self.allowed_types:
+            return False, 'type'
+        if not self.is_first_party(url):
+            return False, 'third_party'
+        return True, 'allowed'
+
+    async def install(self, context):
+        """Подключает фильтр ко всем страницам контекста"""
+        await context.route('**/*', self._handle)
+        context.on('response', self._on_response)
+
+    async def _handle(self, route):
+        request = route.request
+        allowed, reason = self.decide(request.url, request.resource_type)
+        try:
+            if allowed:
+                self.stats[request.resource_type]["allowed"] += 1
+                await route.continue_()
+            else:
+                self.stats[request.resource_type]["blocked"] += 1
+                if reason == 'third_party':
+                    self.stats["third_party"]["blocked"] += 1
+                await route.abort()
+        except Exception as e:
+            # Страница могла закрыться, пока запрос ждал решения
+            logger.debug(f"Route handling failed for {request.url}: {e}")
+
+    def _on_response(self, response):
+        # Размер берется из заголовка, чтобы не читать тело ответа
+        try:
+            length = int(response.headers.get('content-length', 0))
+        except (TypeError, ValueError):
+            length = 0
+        self.stats[response.request.resource_type]["bytes"] += length
+
+    def summary(self) -> Dict[str, Any]:
+        """Итоги по всем типам: сколько пропущено, заблокировано и загружено байт"""
+        return {
+            "allowed": sum(s["allowed"] for key, s in self.stats.items() if key != "third_party"),
+            "blocked": sum(s["blocked"] for key, s in self.stats.items() if key != "third_party"),
+            "bytes": sum(s["bytes"] for s in self.stats.values())
+        }
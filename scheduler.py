@@ -0,0 +1,85 @@
+"""
+Планировщик скрапинга по известным дедлайнам: окончание разрывов, смена арбитража и редкий "поиск нового"
+"""
+import heapq
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+class ScrapeScheduler:
+    def __init__(self, min_interval: float = 5.0, max_interval: float = 60.0,
+                 deadline_grace: float = 2.0, overdue_window: float = 120.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # Сайту нужно немного времени, чтобы показать новый разрыв после окончания старого
+        self.deadline_grace = deadline_grace
+        # Дедлайн, который уже прошел, а данные не обновились, проверяем часто, но не дольше этого окна
+        self.overdue_window = overdue_window
+        self.deadlines: List[Tuple[float, str]] = []
+        self.unchanged_streak = 0
+        self.next_wake_time = 0.0
+        self.next_wake_reason = "start"
+        self.stats: Dict[str, Any] = {
+            "deadline_wakeups": 0,
+            "overdue_wakeups": 0,
+            "discovery_wakeups": 0,
+            "dom_change_wakeups": 0,
+            "probe_wakeups": 0
+        }
+
+    def set_deadlines(self, deadlines: Iterable[Tuple[float, str]]):
+        """Заменяет кучу дедлайнов (timestamp, причина) актуальными из последнего скрапа"""
+        unique = {}
+        for timestamp, reason in deadlines:
+            if timestamp:
+                unique.setdefault(int(timestamp), reason)
+        self.deadlines = [(float(timestamp), reason) for timestamp, reason in unique.items()]
+        heapq.heapify(self.deadlines)
+
+    def record_result(self, changed: bool):
+        """Сбрасывает или наращивает экспоненциальную паузу в зависимости от результата скрапа"""
+        if changed:
+            self.unchanged_streak = 0
+        else:
+            self.unchanged_streak += 1
+
+    def discovery_interval(self) -> float:
+        """Интервал "поиска нового": удваивается после каждого скрапа без изменений"""
+        return min(self.max_interval, self.min_interval * (2 ** min(self.unchanged_streak, 16)))
+
+    def next_wake(self, now: float) -> Tuple[float, str]:
+        """Возвращает (момент следующего скрапа, причина)"""
+        # Давно прошедшие дедлайны больше ничего не обещают
+        while self.deadlines and self.deadlines[0][0] < now - self.overdue_window:
+            heapq.heappop(self.deadlines)
+
+        wake_time = now + self.discovery_interval()
+        reason = "discovery"
+
+        if self.deadlines:
+            deadline, deadline_reason = self.deadlines[0]
+            if deadline + self.deadline_grace <= now:
+                # Дедлайн наступил, а сайт еще показывает старые данные - проверяем с минимальной паузой
+                candidate, candidate_reason = now + self.min_interval, "overdue"
+            else:
+                candidate, candidate_reason = deadline + self.deadline_grace, deadline_reason
+            if candidate < wake_time:
+                wake_time, reason = candidate, candidate_reason
+
+        self.next_wake_time = wake_time
+        self.next_wake_reason = reason
+        return wake_time, reason
+
+    def mark_wakeup(self, reason: str):
+        if reason == "discovery":
+            self.stats["discovery_wakeups"] += 1
+        elif reason == "dom_change":
+            self.stats["dom_change_wakeups"] += 1
+        elif reason == "overdue":
+            self.stats["overdue_wakeups"] += 1
+        elif reason == "circuit_probe":
+            self.stats["probe_wakeups"] += 1
+        else:
+            self.stats["deadline_wakeups"] += 1
+
+    def seconds_until_next(self) -> float:
+        return max(0.0, self.next_wake_time - time.time())
@@ -0,0 +1,209 @@
+"""
+Раздельный режим: скрапер (браузер, разбор HTML) работает в отдельном процессе и публикует
+версии разделов mission_state через Unix-сокет, процесс бота их только применяет.
+Падение или долгая пауза скрапера не задерживает шлюз Discord и ответы на кнопки.
+
+Протокол: по одному JSON-объекту на строку.
+  {"type": "section", "section": ..., "version": ..., "published_at": ..., "data": ...}
+  {"type": "arbitration_missions", "fetched_at": ..., "missions": [...]}
+  {"type": "stats", "stats": {...}}
+При подключении клиент сразу получает все текущие разделы, дальше - только изменения.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+from records import ArbitrationMission, FissureRecord
+
+logger = logging.getLogger(__name__)
+
+FISSURE_SECTIONS = ("Fissures", "SteelPathFissures")
+# Клиент, который не успевает читать (буфер больше лимита), отключается, а не тормозит скрапер
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+# --- КОДИРОВАНИЕ ---
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False, default=_json_default, separators=(',', ':')).encode('utf-8') + b'\n'
+
+def decode_section(section: str, data: Any) -> Any:
+    """Восстанавливает записи из словарей: разрывы и грядущие Арбитражи снова становятся неизменяемыми записями"""
+    if section in FISSURE_SECTIONS:
+        return [FissureRecord(**record) for record in data]
+    return {
+        "Current": data.get("Current", {}),
+        "Upcoming": [ArbitrationMission(**mission) for mission in data.get("Upcoming", [])]
+    }
+
+def decode_missions(missions: List[Dict[str, Any]]) -> List[ArbitrationMission]:
+    return [ArbitrationMission(**mission) for mission in missions]
+
+# --- СТОРОНА СКРАПЕРА ---
+
+class StatePublisher:
+    def __init__(self, path: str):
+        self.path = path
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.clients: Set[asyncio.StreamWriter] = set()
+        # Последнее сообщение по каждому ключу: отдается новым клиентам при подключении
+        self.latest: Dict[str, bytes] = {}
+        self.stats = {"connections": 0, "messages": 0, "dropped_clients": 0}
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self._on_connect, path=self.path)
+        os.chmod(self.path, 0o600)
+        logger.info(f"State publisher listening on {self.path}")
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        self.clients.add(writer)
+        for payload in self.latest.values():
+            writer.write(payload)
+        try:
+            await writer.drain()
+            # Клиент ничего не присылает; чтение нужно только чтобы заметить отключение
+            await reader.read()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def publish(self, key: str, message: Dict[str, Any]):
+        """Рассылает сообщение всем клиентам и запоминает его как последнее для ключа"""
+        payload = encode_message(message)
+        self.latest[key] = payload
+        self.stats["messages"] += 1
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                logger.warning("State subscriber is too slow, disconnecting it")
+                self.stats["dropped_clients"] += 1
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(payload)
+
+    def publish_section(self, snapshot):
+        self.publish(f"section:{snapshot.section}", {
+            "type": "section",
+            "section": snapshot.section,
+            "version": snapshot.version,
+            "published_at": snapshot.published_at,
+            "data": snapshot.data
+        })
+
+    def publish_missions(self, missions: Sequence[Any], fetched_at: float):
+        self.publish("arbitration_missions", {"type": "arbitration_missions", "fetched_at": fetched_at, "missions": list(missions)})
+
+    def publish_stats(self, stats: Dict[str, Any]):
+        self.publish("stats", {"type": "stats", "stats": stats})
+
+    async def close(self):
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+# --- СТОРОНА БОТА ---
+
+class StateSubscriber:
+    def __init__(self, path: str, handler: Callable[[Dict[str, Any]], Awaitable[None]],
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        self.path = path
+        self.handler = handler
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connected = False
+        self.stats = {"messages": 0, "reconnects": 0, "errors": 0, "last_message_at": 0.0}
+
+    async def run(self):
+        """Читает сообщения скрапера; при обрыве переподключается с растущей паузой"""
+        delay = self.reconnect_delay
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=16 * 1024 * 1024)
+            except (FileNotFoundError, ConnectionError) as e:
+                logger.debug(f"Scraper socket not available: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+
+            self.connected = True
+            delay = self.reconnect_delay
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    self.stats["messages"] += 1
+                    self.stats["last_message_at"] = time.time()
+                    try:
+                        await self.handler(json.loads(line))
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        logger.exception(f"Failed to apply scraper message: {e}")
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                logger.warning(f"Scraper connection lost: {e}")
+            finally:
+                self.connected = False
+                writer.close()
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(delay)
+
+class ScraperProcess:
+    """Дочерний процесс скрапера: перезапускается после падения, не затрагивая процесс бота"""
+
+    def __init__(self, argv: Sequence[str], restart_delay: float = 5.0, max_restart_delay: float = 120.0):
+        self.argv = list(argv)
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.process: Optional[asyncio.subprocess.Process] = None
+        # Процесс остановлен через stop() (например, !clear_cache) - его выход не считается падением
+        self.stop_requested = False
+        self.stats = {"starts": 0, "crashes": 0, "last_exit_code": None}
+
+    async def run(self):
+        delay = self.restart_delay
+        while True:
+            started = time.time()
+            self.process = await asyncio.create_subprocess_exec(*self.argv)
+            self.stats["starts"] += 1
+            logger.info(f"Scraper process started (pid {self.process.pid})")
+
+            code = await self.process.wait()
+            self.stats["last_exit_code"] = code
+            if self.stop_requested:
+                self.stop_requested = False
+                logger.info(f"Scraper process stopped on request (code {code}), restarting")
+                continue
+
+            self.stats["crashes"] += 1
+            # Процесс, проработавший долго, перезапускается быстро; частые падения - с растущей паузой
+            delay = self.restart_delay if time.time() - started > self.max_restart_delay else min(delay * 2, self.max_restart_delay)
+            logger.warning(f"Scraper process exited with code {code}, restarting in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    def stop(self) -> bool:
+        """Останавливает процесс скрапера (run() запустит его снова); False - процесс не запущен ботом"""
+        if self.process is None or self.process.returncode is not None:
+            return False
+        self.stop_requested = True
+        self.process.terminate()
+        return True
+
+def scraper_argv(script: str) -> List[str]:
+    return [sys.executable, script, '--scraper']
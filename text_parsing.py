@@ -0,0 +1,196 @@
+"""
+Разбор текстов browse.wf: таймеры разрывов, локации разрывов и строки лога Арбитражей.
+Регулярные выражения компилируются один раз, на каждый тип строки - один общий токенизатор,
+повторяющиеся строки (тиры, фракции, ноды) интернируются.
+
+Запуск `python text_parsing.py` - микробенчмарк на логе из 720 записей (старый разбор против нового).
+"""
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# --- ТАЙМЕРЫ ---
+TIME_TOKEN_RE = re.compile(r'(\d+)([hms])')
+TIME_UNIT_SECONDS = {'h': 3600, 'm': 60, 's': 1}
+
+def parse_time_to_seconds(time_str: str) -> int:
+    """Преобразует строку времени ("1h 30m 5s") в секунды."""
+    if time_str in ('N/A', 'Loading...', ''): return 0
+    seen = set()
+    total_seconds = 0
+    # Как и раньше, учитывается только первое число для каждой единицы
+    for value, unit in TIME_TOKEN_RE.findall(time_str):
+        if unit not in seen:
+            seen.add(unit)
+            total_seconds += int(value) * TIME_UNIT_SECONDS[unit]
+    return total_seconds
+
+# --- АБСОЛЮТНОЕ ВРЕМЯ ОКОНЧАНИЯ ---
+
+def parse_expiry_attribute(value: Optional[str]) -> Optional[float]:
+    """data-expiry → unix-время в секундах (значения в миллисекундах тоже понимаются); None, если разобрать нельзя"""
+    if not value:
+        return None
+    try:
+        expiry = float(value)
+    except (TypeError, ValueError):
+        return None
+    if expiry > 1e11:
+        expiry /= 1000
+    return float(int(expiry)) if expiry > 0 else None
+
+class ExpiryStabilizer:
+    """Для разрывов, у которых есть только текст таймера: оценка "сейчас + таймер" каждый цикл
+    сдвигается на секунду-другую, поэтому в пределах допуска повторно выдается прежнее значение"""
+
+    def __init__(self, tolerance: float = 5.0):
+        self.tolerance = tolerance
+        self.known: Dict[Tuple[Any, ...], float] = {}
+
+    def stabilize(self, key: Tuple[Any, ...], estimate: float) -> float:
+        quantized = float(round(estimate))
+        previous = self.known.get(key)
+        if previous is not None and abs(previous - quantized) <= self.tolerance:
+            return previous
+        self.known[key] = quantized
+        return quantized
+
+    def prune(self, now: float):
+        """Забывает давно истекшие разрывы"""
+        for key in [key for key, expiry in self.known.items() if expiry < now - 3600]:
+            del self.known[key]
+
+# --- ЛОКАЦИИ РАЗРЫВОВ ---
+# "(2-4) - Гринир @ Mantle, Земля"
+FISSURE_LOCATION_RE = re.compile(r'\(([^)]+)\)\s*-\s*([^@]+)(?:@\s*(.+))?')
+FISSURE_LEVEL_RE = re.compile(r'\(([^)]+)\)')
+
+@lru_cache(maxsize=512)
+def parse_fissure_location(location_raw: str) -> Tuple[str, str, str]:
+    """Возвращает (уровни, фракция, локация); строки локаций повторяются между циклами и кэшируются"""
+    level_range, location, race = "N/A", "N/A", "N/A"
+
+    level_match = FISSURE_LOCATION_RE.search(location_raw)
+    if level_match:
+        level_range = level_match.group(1).strip()
+        race = level_match.group(2).strip()
+        location = level_match.group(3).strip() if level_match.group(3) else 'N/A'
+    else:
+        # Попробуем другой формат
+        level_match = FISSURE_LEVEL_RE.search(location_raw)
+        if level_match:
+            level_range = level_match.group(1).strip()
+            remaining = location_raw.replace(f'({level_range})', '').strip()
+
+            if '@' in remaining:
+                parts = remaining.split('@', 1)
+                race = parts[0].replace('-', '').strip()
+                location = parts[1].strip()
+            else:
+                location = remaining
+                race = 'N/A'
+
+    return sys.intern(level_range), sys.intern(race), sys.intern(location)
+
+# --- СТРОКИ ЛОГА АРБИТРАЖЕЙ ---
+# "19:00 • Defense - Grineer @ Casta, Ceres (S tier, +Ability Strength)" за один проход
+ARBITRATION_LINE_RE = re.compile(
+    r'^(?:\d{2}:\d{2}\s*•\s*)?'
+    r'(?P<type>.+?)\s*-\s*(?P<faction>.+?)\s*@\s*(?P<node>.+?),\s*(?P<planet>.+?)'
+    r'\s*\((?P<tier>.+?)\s*tier(?:,\s*(?P<bonus>.+?))?\)$'
+)
+
+# Прежний разбор в четыре шага: нужен для строк с несколькими скобками (например, в названии ноды),
+# где общий токенизатор мог бы разрезать строку иначе
+LEGACY_TIER_BONUS_RE = re.compile(r'\((.+?)\s*tier(?:,\s*(.+?))?\)$')
+LEGACY_TIME_PREFIX_RE = re.compile(r'^\d{2}:\d{2}\s*•\s*')
+LEGACY_SUFFIX_RE = re.compile(r'\s*\(.+\)$')
+LEGACY_MISSION_RE = re.compile(r'(.+?)\s*-\s*(.+?)\s*@\s*(.+?),\s*(.+?)$')
+
+# (тир, бонус, тип миссии, фракция, нода, планета)
+ArbitrationTokens = Tuple[str, str, str, str, str, str]
+
+def _intern_tokens(tier: str, bonus: Optional[str], mission_type: str, faction: str,
+                   node: str, planet: str) -> ArbitrationTokens:
+    return (
+        sys.intern(tier.strip().upper()),
+        sys.intern(bonus.strip()) if bonus else 'N/A',
+        sys.intern(mission_type.strip()),
+        sys.intern(faction.strip()),
+        sys.intern(node.strip()),
+        sys.intern(planet.strip())
+    )
+
+def tokenize_arbitration_line_legacy(text_content: str) -> Optional[ArbitrationTokens]:
+    tier_bonus_match = LEGACY_TIER_BONUS_RE.search(text_content)
+    if not tier_bonus_match: return None
+
+    mission_info_raw = LEGACY_TIME_PREFIX_RE.sub('', text_content)
+    mission_info_raw = LEGACY_SUFFIX_RE.sub('', mission_info_raw).strip()
+
+    mission_match = LEGACY_MISSION_RE.search(mission_info_raw)
+    if not mission_match: return None
+
+    return _intern_tokens(tier_bonus_match.group(1), tier_bonus_match.group(2), *mission_match.groups())
+
+def tokenize_arbitration_line(text_content: str) -> Optional[ArbitrationTokens]:
+    """Разбирает строку лога; None - если строка не похожа на миссию"""
+    if text_content.count('(') != 1:
+        return tokenize_arbitration_line_legacy(text_content)
+
+    match = ARBITRATION_LINE_RE.match(text_content)
+    if not match: return None
+    return _intern_tokens(match.group('tier'), match.group('bonus'), match.group('type'),
+                          match.group('faction'), match.group('node'), match.group('planet'))
+
+def format_msk_hhmm(timestamp: int) -> str:
+    """Время начала по МСК (UTC+3, без перехода на летнее время) в формате ЧЧ:ММ"""
+    minutes_of_day = (timestamp + 3 * 3600) // 60 % (24 * 60)
+    return '%02d:%02d' % divmod(minutes_of_day, 60)
+
+# =================================================================
+# Микробенчмарк
+# =================================================================
+
+def _benchmark_log(entries: int = 720):
+    types = ('Defense', 'Interception', 'Excavation', 'Survival', 'Disruption')
+    factions = ('Grineer', 'Corpus', 'Infested')
+    nodes = (('Casta', 'Ceres'), ('Odin', 'Mercury'), ('Tessara', 'Venus'), ('Sangeru', 'Sedna'))
+    tiers = ('S', 'A', 'B', 'C', 'D', 'F')
+    lines = []
+    for i in range(entries):
+        node, planet = nodes[i % len(nodes)]
+        bonus = ', +Ability Strength' if i % 3 == 0 else ''
+        lines.append(f"{i % 24:02d}:00 • {types[i % len(types)]} - {factions[i % len(factions)]} "
+                     f"@ {node}, {planet} ({tiers[i % len(tiers)]} tier{bonus})")
+    return lines
+
+def _run_benchmark(repeats: int = 50):
+    import timeit
+
+    lines = _benchmark_log()
+    assert [tokenize_arbitration_line(line) for line in lines] == [tokenize_arbitration_line_legacy(line) for line in lines]
+
+    def legacy_uncompiled():
+        # Исходный вариант из main.py: четыре вызова re.search/re.sub с шаблонами-строками
+        for text_content in lines:
+            tier_bonus_match = re.search(r'\((.+?)\s*tier(?:,\s*(.+?))?\)$', text_content)
+            if not tier_bonus_match: continue
+            mission_info_raw = re.sub(r'^\d{2}:\d{2}\s*•\s*', '', text_content)
+            mission_info_raw = re.sub(r'\s*\(.+\)$', '', mission_info_raw).strip()
+            re.search(r'(.+?)\s*-\s*(.+?)\s*@\s*(.+?),\s*(.+?)$', mission_info_raw)
+
+    def tokenizer():
+        for text_content in lines:
+            tokenize_arbitration_line(text_content)
+
+    results = {}
+    for name, function in (('legacy', legacy_uncompiled), ('tokenizer', tokenizer)):
+        seconds = min(timeit.repeat(function, number=repeats, repeat=5)) / repeats
+        results[name] = seconds / len(lines) * 1e6
+        print(f"{name:>10}: {results[name]:.2f} us/row ({seconds * 1000:.2f} ms per {len(lines)}-entry log)")
+    print(f"   speedup: {results['legacy'] / results['tokenizer']:.1f}x")
+
+if __name__ == '__main__':
+    _run_benchmark()